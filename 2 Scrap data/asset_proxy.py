@@ -0,0 +1,569 @@
+"""Local caching proxy for the website's static files, shared by every scraper browser
+
+Every Chrome the scraper starts downloads the same JavaScript bundles, stylesheets and
+fonts. With this proxy in between, each file is downloaded once and then served from a
+memory cache (most recently used files) and a disk cache (AssetCache folder), both with
+least-recently-used eviction. Item data and everything else that isn't a static file is
+passed through untouched and never cached.
+
+A cached file is only served as long as it is fresh: forever if the server marks it
+'immutable' or its file name carries a content hash (app.3f9a2b7c.js - a new version gets
+a new name), otherwise for its max-age (or until Expires). A stale file with an ETag or
+Last-Modified is revalidated with a conditional request, so an unchanged file costs a 304
+instead of a download. A stale file without either is downloaded again.
+
+HTTPS: for the hosts in PROXY_CACHE_HOSTS the proxy decrypts the connection with its own
+self-signed certificate, so their files can be cached. Chrome is told to accept exactly
+that certificate (--ignore-certificate-errors-spki-list with the hash of its public key),
+certificates of every other site are still checked. Connections to all other hosts are
+tunnelled unchanged.
+
+Counters are served at http://127.0.0.1:<port>/__stats
+
+Run it on its own (to share one cache between several scraper processes):
+    python asset_proxy.py [port]
+"""
+import base64
+import hashlib
+import http.client
+import json
+import os
+import re
+import select
+import socket
+import ssl
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit
+
+PROXY_PORT = 8899
+# Hosts whose HTTPS traffic is decrypted so their static files can be cached
+PROXY_CACHE_HOSTS = ["www.biggestbook.com", "biggestbook.com"]
+# Only these file types are cached (checked on the URL path, query string ignored)
+CACHEABLE_EXTENSIONS = ('.js', '.mjs', '.css', '.woff', '.woff2', '.ttf', '.otf', '.eot', '.svg', '.png', '.jpg', '.jpeg', '.gif', '.webp', '.ico', '.map')
+# Never cached, even with a static extension (item data has to be fresh)
+PASS_THROUGH_MARKERS = ('/api/', 'itemdetail', 'itemid=')
+MEMORY_CACHE_MB = 64
+DISK_CACHE_MB = 500
+UPSTREAM_TIMEOUT = 15
+
+# Content hash in a file name: 8+ hex characters, or 8+ base64url characters mixing upper case, lower case and digits
+HASHED_NAME_PATTERN = re.compile(r'(?:^|[.\-_~])(?:(?=[0-9a-f]*\d)[0-9a-f]{8,}|(?=[\w-]*\d)(?=[\w-]*[a-z])(?=[\w-]*[A-Z])[A-Za-z0-9]{8,})(?=[.\-_~])')
+# Request headers replaced when the proxy revalidates a stale file itself
+CONDITIONAL_HEADERS = {'if-none-match', 'if-modified-since', 'if-match', 'if-unmodified-since', 'if-range'}
+
+# Headers that only apply to one connection and must not be forwarded or cached
+HOP_BY_HOP_HEADERS = {'connection', 'keep-alive', 'proxy-connection', 'proxy-authorization', 'proxy-authenticate',
+                      'te', 'trailer', 'trailers', 'transfer-encoding', 'upgrade'}
+
+def is_cacheable_url(url):
+    """Static file URL that may be cached (item data never is)"""
+    url_lower = url.lower()
+    if any(marker in url_lower for marker in PASS_THROUGH_MARKERS):
+        return False
+    return urlsplit(url_lower).path.endswith(CACHEABLE_EXTENSIONS)
+
+def has_hashed_name(url):
+    """File name carries a content hash (a changed file gets a new URL)"""
+    return bool(HASHED_NAME_PATTERN.search(urlsplit(url).path.rsplit('/', 1)[-1]))
+
+def header_value(headers, name):
+    """Value of a header in a (name, value) list ('' if missing)"""
+    for header_name, value in headers:
+        if header_name.lower() == name:
+            return value
+    return ''
+
+def cache_directives(headers):
+    """Cache-Control directives as {name: value or None}"""
+    directives = {}
+    for part in header_value(headers, 'cache-control').lower().split(','):
+        name, _, value = part.strip().partition('=')
+        if name:
+            directives[name] = value.strip().strip('"') or None
+    return directives
+
+def parse_seconds(value):
+    try:
+        return max(0, int(value))
+    except (TypeError, ValueError):
+        return 0
+
+def parse_http_date(value):
+    """Seconds since the epoch of an HTTP date (None if missing or unreadable)"""
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return None
+
+def freshness_lifetime(url, headers):
+    """Seconds a cached response may be served without asking the server (inf = forever)"""
+    directives = cache_directives(headers)
+    if 'no-cache' in directives:
+        return 0
+    if 'immutable' in directives or has_hashed_name(url):
+        return float('inf')
+    for name in ('s-maxage', 'max-age'):
+        if name in directives:
+            return parse_seconds(directives[name])
+    expires = parse_http_date(header_value(headers, 'expires'))
+    if expires is not None:
+        date = parse_http_date(header_value(headers, 'date'))
+        return max(0, expires - (date if date is not None else time.time()))
+    return 0
+
+def has_validator(headers):
+    return bool(header_value(headers, 'etag') or header_value(headers, 'last-modified'))
+
+def is_cacheable_response(url, status, headers):
+    """Response worth storing: fresh for a while, or can be revalidated cheaply"""
+    if status != 200:
+        return False
+    directives = cache_directives(headers)
+    if 'no-store' in directives or 'private' in directives:
+        return False
+    return freshness_lifetime(url, headers) > 0 or has_validator(headers)
+
+def response_age(headers):
+    """Seconds the response had already spent in caches upstream (Age header)"""
+    return parse_seconds(header_value(headers, 'age'))
+
+def updated_headers(headers, not_modified_headers):
+    """Stored headers with the freshness and validator headers of a 304 answer"""
+    updates = {name.lower(): (name, value) for name, value in not_modified_headers
+               if name.lower() in ('cache-control', 'expires', 'date', 'etag', 'last-modified', 'age')}
+    merged = [(name, value) for name, value in headers if name.lower() not in updates]
+    return merged + list(updates.values())
+
+class AssetCache:
+    """Two-level LRU cache: a small memory cache in front of a bigger disk cache (thread-safe)
+
+    Each disk entry is '<sha256 of URL>.body' plus '<sha256>.json' (status, headers and when
+    the response was stored or last revalidated).
+    The file modification time is the last use, so the disk LRU order survives restarts.
+    Writes go to a temporary file first, so several proxies can share the folder.
+    """
+
+    def __init__(self, folder, memory_bytes=MEMORY_CACHE_MB * 1024 * 1024, disk_bytes=DISK_CACHE_MB * 1024 * 1024):
+        self.folder = folder
+        os.makedirs(folder, exist_ok=True)
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self.lock = threading.Lock()
+        self.memory = OrderedDict()  # url -> (status, headers, body, stored_at), most recently used last
+        self.memory_size = 0
+        self.disk = OrderedDict()  # key -> size, least recently used first
+        self.disk_size = 0
+        self.evictions = 0
+        entries = []
+        for name in os.listdir(folder):
+            if name.endswith('.body'):
+                path = os.path.join(folder, name)
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, name[:-5], stat.st_size))
+        for _, key, size in sorted(entries):
+            self.disk[key] = size
+            self.disk_size += size
+
+    def _key(self, url):
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def _remember(self, url, entry):
+        """Put an entry in the memory cache (caller holds the lock)"""
+        size = len(entry[2])
+        if size > self.memory_bytes // 4:
+            return  # Large files only live on disk
+        if url in self.memory:
+            self.memory_size -= len(self.memory.pop(url)[2])
+        self.memory[url] = entry
+        self.memory_size += size
+        while self.memory_size > self.memory_bytes:
+            _, old = self.memory.popitem(last=False)
+            self.memory_size -= len(old[2])
+
+    def get(self, url):
+        """Return (level, (status, headers, body, stored_at)) with level 'memory' or 'disk', or (None, None)"""
+        with self.lock:
+            entry = self.memory.get(url)
+            if entry is not None:
+                self.memory.move_to_end(url)
+                return 'memory', entry
+            key = self._key(url)
+            if key not in self.disk:
+                return None, None
+            body_path = os.path.join(self.folder, key + '.body')
+            try:
+                with open(os.path.join(self.folder, key + '.json'), 'r', encoding='utf-8') as f:
+                    meta = json.load(f)
+                with open(body_path, 'rb') as f:
+                    body = f.read()
+                os.utime(body_path)  # Last use, for the disk LRU order
+            except (OSError, ValueError):
+                self.disk_size -= self.disk.pop(key)
+                return None, None
+            self.disk.move_to_end(key)
+            entry = (meta['status'], meta['headers'], body, meta.get('stored_at', 0))
+            self._remember(url, entry)
+            return 'disk', entry
+
+    def _write(self, key, files):
+        """Write (suffix, data) files of an entry, returns False if the disk refused"""
+        try:
+            for suffix, data in files:
+                fd, temp_path = tempfile.mkstemp(dir=self.folder, suffix='.tmp')
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                os.replace(temp_path, os.path.join(self.folder, key + suffix))
+        except OSError:
+            return False
+        return True
+
+    def _meta(self, url, status, headers, stored_at):
+        return json.dumps({'url': url, 'status': status, 'headers': headers, 'stored_at': stored_at}).encode('utf-8')
+
+    def refresh(self, url, entry, headers, stored_at):
+        """Store new headers and freshness for an entry the server confirmed unchanged (body stays)"""
+        key = self._key(url)
+        with self.lock:
+            self._remember(url, (entry[0], headers, entry[2], stored_at))
+            if key in self.disk:
+                self._write(key, [('.json', self._meta(url, entry[0], headers, stored_at))])
+
+    def put(self, url, status, headers, body, stored_at):
+        key = self._key(url)
+        with self.lock:
+            self._remember(url, (status, headers, body, stored_at))
+            if not self._write(key, [('.body', body), ('.json', self._meta(url, status, headers, stored_at))]):
+                return
+            if key in self.disk:
+                self.disk_size -= self.disk.pop(key)
+            self.disk[key] = len(body)
+            self.disk_size += len(body)
+            while self.disk_size > self.disk_bytes and len(self.disk) > 1:
+                old_key, old_size = self.disk.popitem(last=False)
+                self.disk_size -= old_size
+                self.evictions += 1
+                for suffix in ('.body', '.json'):
+                    try:
+                        os.remove(os.path.join(self.folder, old_key + suffix))
+                    except OSError:
+                        pass
+
+def read_der_element(data, offset):
+    """(tag, start of content, end of content) of the DER element at offset"""
+    tag = data[offset]
+    length = data[offset + 1]
+    offset += 2
+    if length & 0x80:
+        count = length & 0x7f
+        length = int.from_bytes(data[offset:offset + count], 'big')
+        offset += count
+    return tag, offset, offset + length
+
+def certificate_spki_hash(cert_path):
+    """Base64 SHA-256 of a PEM certificate's public key (SubjectPublicKeyInfo), the format of
+    Chrome's --ignore-certificate-errors-spki-list"""
+    with open(cert_path, 'r', encoding='ascii') as f:
+        der = ssl.PEM_cert_to_DER_cert(f.read())
+    _, offset, _ = read_der_element(der, 0)  # Certificate
+    _, offset, _ = read_der_element(der, offset)  # TBSCertificate
+    if der[offset] == 0xa0:  # [0] version
+        offset = read_der_element(der, offset)[2]
+    # serialNumber, signature, issuer, validity, subject - then subjectPublicKeyInfo
+    for _ in range(5):
+        offset = read_der_element(der, offset)[2]
+    end = read_der_element(der, offset)[2]
+    return base64.b64encode(hashlib.sha256(der[offset:end]).digest()).decode('ascii')
+
+def ensure_spki_hash(cert_path):
+    """Public key hash of the proxy certificate, computed once and kept next to it"""
+    spki_path = os.path.splitext(cert_path)[0] + '.spki'
+    if os.path.exists(spki_path) and os.path.getmtime(spki_path) >= os.path.getmtime(cert_path):
+        with open(spki_path, 'r', encoding='ascii') as f:
+            return f.read().strip()
+    spki_hash = certificate_spki_hash(cert_path)
+    with open(spki_path, 'w', encoding='ascii') as f:
+        f.write(spki_hash)
+    return spki_hash
+
+def ensure_certificate(folder):
+    """Create (once) the self-signed certificate used for decrypted hosts
+
+    Returns (cert path, key path), or None if no certificate can be made
+    (needs the 'cryptography' package or the openssl command).
+    """
+    cert_path = os.path.join(folder, 'proxy_cert.pem')
+    key_path = os.path.join(folder, 'proxy_key.pem')
+    if os.path.exists(cert_path) and os.path.exists(key_path):
+        return cert_path, key_path
+    try:
+        import datetime
+        from cryptography import x509
+        from cryptography.x509.oid import NameOID
+        from cryptography.hazmat.primitives import hashes, serialization
+        from cryptography.hazmat.primitives.asymmetric import rsa
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "Scraper asset proxy")])
+        now = datetime.datetime.now(datetime.timezone.utc)
+        cert = (x509.CertificateBuilder().subject_name(name).issuer_name(name).public_key(key.public_key())
+                .serial_number(x509.random_serial_number())
+                .not_valid_before(now - datetime.timedelta(days=1)).not_valid_after(now + datetime.timedelta(days=3650))
+                .add_extension(x509.SubjectAlternativeName([x509.DNSName(host) for host in PROXY_CACHE_HOSTS]), critical=False)
+                .sign(key, hashes.SHA256()))
+        with open(key_path, 'wb') as f:
+            f.write(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.TraditionalOpenSSL, serialization.NoEncryption()))
+        with open(cert_path, 'wb') as f:
+            f.write(cert.public_bytes(serialization.Encoding.PEM))
+        return cert_path, key_path
+    except ImportError:
+        pass
+    try:
+        subprocess.run(['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '3650',
+                        '-subj', '/CN=Scraper asset proxy', '-keyout', key_path, '-out', cert_path],
+                       check=True, capture_output=True, timeout=60)
+        return cert_path, key_path
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+class AssetProxyHandler(BaseHTTPRequestHandler):
+    """Forward proxy request handler (the server object carries the cache and counters)"""
+    protocol_version = 'HTTP/1.1'
+    tunnel_host = None  # Set inside a decrypted CONNECT tunnel
+
+    def log_message(self, format, *args):
+        pass  # Keep the console quiet
+
+    def send_body(self, status, headers, body):
+        self.send_response(status)
+        for name, value in headers:
+            if name.lower() not in HOP_BY_HOP_HEADERS and name.lower() != 'content-length':
+                self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def do_CONNECT(self):
+        host, _, port = self.path.partition(':')
+        port = int(port or 443)
+        self.server.count('tunnels')
+        if host.lower() in self.server.cache_hosts and self.server.ssl_context is not None:
+            # Decrypt: answer the tunnel ourselves and read the HTTP requests inside it
+            self.send_response(200, 'Connection Established')
+            self.end_headers()
+            try:
+                self.connection = self.server.ssl_context.wrap_socket(self.connection, server_side=True)
+            except (ssl.SSLError, OSError):
+                self.close_connection = True
+                return
+            self.rfile = self.connection.makefile('rb', self.rbufsize)
+            self.wfile = self.connection.makefile('wb', 0)
+            self.tunnel_host = host if port == 443 else f"{host}:{port}"
+            self.close_connection = False
+            return
+        # Any other host: plain byte tunnel
+        try:
+            upstream = socket.create_connection((host, port), timeout=UPSTREAM_TIMEOUT)
+        except OSError:
+            self.send_error(502)
+            return
+        self.send_response(200, 'Connection Established')
+        self.end_headers()
+        self.close_connection = True
+        sockets = [self.connection, upstream]
+        try:
+            while True:
+                readable, _, errored = select.select(sockets, [], sockets, 60)
+                if errored or not readable:
+                    break
+                for sock in readable:
+                    data = sock.recv(65536)
+                    if not data:
+                        return
+                    (upstream if sock is self.connection else self.connection).sendall(data)
+        except OSError:
+            pass
+        finally:
+            upstream.close()
+
+    def request_url(self):
+        if self.tunnel_host:
+            return f"https://{self.tunnel_host}{self.path}"
+        return self.path  # Plain HTTP proxy requests carry the full URL
+
+    def do_GET(self):
+        if not self.tunnel_host and self.path.startswith('/__stats'):
+            self.send_body(200, [('Content-Type', 'application/json')], json.dumps(self.server.stats()).encode('utf-8'))
+            return
+        url = self.request_url()
+        cacheable = self.command == 'GET' and is_cacheable_url(url)
+        entry = None
+        if cacheable:
+            level, entry = self.server.cache.get(url)
+            if entry is not None:
+                if self.server.clock() - entry[3] < freshness_lifetime(url, entry[1]):
+                    self.server.count(f'{level}_hits', bytes_from_cache=len(entry[2]))
+                    self.send_body(*entry[:3])
+                    return
+                if not has_validator(entry[1]):
+                    entry = None  # Stale and can't be revalidated: download it again
+        try:
+            status, headers, body = self.fetch_upstream(url, self.validator_headers(entry) if entry else None)
+        except (OSError, http.client.HTTPException):
+            self.server.count('errors')
+            self.send_error(502)
+            return
+        if entry is not None and status == 304:
+            headers = updated_headers(entry[1], headers)
+            self.server.cache.refresh(url, entry, headers, self.server.clock() - response_age(headers))
+            self.server.count('revalidated', bytes_from_cache=len(entry[2]))
+            self.send_body(entry[0], headers, entry[2])
+            return
+        if cacheable:
+            self.server.count('misses')
+            if is_cacheable_response(url, status, headers):
+                self.server.cache.put(url, status, headers, body, self.server.clock() - response_age(headers))
+                self.server.count('stored')
+        else:
+            self.server.count('passed_through')
+        self.send_body(status, headers, body)
+
+    def validator_headers(self, entry):
+        """Conditional request headers that ask whether a cached response is still current"""
+        headers = {}
+        etag = header_value(entry[1], 'etag')
+        if etag:
+            headers['If-None-Match'] = etag
+        last_modified = header_value(entry[1], 'last-modified')
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+        return headers
+
+    do_HEAD = do_GET
+    do_POST = do_GET
+    do_PUT = do_GET
+    do_DELETE = do_GET
+    do_OPTIONS = do_GET
+    do_PATCH = do_GET
+
+    def fetch_upstream(self, url, conditional_headers=None):
+        """Send the request on to the real server, returns (status, headers, body)
+
+        conditional_headers replace the browser's own If-* headers (revalidating a cached file).
+        """
+        parts = urlsplit(url)
+        if parts.scheme == 'https':
+            connection = http.client.HTTPSConnection(parts.hostname, parts.port or 443, timeout=UPSTREAM_TIMEOUT,
+                                                     context=self.server.upstream_ssl_context)
+        else:
+            connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=UPSTREAM_TIMEOUT)
+        path = parts.path or '/'
+        if parts.query:
+            path += '?' + parts.query
+        length = int(self.headers.get('Content-Length') or 0)
+        request_body = self.rfile.read(length) if length else None
+        headers = {name: value for name, value in self.headers.items() if name.lower() not in HOP_BY_HOP_HEADERS}
+        if conditional_headers is not None:
+            headers = {name: value for name, value in headers.items() if name.lower() not in CONDITIONAL_HEADERS}
+            headers.update(conditional_headers)
+        try:
+            connection.request(self.command, path, body=request_body, headers=headers)
+            response = connection.getresponse()
+            body = response.read()
+            return response.status, [(name, value) for name, value in response.getheaders() if name.lower() not in HOP_BY_HOP_HEADERS], body
+        finally:
+            connection.close()
+
+class AssetProxy(ThreadingHTTPServer):
+    """The proxy server: start() runs it on a background thread, stop() shuts it down"""
+    daemon_threads = True
+
+    def __init__(self, cache_folder, port=PROXY_PORT, cache_hosts=None, clock=time.time):
+        super().__init__(("127.0.0.1", port), AssetProxyHandler)
+        self.cache = AssetCache(cache_folder)
+        self.cache_hosts = {host.lower() for host in (cache_hosts if cache_hosts is not None else PROXY_CACHE_HOSTS)}
+        self.clock = clock  # Freshness of cached files is measured on this clock
+        self.counters = {'memory_hits': 0, 'disk_hits': 0, 'revalidated': 0, 'misses': 0, 'stored': 0, 'passed_through': 0,
+                         'tunnels': 0, 'errors': 0, 'bytes_from_cache': 0}
+        self.counter_lock = threading.Lock()
+        self.started = time.time()
+        self.upstream_ssl_context = ssl.create_default_context()
+        self.ssl_context = None
+        self.spki_hash = None  # Chrome accepts only this certificate (--ignore-certificate-errors-spki-list)
+        certificate = ensure_certificate(cache_folder) if self.cache_hosts else None
+        if certificate:
+            self.ssl_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            self.ssl_context.load_cert_chain(*certificate)
+            self.spki_hash = ensure_spki_hash(certificate[0])
+        elif self.cache_hosts:
+            print("Warning: Asset proxy can't make a certificate (needs 'cryptography' or openssl) - HTTPS files are not cached")
+        self.thread = None
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def count(self, name, bytes_from_cache=0):
+        with self.counter_lock:
+            self.counters[name] += 1
+            self.counters['bytes_from_cache'] += bytes_from_cache
+
+    def stats(self):
+        with self.counter_lock:
+            stats = dict(self.counters)
+        hits = stats['memory_hits'] + stats['disk_hits'] + stats['revalidated']
+        lookups = hits + stats['misses']
+        stats['hit_rate'] = round(hits / lookups, 3) if lookups else 0.0
+        stats['memory_entries'] = len(self.cache.memory)
+        stats['disk_entries'] = len(self.cache.disk)
+        stats['disk_mb'] = round(self.cache.disk_size / (1024 * 1024), 1)
+        stats['evictions'] = self.cache.evictions
+        stats['decrypts_https'] = self.ssl_context is not None
+        stats['certificate_spki'] = self.spki_hash
+        stats['uptime_seconds'] = round(time.time() - self.started)
+        return stats
+
+    def start(self):
+        self.thread = threading.Thread(target=self.serve_forever, name="asset-proxy", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+def fetch_stats(port=PROXY_PORT, timeout=2):
+    """Counters of a proxy running on this computer (None if no asset proxy answers on the port)"""
+    try:
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=timeout)
+        connection.request("GET", "/__stats")
+        response = connection.getresponse()
+        data = response.read()
+        connection.close()
+        return json.loads(data) if response.status == 200 else None
+    except (OSError, ValueError, http.client.HTTPException):
+        return None
+
+def main():
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else PROXY_PORT
+    cache_folder = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "AssetCache")
+    proxy = AssetProxy(cache_folder, port).start()
+    print(f"Asset proxy running on 127.0.0.1:{port}, cache in {cache_folder} (Ctrl+C to stop)")
+    print(f"Counters: http://127.0.0.1:{port}/__stats")
+    try:
+        while True:
+            time.sleep(60)
+            stats = proxy.stats()
+            print(f"  hits: {stats['memory_hits']} memory / {stats['disk_hits']} disk / {stats['revalidated']} revalidated, misses: {stats['misses']}, "
+                  f"passed through: {stats['passed_through']}, cache: {stats['disk_mb']} MB")
+    except KeyboardInterrupt:
+        proxy.stop()
+
+if __name__ == "__main__":
+    main()
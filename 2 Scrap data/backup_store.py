@@ -0,0 +1,378 @@
+"""Deduplicated workbook backups, shared by the scraper and the categorizer
+
+Copying the whole workbook on every run fills the Backups folder with near-identical
+files. Here a backup is a small manifest plus compressed chunks of the workbook file:
+- An .xlsx is a zip of XML parts. A part that deflates back to exactly the same bytes
+  (as the ones pandas writes do) is stored inflated, cut before rows (<row>, <si>) chosen
+  by their content, so a cell that changed only changes the chunk around it. Everything
+  else (zip headers, parts Excel compressed its own way) is stored as it is, in blocks of
+  BLOCK_BYTES
+- Each chunk is stored once under the SHA-256 of its bytes (Backups/chunks), so a backup
+  only adds the chunks that changed since any earlier backup - an unchanged workbook adds
+  nothing
+- The manifest (Backups/manifests/<tool>_<YYYYMMDD_HHMMSS>.json) lists the chunk hashes
+  and the SHA-256 of the whole file, so any backup can be put back together on its own -
+  byte for byte, with its formatting, every sheet and the exact cell types
+- The file is read on the calling thread and stored by a background thread
+- One retention policy for every tool: the last KEEP_LAST backups of each tool, plus the
+  newest backup of each of the last KEEP_DAILY days. Chunks no backup uses any more are
+  deleted
+
+Usage:
+    python backup_store.py list [tool]                 show the backups
+    python backup_store.py restore WHEN [output.xlsx]  restore a backup (id, or the newest one at or
+                                                       before a time like "2026-01-13 00:30")
+    python backup_store.py prune                       apply the retention policy now
+    python backup_store.py import-legacy               move old *_backup_*.xlsx copies into the store
+"""
+import hashlib
+import io
+import json
+import os
+import struct
+import sys
+import threading
+import time
+import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+DEFAULT_FOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Backups")
+BLOCK_BYTES = 64 * 1024  # Largest stored block of the workbook file
+KEEP_LAST = 5  # Backups kept per tool
+KEEP_DAILY = 7  # Days for which the newest backup of the day is kept
+CHUNK_GRACE_SECONDS = 3600  # Unused chunks younger than this are kept (a backup may be writing them)
+
+ROW_MARKERS = (b"<row ", b"<si>")  # Rows of a sheet, entries of the shared strings
+CUT_EVERY = 256  # About one row in this many starts a new chunk (chosen by the row's first bytes)
+DEFLATE_LEVEL = 6  # Level zipfile (and so pandas) deflates workbook parts with
+
+def fixed_blocks(data, block_bytes=BLOCK_BYTES):
+    return [data[start:start + block_bytes] for start in range(0, len(data), block_bytes)]
+
+def row_blocks(data, block_bytes=BLOCK_BYTES):
+    """Blocks of an XML part, cut before rows picked by their own bytes (so cuts survive edits elsewhere)"""
+    cuts = {0, len(data)}
+    for marker in ROW_MARKERS:
+        position = data.find(marker)
+        while position != -1:
+            if zlib.crc32(data[position:position + 32]) % CUT_EVERY == 0:
+                cuts.add(position)
+            position = data.find(marker, position + 1)
+    cuts = sorted(cuts)
+    return [block for start, end in zip(cuts, cuts[1:]) for block in fixed_blocks(data[start:end], block_bytes)]
+
+def deflate(data, level=DEFLATE_LEVEL):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    return compressor.compress(data) + compressor.flush()
+
+def file_parts(data, block_bytes=BLOCK_BYTES):
+    """Parts of a file as (deflate level or None, blocks): joined (and deflated) in order they are the file"""
+    parts = []
+    raw_start = 0
+    try:
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            members = sorted(archive.infolist(), key=lambda info: info.header_offset)
+    except zipfile.BadZipFile:
+        members = []  # Not a zip: stored as it is
+    for info in members:
+        if info.compress_type != zipfile.ZIP_DEFLATED or info.file_size < block_bytes:
+            continue
+        name_length, extra_length = struct.unpack("<HH", data[info.header_offset + 26:info.header_offset + 30])
+        start = info.header_offset + 30 + name_length + extra_length
+        end = start + info.compress_size
+        try:
+            plain = zlib.decompress(data[start:end], -15)
+        except zlib.error:
+            continue
+        if deflate(plain) != data[start:end]:
+            continue  # Written by another deflater (Excel) - only the exact bytes would restore it
+        parts.append((None, fixed_blocks(data[raw_start:start], block_bytes)))
+        parts.append((DEFLATE_LEVEL, row_blocks(plain, block_bytes)))
+        raw_start = end
+    parts.append((None, fixed_blocks(data[raw_start:], block_bytes)))
+    return [(level, blocks) for level, blocks in parts if blocks]
+
+def manifest_chunks(manifest):
+    """Chunk hashes a manifest uses (backups of earlier versions list them per column)"""
+    if "parts" in manifest:
+        return {digest for part in manifest["parts"] for digest in part["blocks"]}
+    return {digest for column in manifest.get("columns", []) for digest in column["blocks"]}
+
+def write_file_atomic(path, data):
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(data)
+    os.replace(temp_path, path)
+
+class BackupStore:
+    """Manifests and content-addressed chunks in one backup folder (thread-safe)"""
+
+    def __init__(self, folder=DEFAULT_FOLDER, keep_last=KEEP_LAST, keep_daily=KEEP_DAILY, block_bytes=BLOCK_BYTES):
+        self.folder = folder
+        self.chunk_folder = os.path.join(folder, "chunks")
+        self.manifest_folder = os.path.join(folder, "manifests")
+        self.keep_last = keep_last
+        self.keep_daily = keep_daily
+        self.block_bytes = block_bytes
+        self.lock = threading.Lock()
+        os.makedirs(self.chunk_folder, exist_ok=True)
+        os.makedirs(self.manifest_folder, exist_ok=True)
+
+    def chunk_path(self, digest):
+        return os.path.join(self.chunk_folder, digest[:2], digest + ".z")
+
+    def put_chunk(self, data):
+        """Store a block once, returns (hash, bytes written - 0 if it was already stored)"""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.chunk_path(digest)
+        if os.path.exists(path):
+            os.utime(path)  # Recently used - see CHUNK_GRACE_SECONDS
+            return digest, 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        compressed = zlib.compress(data, 6)
+        write_file_atomic(path, compressed)
+        return digest, len(compressed)
+
+    def get_chunk(self, digest):
+        with open(self.chunk_path(digest), "rb") as f:
+            return zlib.decompress(f.read())
+
+    def backup(self, data, tool, source=None, created=None):
+        """Store a backup of a file's bytes, returns its manifest (with 'new_bytes' and 'seconds')"""
+        started = time.time()
+        created = created or datetime.now()
+        parts = []
+        new_bytes = 0
+        with self.lock:
+            for level, blocks in file_parts(data, self.block_bytes):
+                hashes = []
+                for block in blocks:
+                    digest, written = self.put_chunk(block)
+                    hashes.append(digest)
+                    new_bytes += written
+                parts.append({"deflate": level, "blocks": hashes} if level is not None else {"blocks": hashes})
+            backup_id = f"{tool}_{created.strftime('%Y%m%d_%H%M%S')}"
+            suffix = 1
+            while os.path.exists(os.path.join(self.manifest_folder, backup_id + ".json")):
+                suffix += 1
+                backup_id = f"{tool}_{created.strftime('%Y%m%d_%H%M%S')}_{suffix}"
+            manifest = {"id": backup_id, "tool": tool, "created": created.isoformat(timespec="seconds"),
+                        "source": source, "size": len(data), "sha256": hashlib.sha256(data).hexdigest(),
+                        "parts": parts}
+            # The manifest is written last - a backup cut off by a crash is never listed
+            write_file_atomic(os.path.join(self.manifest_folder, backup_id + ".json"),
+                              json.dumps(manifest, indent=1).encode('utf-8'))
+        return dict(manifest, new_bytes=new_bytes, seconds=time.time() - started)
+
+    def manifests(self, tool=None):
+        """Manifests of every backup (of one tool), oldest first"""
+        found = []
+        for name in os.listdir(self.manifest_folder):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.manifest_folder, name), "r", encoding="utf-8") as f:
+                    manifest = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if tool is None or manifest["tool"] == tool:
+                found.append(manifest)
+        return sorted(found, key=lambda manifest: (manifest["created"], manifest["id"]))
+
+    def find(self, when, tool=None):
+        """Manifest of a backup id, or of the newest backup at or before a time (None if there is none)"""
+        manifests = self.manifests(tool)
+        for manifest in manifests:
+            if manifest["id"] == when:
+                return manifest
+        try:
+            point = datetime.fromisoformat(when) if when else datetime.now()
+        except ValueError:
+            return None
+        earlier = [manifest for manifest in manifests if datetime.fromisoformat(manifest["created"]) <= point]
+        return earlier[-1] if earlier else None
+
+    def load(self, manifest):
+        """Bytes of a backed-up file (blocks are read in parallel), checked against its SHA-256"""
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            blocks = dict(zip(manifest_chunks(manifest), pool.map(self.get_chunk, manifest_chunks(manifest))))
+        if "parts" not in manifest:
+            return self.load_columns(manifest, blocks)
+        data = []
+        for part in manifest["parts"]:
+            content = b"".join(blocks[digest] for digest in part["blocks"])
+            data.append(deflate(content, part["deflate"]) if "deflate" in part else content)
+        data = b"".join(data)
+        if hashlib.sha256(data).hexdigest() != manifest["sha256"]:
+            raise ValueError(f"{manifest['id']} is damaged (its chunks don't add up to the backed-up file)")
+        return data
+
+    def load_columns(self, manifest, blocks):
+        """Workbook of a backup stored by an earlier version (cell values per column, no formatting)"""
+        import pandas as pd
+        data = {}
+        for column in manifest["columns"]:
+            values = [value for digest in column["blocks"] for value in json.loads(blocks[digest].decode('utf-8'))]
+            series = pd.Series(values, dtype=object)
+            try:
+                series = series.astype(column["dtype"])
+            except (TypeError, ValueError):
+                pass  # Mixed cells stay as they were read
+            data[column["name"]] = series
+        output = io.BytesIO()
+        pd.DataFrame(data).to_excel(output, index=False)
+        return output.getvalue()
+
+    def restore(self, manifest, output):
+        """Write a backup to a file (through a temp file, so output is never half-written), returns its size"""
+        data = self.load(manifest)
+        write_file_atomic(output, data)
+        return len(data)
+
+    def prune(self):
+        """Apply the retention policy, returns (backups removed, chunks removed, bytes freed)"""
+        with self.lock:
+            manifests = self.manifests()
+            keep = set()
+            today = datetime.now().date()
+            for tool in {manifest["tool"] for manifest in manifests}:
+                own = [manifest for manifest in manifests if manifest["tool"] == tool]
+                keep.update(manifest["id"] for manifest in own[-self.keep_last:])
+                newest_of_day = {}
+                for manifest in own:
+                    day = datetime.fromisoformat(manifest["created"]).date()
+                    if (today - day).days < self.keep_daily:
+                        newest_of_day[day] = manifest["id"]
+                keep.update(newest_of_day.values())
+            removed = 0
+            used = set()
+            for manifest in manifests:
+                if manifest["id"] in keep:
+                    used.update(manifest_chunks(manifest))
+                else:
+                    os.remove(os.path.join(self.manifest_folder, manifest["id"] + ".json"))
+                    removed += 1
+            removed_chunks = 0
+            freed = 0
+            cutoff = time.time() - CHUNK_GRACE_SECONDS
+            for prefix in os.listdir(self.chunk_folder):
+                prefix_folder = os.path.join(self.chunk_folder, prefix)
+                if not os.path.isdir(prefix_folder):
+                    continue
+                for name in os.listdir(prefix_folder):
+                    path = os.path.join(prefix_folder, name)
+                    if name[:-2] in used or not name.endswith(".z") or os.path.getmtime(path) > cutoff:
+                        continue
+                    freed += os.path.getsize(path)
+                    os.remove(path)
+                    removed_chunks += 1
+        return removed, removed_chunks, freed
+
+    def size(self):
+        """(backups, chunks, bytes on disk)"""
+        chunks = 0
+        total = 0
+        for prefix in os.listdir(self.chunk_folder):
+            prefix_folder = os.path.join(self.chunk_folder, prefix)
+            if os.path.isdir(prefix_folder):
+                for name in os.listdir(prefix_folder):
+                    chunks += 1
+                    total += os.path.getsize(os.path.join(prefix_folder, name))
+        return len(self.manifests()), chunks, total
+
+    def import_legacy(self):
+        """Store the old full-copy backups (<tool>_backup_YYYYMMDD_HHMMSS.xlsx) and delete them, returns how many"""
+        imported = 0
+        for name in sorted(os.listdir(self.folder)):
+            stem, ext = os.path.splitext(name)
+            tool, marker, stamp = stem.rpartition("_backup_")
+            if ext != ".xlsx" or not marker:
+                continue
+            try:
+                created = datetime.strptime(stamp, "%Y%m%d_%H%M%S")
+            except ValueError:
+                continue
+            path = os.path.join(self.folder, name)
+            with open(path, "rb") as f:
+                data = f.read()
+            manifest = self.backup(data, tool, source=path, created=created)
+            if self.load(manifest) != data:
+                raise RuntimeError(f"Backup of {name} could not be read back - the file was kept")
+            os.remove(path)
+            imported += 1
+            print(f"Imported {name} ({manifest['new_bytes'] / 1024:.1f} KB new)")
+        return imported
+
+# Backups being written in the background
+backup_threads = []
+backup_threads_lock = threading.Lock()
+
+def backup_in_background(path, tool, folder=DEFAULT_FOLDER):
+    """Read a file now and store it (then prune old backups) on a background thread
+
+    Returns the thread, or None if the file doesn't exist.
+    """
+    if not os.path.exists(path):
+        print(f"Warning: {os.path.basename(path)} not found, skipping backup...")
+        return None
+    with open(path, "rb") as f:
+        data = f.read()
+
+    def run():
+        try:
+            store = BackupStore(folder)
+            manifest = store.backup(data, tool, path)
+            removed, _, freed = store.prune()
+            print(f"\nBackup created: {manifest['id']} ({manifest['new_bytes'] / 1024:.1f} KB new data, "
+                  f"{manifest['seconds']:.1f}s){f', removed {removed} old backups' if removed else ''}")
+        except Exception as e:
+            print(f"\nError creating backup: {e}")
+
+    thread = threading.Thread(target=run, name=f"backup-{tool}")
+    with backup_threads_lock:
+        backup_threads.append(thread)
+    thread.start()
+    return thread
+
+def wait_for_backups():
+    """Wait until every background backup is written"""
+    with backup_threads_lock:
+        threads = list(backup_threads)
+        backup_threads.clear()
+    for thread in threads:
+        thread.join()
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in ("list", "restore", "prune", "import-legacy") \
+            or (sys.argv[1] == "restore" and len(sys.argv) < 3):
+        print(__doc__.split("Usage:")[1])
+        sys.exit(1)
+    store = BackupStore()
+    command = sys.argv[1]
+    if command == "list":
+        for manifest in store.manifests(sys.argv[2] if len(sys.argv) > 2 else None):
+            size = f"{manifest['size'] / 1024:.0f} KB" if "size" in manifest else f"{manifest['rows']} rows"
+            print(f"{manifest['id']:45} {manifest['created'].replace('T', ' ')}  {size}")
+        backups, chunks, total = store.size()
+        print(f"\n{backups} backups in {chunks} chunks, {total / (1024 * 1024):.1f} MB")
+    elif command == "restore":
+        manifest = store.find(sys.argv[2])
+        if manifest is None:
+            print(f"No backup matches '{sys.argv[2]}' (use an id from 'list' or a time like \"2026-01-13 00:30\")")
+            sys.exit(1)
+        output = sys.argv[3] if len(sys.argv) > 3 else os.path.join(store.folder, f"{manifest['id']}_restored.xlsx")
+        started = time.time()
+        size = store.restore(manifest, output)
+        print(f"Restored {manifest['id']} ({size / 1024:.0f} KB) to {output} in {time.time() - started:.1f}s")
+    elif command == "prune":
+        removed, chunks, freed = store.prune()
+        print(f"Removed {removed} backups and {chunks} chunks ({freed / (1024 * 1024):.1f} MB freed)")
+    else:
+        imported = store.import_legacy()
+        removed, _, _ = store.prune()
+        print(f"Imported {imported} backups, removed {removed} by the retention policy")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Benchmark: Chrome cold start and first product page, temporary vs persistent profile
+
+Starts Chrome a few times with each kind of profile, opens one product and prints how long
+the start and the first page took. The persistent runs use their own profile slot
+(ChromeProfiles/slot_90), so the scraper's profiles are left alone.
+
+Usage:
+    python benchmark_profiles.py [rounds] [product link]
+"""
+import io
+import sys
+import time
+from contextlib import redirect_stdout
+
+import scrape_products as scraper
+
+BENCHMARK_SLOT = 90
+DEFAULT_LINK = "https://www.biggestbook.com/ui#/itemDetail?itemId=BOB33041"
+
+def time_cold_start(link, persistent):
+    """Start a browser, scrape one product, quit. Returns (start seconds, first page seconds)"""
+    scraper.PERSISTENT_PROFILES = persistent
+    scraper.STANDBY_DRIVERS = 0  # A standby starting in the background would skew the timings
+    slot = scraper.DriverSlot(BENCHMARK_SLOT)
+    try:
+        with redirect_stdout(io.StringIO()):
+            start = time.time()
+            scraper.setup_driver(slot)
+            started = time.time()
+            scraper.scrape_product_data(link, "EA", slot=slot)
+            done = time.time()
+    finally:
+        slot.quit()
+    return started - start, done - started
+
+def average(values):
+    return sum(values) / len(values) if values else 0.0
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    link = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_LINK
+    print(f"Benchmarking {rounds} cold starts per profile type with {link}\n")
+
+    results = {}
+    for persistent in (False, True):
+        name = "persistent" if persistent else "temporary"
+        times = []
+        for round_number in range(1, rounds + 1):
+            start_seconds, page_seconds = time_cold_start(link, persistent)
+            times.append((start_seconds, page_seconds))
+            print(f"  {name:10} round {round_number}: start {start_seconds:.2f}s, first page {page_seconds:.2f}s")
+        results[name] = times
+
+    # The first persistent round fills the cache (prewarm), the rest show the warm start
+    temporary = results["temporary"]
+    warm = results["persistent"][1:] or results["persistent"]
+    temp_start, temp_page = average([t[0] for t in temporary]), average([t[1] for t in temporary])
+    warm_start, warm_page = average([t[0] for t in warm]), average([t[1] for t in warm])
+    print(f"\n{'':12}{'start':>10}{'first page':>14}{'total':>10}")
+    print(f"{'temporary':12}{temp_start:>9.2f}s{temp_page:>13.2f}s{temp_start + temp_page:>9.2f}s")
+    print(f"{'persistent':12}{warm_start:>9.2f}s{warm_page:>13.2f}s{warm_start + warm_page:>9.2f}s")
+    print(f"\nSaved per cold start: {temp_start - warm_start:.2f}s start, {temp_page - warm_page:.2f}s first page "
+          f"({(temp_start + temp_page) - (warm_start + warm_page):.2f}s total)")
+
+if __name__ == "__main__":
+    main()
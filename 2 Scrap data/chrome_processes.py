@@ -0,0 +1,134 @@
+"""Chrome and chromedriver processes: memory use and cleaning up leftovers
+
+Every driver is a chromedriver process with a Chrome browser below it, which again starts
+a renderer, GPU and utility processes. driver.quit() normally ends them all, but a crashed
+session or a killed scraper leaves them running, and over a long run they add up.
+
+Needs psutil (pip install psutil). Without it the functions return nothing and nothing is
+killed - the scraper then works as before.
+"""
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+def driver_pid(driver):
+    """PID of a driver's chromedriver process (None if unknown)"""
+    try:
+        return driver.service.process.pid
+    except AttributeError:
+        return None
+
+def process_tree_pids(pid):
+    """PIDs of a process and everything it started (empty without psutil or if it's gone)"""
+    if psutil is None or pid is None:
+        return set()
+    try:
+        process = psutil.Process(pid)
+        return {pid} | {child.pid for child in process.children(recursive=True)}
+    except psutil.Error:
+        return set()
+
+def process_tree_memory_mb(pid):
+    """Resident memory of a process and everything it started, in MB (None without psutil)"""
+    if psutil is None or pid is None:
+        return None
+    total = 0
+    try:
+        process = psutil.Process(pid)
+        processes = [process] + process.children(recursive=True)
+    except psutil.Error:
+        return None
+    for process in processes:
+        try:
+            total += process.memory_info().rss
+        except psutil.Error:
+            pass  # Ended while counting
+    return total / (1024 * 1024)
+
+def kill_processes(pids, grace_seconds=0):
+    """Kill the processes that are still running after grace_seconds, returns how many were killed"""
+    if psutil is None:
+        return 0
+    processes = []
+    for pid in pids:
+        try:
+            processes.append(psutil.Process(pid))
+        except psutil.Error:
+            pass  # Already gone
+    if grace_seconds and processes:
+        _, processes = psutil.wait_procs(processes, timeout=grace_seconds)
+    killed = 0
+    for process in processes:
+        try:
+            process.kill()
+            killed += 1
+        except psutil.Error:
+            pass  # Ended in the meantime (or not ours)
+    return killed
+
+def kill_driver(driver):
+    """Kill a driver's chromedriver and browser processes at once, without talking to the driver
+
+    For a browser that stopped answering: driver.quit() would block like every other call.
+    Without psutil only chromedriver is killed (its browser is then cleaned up as an orphan).
+    """
+    pids = process_tree_pids(driver_pid(driver))
+    if pids:
+        return kill_processes(pids)
+    try:
+        driver.service.process.kill()
+        return 1
+    except (AttributeError, OSError):
+        return 0
+
+def is_orphaned(process):
+    """True when the process that started this one is gone (or the PID now belongs to a newer process)"""
+    try:
+        parent = process.parent()
+        if parent is None or parent.pid == 1:
+            return True
+        return parent.create_time() > process.create_time()
+    except psutil.Error:
+        return False
+
+def find_orphaned_browsers():
+    """chromedriver processes and automated Chrome browsers whose owner process is gone
+
+    Only browsers started for automation (--enable-automation) are considered, so a normal
+    Chrome window is never touched. Drivers of other running scrapers still have their
+    parent, so they aren't orphaned.
+    """
+    if psutil is None:
+        return []
+    orphans = []
+    try:
+        user = psutil.Process().username()
+    except psutil.Error:
+        return []
+    for process in psutil.process_iter(['name', 'cmdline', 'username']):
+        try:
+            if process.info['username'] != user:
+                continue
+            name = (process.info['name'] or '').lower()
+            cmdline = process.info['cmdline'] or []
+            if 'chromedriver' in name:
+                pass
+            elif 'chrome' in name or 'chromium' in name:
+                # Browser main process only - renderers etc. end with it
+                if '--enable-automation' not in cmdline or any(arg.startswith('--type=') for arg in cmdline):
+                    continue
+            else:
+                continue
+            if is_orphaned(process):
+                orphans.append(process)
+        except psutil.Error:
+            continue
+    return orphans
+
+def reap_orphaned_browsers():
+    """Kill leftover chromedriver/Chrome processes of crashed sessions, returns how many were killed"""
+    pids = set()
+    for process in find_orphaned_browsers():
+        pids |= process_tree_pids(process.pid)
+    return kill_processes(pids)
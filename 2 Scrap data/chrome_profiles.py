@@ -0,0 +1,143 @@
+"""Persistent Chrome profiles, one per driver slot
+
+A profile (Chrome user-data-dir) keeps its HTTP disk cache and JavaScript code cache
+between browser starts, so a new or recreated driver doesn't download and compile the
+website's scripts again before the first product.
+
+Each profile folder holds a 'scraper.lock' file with the PID of the scraper process using
+it. A lock left by a process that no longer runs (crash, killed window) is removed together
+with Chrome's own lock files, so the profile can be reused. A profile that another running
+scraper holds is never touched - the caller falls back to a temporary profile.
+"""
+import json
+import os
+import shutil
+import socket
+import time
+
+LOCK_FILE = "scraper.lock"
+PREWARMED_MARKER = ".prewarmed"
+# Lock files Chrome itself leaves in a profile when it doesn't shut down cleanly
+CHROME_LOCK_FILES = ["SingletonLock", "SingletonSocket", "SingletonCookie", "lockfile"]
+
+def pid_alive(pid):
+    """Check if a process is still running (never sends a signal to it)"""
+    try:
+        import psutil
+        return psutil.pid_exists(pid)
+    except ImportError:
+        pass
+    if os.name == 'nt':
+        # os.kill would terminate the process on Windows - ask the kernel instead
+        import ctypes
+        handle = ctypes.windll.kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        exit_code = ctypes.c_ulong()
+        ctypes.windll.kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code))
+        ctypes.windll.kernel32.CloseHandle(handle)
+        return exit_code.value == 259  # STILL_ACTIVE
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def read_lock(profile_dir):
+    """Return the lock info dict of a profile (None if it isn't locked or the file is unreadable)"""
+    try:
+        with open(os.path.join(profile_dir, LOCK_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def lock_is_stale(lock):
+    """A lock is stale when the process that wrote it (on this computer) is gone"""
+    if lock is None:
+        return True
+    if lock.get("host") != socket.gethostname():
+        return False  # Shared folder - can't check a process on another computer
+    return not pid_alive(lock.get("pid", -1))
+
+def clean_stale_profile(profile_dir):
+    """Remove the lock files a crashed session left behind and mark the last exit as clean"""
+    for name in [LOCK_FILE] + CHROME_LOCK_FILES:
+        path = os.path.join(profile_dir, name)
+        if os.path.lexists(path):
+            os.remove(path)
+    # Otherwise Chrome starts with a "restore pages?" prompt after a crash
+    preferences_path = os.path.join(profile_dir, "Default", "Preferences")
+    try:
+        with open(preferences_path, "r", encoding="utf-8") as f:
+            preferences = json.load(f)
+        profile = preferences.setdefault("profile", {})
+        if profile.get("exit_type") != "Normal" or not profile.get("exited_cleanly", True):
+            profile["exit_type"] = "Normal"
+            profile["exited_cleanly"] = True
+            with open(preferences_path, "w", encoding="utf-8") as f:
+                json.dump(preferences, f)
+    except (OSError, ValueError):
+        pass  # New profile or unreadable preferences - Chrome recreates them
+
+def acquire_profile(root, slot_index):
+    """Lock the profile folder of a slot for this process
+
+    Returns:
+        The profile folder, or None if another running scraper is using it
+        (or a crashed session's files can't be removed)
+    """
+    profile_dir = os.path.join(root, f"slot_{slot_index}")
+    os.makedirs(profile_dir, exist_ok=True)
+    lock_path = os.path.join(profile_dir, LOCK_FILE)
+    for attempt in range(2):
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            lock = read_lock(profile_dir)
+            if lock and lock.get("pid") == os.getpid() and lock.get("host") == socket.gethostname():
+                return profile_dir  # Already ours (driver recreated in the same run)
+            if attempt or not lock_is_stale(lock):
+                return None
+            print(f"Cleaning up Chrome profile left by a crashed session: {profile_dir}")
+            try:
+                clean_stale_profile(profile_dir)
+            except OSError as e:
+                print(f"Warning: Could not clean up {profile_dir}: {e}")
+                return None
+            continue
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"pid": os.getpid(), "host": socket.gethostname(), "since": time.time()}, f)
+        return profile_dir
+    return None
+
+def release_profile(profile_dir):
+    """Remove this process's lock from a profile (after its Chrome has quit)"""
+    lock = read_lock(profile_dir)
+    if lock and lock.get("pid") == os.getpid():
+        try:
+            os.remove(os.path.join(profile_dir, LOCK_FILE))
+        except OSError:
+            pass
+
+def reset_profile(profile_dir):
+    """Delete a broken profile's contents (the lock stays, so the folder stays ours)"""
+    for name in os.listdir(profile_dir):
+        if name == LOCK_FILE:
+            continue
+        path = os.path.join(profile_dir, name)
+        if os.path.isdir(path) and not os.path.islink(path):
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+def is_prewarmed(profile_dir):
+    return os.path.exists(os.path.join(profile_dir, PREWARMED_MARKER))
+
+def mark_prewarmed(profile_dir):
+    with open(os.path.join(profile_dir, PREWARMED_MARKER), "w", encoding="utf-8") as f:
+        f.write(str(time.time()))
@@ -0,0 +1,214 @@
+"""Latency and outcome history of scraped items, used to order runs and estimate their time
+
+Every scraped item adds one JSON line to the history file: item ID, seconds and outcome.
+When loaded, the lines are folded into running averages per item, per item group (brand
+letters plus the next two characters, e.g. 'BWK90') and per brand ('BWK'). Whole groups
+tend to be slow or to time out together, so an item seen for the first time is estimated
+from its group, then its brand, then the average of everything.
+
+The file is rewritten with one summary line per item when it has grown to several lines
+per item, so it stays about as large as the number of items.
+"""
+import json
+import os
+import re
+import threading
+import time
+
+FAILED_OUTCOMES = ("timeout", "no data")
+GROUP_DIGITS = 2  # Characters after the brand letters that make an item group
+MIN_GROUP_SAMPLES = 3  # Results a group or brand needs before it is trusted for an estimate
+DEFAULT_SECONDS = 5.0  # Estimate when nothing has been scraped yet
+brand_pattern = re.compile(r'^[A-Za-z]+')
+
+def result_outcome(result):
+    """Short outcome name of a scrape result (tuple, or captured page dict in pipeline mode)"""
+    if isinstance(result, dict):
+        return "captured"
+    product_name = result[0]
+    if product_name is None:
+        return "no data"
+    if product_name == "Timeout error":
+        return "timeout"
+    if product_name == "Product not found":
+        return "not found"
+    if product_name == "Unit not matched":
+        return "unit not matched"
+    return "scraped"
+
+def expected_cost(seconds, fail_rate):
+    """Expected seconds per successful scrape - cheap, reliable items have the lowest cost"""
+    return seconds / max(0.05, 1.0 - fail_rate)
+
+def item_groups(item_id):
+    """(group, brand) of an item ID, e.g. ('BWK90', 'BWK') for 'BWK90123' (None if there are no brand letters)"""
+    match = brand_pattern.match(item_id or "")
+    if not match:
+        return None, None
+    brand = match.group(0).upper()
+    return item_id[:len(brand) + GROUP_DIGITS].upper(), brand
+
+def format_duration(seconds):
+    """'1h 05m', '12m 30s' or '45s'"""
+    seconds = int(round(seconds))
+    if seconds >= 3600:
+        return f"{seconds // 3600}h {seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m {seconds % 60:02d}s"
+    return f"{seconds}s"
+
+class Stats:
+    """Running averages of one item, group or brand (a plain mean at first, then a moving average)"""
+    __slots__ = ("count", "seconds", "fail_rate", "outcome", "at")
+
+    def __init__(self, count=0, seconds=0.0, fail_rate=0.0, outcome=None, at=0.0):
+        self.count = count
+        self.seconds = seconds
+        self.fail_rate = fail_rate
+        self.outcome = outcome
+        self.at = at
+
+    def add(self, seconds, failed, outcome=None, at=0.0, weight=0.2):
+        self.count += 1
+        rate = max(1.0 / self.count, weight)
+        self.seconds += rate * (seconds - self.seconds)
+        self.fail_rate += rate * ((1.0 if failed else 0.0) - self.fail_rate)
+        self.outcome = outcome
+        self.at = at
+
+    def merge(self, other):
+        """Fold a summarized item into a group (weighted by result count)"""
+        total = self.count + other.count
+        if total:
+            self.seconds = (self.seconds * self.count + other.seconds * other.count) / total
+            self.fail_rate = (self.fail_rate * self.count + other.fail_rate * other.count) / total
+        self.count = total
+
+class CrawlHistory:
+    """Per-item, per-group and per-brand latency/outcome history (thread-safe)"""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.items = {}  # item_id -> Stats
+        self.groups = {}  # group or brand -> Stats
+        self.overall = Stats()
+        self.lines = 0
+        self._load()
+        if self.lines > 4 * len(self.items) + 1000:
+            self.compact()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    item_id = entry["item"]
+                    if "count" in entry:  # Summary line written by compact()
+                        self.items[item_id] = Stats(entry["count"], entry["seconds"], entry["fail_rate"],
+                                                    entry.get("outcome"), entry.get("at", 0.0))
+                    else:
+                        self.items.setdefault(item_id, Stats()).add(entry["seconds"], entry["outcome"] in FAILED_OUTCOMES,
+                                                                    entry["outcome"], entry.get("at", 0.0))
+                except (ValueError, KeyError, TypeError):
+                    continue  # Half-written line from a crash
+                self.lines += 1
+        # Groups and brands are rebuilt from the items, so a compacted file gives the same estimates
+        for item_id, stats in self.items.items():
+            for key in item_groups(item_id):
+                if key:
+                    self.groups.setdefault(key, Stats()).merge(stats)
+            self.overall.merge(stats)
+
+    def record(self, item_id, seconds, outcome):
+        """Add one scrape result (a captured page counts as a success)"""
+        if not item_id:
+            return
+        failed = outcome in FAILED_OUTCOMES
+        now = time.time()
+        with self.lock:
+            self.items.setdefault(item_id, Stats()).add(seconds, failed, outcome, now)
+            for key in item_groups(item_id):
+                if key:
+                    self.groups.setdefault(key, Stats()).add(seconds, failed, weight=0.05)
+            self.overall.add(seconds, failed, weight=0.05)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"item": item_id, "seconds": round(seconds, 3), "outcome": outcome, "at": round(now)}) + "\n")
+            self.lines += 1
+
+    def estimate(self, item_id):
+        """(expected seconds, failure rate, source) of an item
+
+        source says where the numbers come from: 'item', 'group', 'brand' or 'default'.
+        """
+        with self.lock:
+            stats = self.items.get(item_id)
+            if stats is not None and stats.count:
+                return stats.seconds, stats.fail_rate, "item"
+            group, brand = item_groups(item_id)
+            for key, source in ((group, "group"), (brand, "brand")):
+                stats = self.groups.get(key)
+                if stats is not None and stats.count >= MIN_GROUP_SAMPLES:
+                    return stats.seconds, stats.fail_rate, source
+            if self.overall.count:
+                return self.overall.seconds, self.overall.fail_rate, "default"
+            return DEFAULT_SECONDS, 0.0, "default"
+
+    def worst_groups(self, item_ids, limit=3):
+        """[(group, seconds, failure rate)] of the most expensive groups among item_ids (costlier than average)"""
+        cost = lambda stats: expected_cost(stats.seconds, stats.fail_rate)
+        seen = {}
+        with self.lock:
+            average_cost = cost(self.overall)
+            for item_id in item_ids:
+                group = item_groups(item_id)[0]
+                stats = self.groups.get(group)
+                if group and group not in seen and stats is not None and stats.count >= MIN_GROUP_SAMPLES \
+                        and cost(stats) > average_cost:
+                    seen[group] = stats
+        worst = sorted(seen.items(), key=lambda entry: cost(entry[1]), reverse=True)
+        return [(group, stats.seconds, stats.fail_rate) for group, stats in worst[:limit]]
+
+    def compact(self):
+        """Rewrite the file with one summary line per item"""
+        with self.lock:
+            temp_path = self.path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                for item_id, stats in self.items.items():
+                    f.write(json.dumps({"item": item_id, "count": stats.count, "seconds": round(stats.seconds, 3),
+                                        "fail_rate": round(stats.fail_rate, 4), "outcome": stats.outcome,
+                                        "at": round(stats.at)}) + "\n")
+            os.replace(temp_path, self.path)
+            self.lines = len(self.items)
+
+class RunEstimate:
+    """Time left in a run, from the learned cost of every row still to do
+
+    The learned seconds are scaled by how fast the run actually goes (parallel workers,
+    pauses and a faster or slower website than before), measured on the rows done so far.
+    Until about prior_seconds of learned work is done, the scale leans on the number of
+    parallel workers, so a few odd rows at the start don't swing the estimate.
+    """
+    def __init__(self, expected, parallel=1, prior_seconds=30.0):
+        self.expected = dict(expected)  # key -> expected seconds
+        self.parallel = max(1, parallel)
+        self.remaining = sum(self.expected.values())
+        self.done_expected = 0.0
+        self.prior_seconds = prior_seconds
+        self.started = time.time()
+
+    def done(self, key):
+        seconds = self.expected.pop(key, None)
+        if seconds is not None:
+            self.remaining -= seconds
+            self.done_expected += seconds
+
+    def eta_seconds(self):
+        # Wall seconds per learned second, starting from 1/parallel
+        scale = (time.time() - self.started + self.prior_seconds / self.parallel) / (self.done_expected + self.prior_seconds)
+        return max(0.0, self.remaining) * scale
+
+    def describe(self):
+        return f"ETA {format_duration(self.eta_seconds())}"
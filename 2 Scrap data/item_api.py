@@ -0,0 +1,266 @@
+"""Browserless fetch backend for item details
+
+The item page (https://www.biggestbook.com/ui#/itemDetail?itemId=...) is a single page app
+that loads the product data as JSON and then renders it. This backend calls that JSON
+endpoint directly through one pooled keep-alive HTTP client, so no Chrome is needed for
+products it can answer. It returns the same (product_name, description, image_url, website_unit)
+tuple as scrape_product_data, or None when the browser should be used instead (any status
+other than 200, including 404, and any response it can't read).
+
+Run a local stand-in server that serves recorded responses (one '<item id>.json' per item):
+    python item_api.py serve <recordings folder> [port]
+and point ITEM_API_URL in scrape_products.py at it, e.g. 'http://127.0.0.1:8765/itemDetail?itemId={item_id}'.
+"""
+import asyncio
+import json
+import os
+import sys
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None  # Only needed when the HTTP backend is used
+
+from page_extraction import get_item_id, normalize_unit, choose_product_image, clean_description, build_scrape_result
+
+ITEM_API_HEADERS = {
+    "Accept": "application/json, text/plain, */*",
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Referer": "https://www.biggestbook.com/ui",
+}
+ITEM_API_MAX_CONNECTIONS = 8  # Size of the keep-alive connection pool
+ITEM_API_TIMEOUT = 15  # Seconds per request (same budget as a page load)
+
+# Keys the item-detail JSON may use for each field (searched anywhere in the response, case-insensitive)
+ITEM_FIELD_KEYS = {
+    "unit": ["uom", "unitOfMeasure", "unitOfMeasureCode", "sellUom", "priceUom"],
+    "product_type": ["globalProductType", "productType"],
+    "description": ["description", "longDescription", "marketingDescription", "itemDescription"],
+    "images": ["imageUrl", "imageUrls", "image", "images", "primaryImage", "largeImage"],
+}
+# Label of the attribute holding the product name (the "Product Details" table on the page)
+PRODUCT_TYPE_LABEL = "Global Product Type"
+ATTRIBUTE_VALUE_KEYS = ["value", "attributeValue", "text", "displayValue"]
+
+def find_values(data, keys):
+    """Yield every value stored under one of the keys, anywhere in a JSON document"""
+    keys_lower = {key.lower() for key in keys}
+    stack = [data]
+    while stack:
+        node = stack.pop(0)
+        if isinstance(node, dict):
+            for key, value in node.items():
+                if str(key).lower() in keys_lower and value not in (None, '', [], {}):
+                    yield value
+                if isinstance(value, (dict, list)):
+                    stack.append(value)
+        elif isinstance(node, list):
+            stack.extend(node)
+
+def find_attribute_value(data, label):
+    """Find the value of a name/value attribute pair like {"name": "Global Product Type", "value": "..."}"""
+    stack = [data]
+    while stack:
+        node = stack.pop(0)
+        if isinstance(node, dict):
+            if any(isinstance(value, str) and value.strip() == label for value in node.values()):
+                for key in ATTRIBUTE_VALUE_KEYS:
+                    for node_key, value in node.items():
+                        if node_key.lower() == key.lower() and isinstance(value, str) and value.strip() != label:
+                            return value.strip()
+            stack.extend(value for value in node.values() if isinstance(value, (dict, list)))
+        elif isinstance(node, list):
+            stack.extend(node)
+    return None
+
+def collect_urls(value):
+    """Flatten an image field (string, list or dict) into a list of URL strings"""
+    urls = []
+    stack = [value]
+    while stack:
+        node = stack.pop(0)
+        if isinstance(node, str):
+            if node.startswith('http') or node.startswith('//'):
+                urls.append(node)
+        elif isinstance(node, list):
+            stack.extend(node)
+        elif isinstance(node, dict):
+            stack.extend(node.values())
+    return urls
+
+def parse_item_detail_json(data, expected_unit):
+    """Turn an item-detail JSON response into the scraper's result tuple
+
+    Returns None when the response has no recognisable unit (unknown layout), so the
+    caller can fall back to the browser instead of guessing.
+    """
+    website_unit = None
+    for value in find_values(data, ITEM_FIELD_KEYS["unit"]):
+        if isinstance(value, str):
+            website_unit = normalize_unit(value)
+            if website_unit:
+                break
+    if not website_unit:
+        return None
+
+    product_name = find_attribute_value(data, PRODUCT_TYPE_LABEL)
+    if not product_name:
+        for value in find_values(data, ITEM_FIELD_KEYS["product_type"]):
+            if isinstance(value, str) and len(value.strip()) > 5:
+                product_name = value.strip()
+                break
+
+    description = None
+    for value in find_values(data, ITEM_FIELD_KEYS["description"]):
+        if isinstance(value, str):
+            description = clean_description(value)
+            if description:
+                break
+
+    image_urls = []
+    for value in find_values(data, ITEM_FIELD_KEYS["images"]):
+        image_urls.extend(collect_urls(value))
+    image_url = choose_product_image(image_urls)
+
+    if product_name:
+        print(f"    Found product name (API): {product_name}")
+    if description:
+        print(f"    Found description (API): {len(description)} chars")
+    if image_url:
+        print(f"    Found product image (API): {image_url[:80]}...")
+    return build_scrape_result(website_unit, expected_unit, product_name, description, image_url)
+
+class ItemApiClient:
+    """Pooled keep-alive HTTP client for the item-detail endpoint
+
+    The asyncio event loop runs on its own thread, so the scrape loop (and every parallel
+    worker) can call fetch() synchronously while sharing one connection pool.
+    """
+    def __init__(self, url_template, max_connections=ITEM_API_MAX_CONNECTIONS, timeout=ITEM_API_TIMEOUT, record_dir=None):
+        if aiohttp is None:
+            raise RuntimeError("The HTTP backend needs aiohttp (pip install aiohttp)")
+        self.url_template = url_template  # ITEM_API_URL in scrape_products.py ({item_id} = Item Number)
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.record_dir = record_dir
+        if record_dir:
+            os.makedirs(record_dir, exist_ok=True)
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="item-api-loop", daemon=True)
+        self.thread.start()
+        self.session = asyncio.run_coroutine_threadsafe(self._open_session(), self.loop).result()
+
+    async def _open_session(self):
+        connector = aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=60, ttl_dns_cache=300)
+        return aiohttp.ClientSession(
+            connector=connector,
+            headers=ITEM_API_HEADERS,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+
+    async def fetch_json(self, item_id):
+        """Request the item-detail JSON, returns (status, data)"""
+        url = self.url_template.format(item_id=item_id)
+        async with self.session.get(url) as response:
+            if response.status != 200:
+                return response.status, None
+            text = await response.text()
+        if self.record_dir:
+            with open(os.path.join(self.record_dir, f"{item_id}.json"), "w", encoding="utf-8") as f:
+                f.write(text)
+        return 200, json.loads(text)
+
+    async def fetch_product(self, link, expected_unit):
+        """Fetch one product, returns the scraper result tuple or None to use the browser"""
+        item_id = get_item_id(link)
+        if not item_id:
+            return None
+        try:
+            status, data = await self.fetch_json(item_id)
+        except (asyncio.TimeoutError, aiohttp.ClientError, ValueError) as e:
+            print(f"    Item API request failed for {item_id}: {e}")
+            return None
+        if status != 200 or data is None:
+            # A 404 may just mean the endpoint URL is wrong - only the browser decides "Product not found"
+            print(f"    Item API returned HTTP {status} for {item_id}")
+            return None
+        try:
+            return parse_item_detail_json(data, expected_unit)
+        except Exception as e:
+            print(f"    Unexpected item API response for {item_id}: {e}")
+            return None
+
+    def fetch(self, link, expected_unit):
+        """Synchronous wrapper around fetch_product (safe to call from any thread)"""
+        future = asyncio.run_coroutine_threadsafe(self.fetch_product(link, expected_unit), self.loop)
+        try:
+            return future.result(timeout=self.timeout + 5)
+        except Exception as e:
+            future.cancel()
+            print(f"    Item API error: {e}")
+            return None
+
+    def close(self):
+        """Close the connection pool and stop the event loop thread"""
+        try:
+            asyncio.run_coroutine_threadsafe(self.session.close(), self.loop).result(timeout=5)
+        except Exception:
+            pass
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=5)
+
+class RecordedResponseHandler(BaseHTTPRequestHandler):
+    """Stand-in for the item-detail endpoint that answers from recorded JSON files"""
+    recordings_dir = "."
+
+    def do_GET(self):
+        item_id = get_item_id(self.path)
+        path = os.path.join(self.recordings_dir, f"{item_id}.json") if item_id else None
+        if not path or not os.path.exists(path):
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        with open(path, "rb") as f:
+            body = f.read()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Keep the console quiet
+
+def serve_recorded_responses(recordings_dir, port=8765):
+    """Start the stand-in server on a background thread and return it (call shutdown() to stop)"""
+    handler = type("Handler", (RecordedResponseHandler,), {"recordings_dir": recordings_dir})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, name="item-api-stand-in", daemon=True).start()
+    return server
+
+def main():
+    """Command line: 'serve <folder> [port]' or 'fetch <item id> <unit>'"""
+    if len(sys.argv) >= 3 and sys.argv[1] == "serve":
+        port = int(sys.argv[3]) if len(sys.argv) > 3 else 8765
+        server = serve_recorded_responses(sys.argv[2], port)
+        print(f"Serving recorded item responses from {sys.argv[2]} on http://127.0.0.1:{port}/ (Ctrl+C to stop)")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            server.shutdown()
+    elif len(sys.argv) >= 4 and sys.argv[1] == "fetch":
+        from scrape_products import ITEM_API_URL
+        client = ItemApiClient(ITEM_API_URL)
+        try:
+            print(client.fetch(f"itemId={sys.argv[2]}", sys.argv[3]))
+        finally:
+            client.close()
+    else:
+        print("Usage: python item_api.py serve <recordings folder> [port]")
+        print("       python item_api.py fetch <item id> <unit>")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""Bulk harvesting from the website's search/listing pages
+
+One listing page shows dozens of items with their name, image and price unit, so rows
+can be filled many at a time instead of opening every item page. Items are matched back
+to the Excel rows by Item Number. Listing pages have no description, so rows still
+missing one go on to the normal per-item scraper afterwards.
+
+The functions here only read pages through the driver they are given, the scrape loop
+in scrape_products.py decides what is written.
+"""
+import re
+import time
+from urllib.parse import quote
+
+# Search results page. {query} is an item-number prefix or a manufacturer name, {page} the
+# 1-based page number. If the site changes it, copy the address of a search results page
+# (page 2 or later, so the page parameter shows) from the browser.
+SEARCH_URL_TEMPLATE = "https://www.biggestbook.com/ui#/search?keyword={query}&page={page}"
+LISTING_MAX_PAGES = 40  # Pages walked per query at most
+LISTING_READY_TIMEOUT = 10  # Seconds to wait for a listing page's items
+
+# Selectors for one item tile and its name on a listing page (the item ID comes from the
+# tile's itemDetail link). Tiles are found by their item link if no selector matches.
+LISTING_TILE_SELECTOR = "[class*='ess-product-tile'], [class*='ess-search-item'], [class*='product-tile'], [class*='product-card']"
+LISTING_NAME_SELECTOR = "[class*='product-name'], [class*='product-title'], [class*='item-name'], h2, h3, h4"
+
+# Reads every item tile of a listing page in one call.
+# Called with arguments[0] = tile selector and arguments[1] = name selector.
+LISTING_JS = r"""
+function countItems(element) {
+    var ids = {};
+    var count = 0;
+    var links = element.querySelectorAll("a[href*='itemId=']");
+    for (var i = 0; i < links.length; i++) {
+        var match = /itemId=([^&#"'\s]+)/i.exec(links[i].getAttribute('href') || '');
+        if (match && !ids[match[1]]) {
+            ids[match[1]] = true;
+            count++;
+        }
+    }
+    return count;
+}
+var tiles = Array.prototype.slice.call(document.querySelectorAll(arguments[0]));
+if (!tiles.length) {
+    // No tile selector matched - use the largest block around each item link that holds only that item
+    var links = document.querySelectorAll("a[href*='itemId=']");
+    for (var i = 0; i < links.length; i++) {
+        var block = links[i];
+        while (block.parentElement && block.parentElement !== document.body && countItems(block.parentElement) < 2) {
+            block = block.parentElement;
+        }
+        if (tiles.indexOf(block) === -1) {
+            tiles.push(block);
+        }
+    }
+}
+var items = [];
+var seen = {};
+for (var i = 0; i < tiles.length; i++) {
+    var tile = tiles[i];
+    var link = tile.matches("a[href*='itemId=']") ? tile : tile.querySelector("a[href*='itemId=']");
+    var match = link ? /itemId=([^&#"'\s]+)/i.exec(link.getAttribute('href') || '') : null;
+    if (!match) {
+        continue;
+    }
+    var itemId = decodeURIComponent(match[1]).trim();
+    if (seen[itemId]) {
+        continue;
+    }
+    seen[itemId] = true;
+    var nameEl = tile.querySelector(arguments[1]);
+    var uomEl = tile.querySelector("[class*='uom']");
+    var unitText = uomEl ? uomEl.textContent.trim() : null;
+    if (!unitText) {
+        var priceMatch = /\$[\d,]+\.?\d*\s*\/\s*([A-Z]{2,4})\b/.exec(tile.textContent || '');
+        unitText = priceMatch ? priceMatch[1] : null;
+    }
+    var images = [];
+    var imgs = tile.querySelectorAll('img');
+    for (var j = 0; j < imgs.length; j++) {
+        var src = imgs[j].getAttribute('src') || imgs[j].getAttribute('data-src');
+        if (src) {
+            images.push(src);
+        }
+    }
+    items.push({
+        itemId: itemId,
+        name: nameEl ? nameEl.textContent.trim() : null,
+        unitText: unitText,
+        images: images
+    });
+}
+return items;
+"""
+
+def build_listing_queries(items, source="prefix"):
+    """Group rows into listing searches
+
+    Args:
+        items: list of (row index, item number, manufacturer) of the rows to fill
+        source: "prefix" = search by the letters an Item Number starts with (e.g. 'BOB'),
+                "manufacturer" = search by Manufacturer Long Name
+
+    Returns:
+        list of (query, row indices), biggest groups first
+    """
+    groups = {}
+    for idx, item_number, manufacturer in items:
+        if source == "manufacturer":
+            query = str(manufacturer).strip() if manufacturer else ''
+        else:
+            match = re.match(r'[A-Za-z]+', str(item_number).strip())
+            query = match.group(0).upper() if match else ''
+        if query:
+            groups.setdefault(query, []).append(idx)
+    return sorted(groups.items(), key=lambda group: len(group[1]), reverse=True)
+
+def read_listing_page(driver, url, previous_ids, timeout=LISTING_READY_TIMEOUT):
+    """Open a listing page and return its item tiles
+
+    Listing addresses only differ after the '#', so the app may still show the previous
+    page for a moment - the tiles are read until they differ from previous_ids.
+    Returns an empty list if no (new) tiles show up in time.
+    """
+    driver.get(url)
+    deadline = time.time() + timeout
+    while True:
+        try:
+            items = driver.execute_script(LISTING_JS, LISTING_TILE_SELECTOR, LISTING_NAME_SELECTOR) or []
+        except Exception:
+            items = []
+        if items and {item['itemId'] for item in items} != previous_ids:
+            return items
+        if time.time() > deadline:
+            return []
+        time.sleep(0.2)
+
+def walk_listing(driver, query, max_pages=LISTING_MAX_PAGES):
+    """Yield (page number, items) for the pages of one search until a page has no new items"""
+    seen_ids = set()
+    previous_ids = set()
+    driver.get("about:blank")  # Don't read the tiles of the previous search
+    for page in range(1, max_pages + 1):
+        url = SEARCH_URL_TEMPLATE.format(query=quote(query), page=page)
+        items = read_listing_page(driver, url, previous_ids)
+        page_ids = {item['itemId'] for item in items}
+        if not page_ids - seen_ids:
+            return
+        seen_ids |= page_ids
+        previous_ids = page_ids
+        yield page, items
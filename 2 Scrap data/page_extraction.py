@@ -0,0 +1,529 @@
+"""Helpers shared by every way of getting product data (browser, item API, saved pages)
+
+Nothing in this file talks to a browser or the network, so the same rules are applied
+no matter where the product data came from.
+"""
+import re
+import html
+
+# Common unit abbreviations (EA, BX, CS, PK, CT, DZ, PR, etc.)
+COMMON_UNITS = ['EA', 'BX', 'CS', 'PK', 'CT', 'DZ', 'PR', 'RL', 'FT', 'YD', 'LB', 'OZ', 'GA', 'QT', 'PT', 'FL', 'PC', 'SET', 'PAIR', 'PKG', 'CASE', 'PACK', 'ROLL', 'TUBE', 'BAG', 'BOX', 'CARTON', 'PKT', 'BTL', 'CAN', 'JAR', 'TIN']
+# Common file extensions to exclude
+FILE_EXTENSIONS = ['SVG', 'PNG', 'JPG', 'JPEG', 'GIF', 'PDF', 'XML', 'HTML', 'CSS', 'JS', 'JSON']
+
+# Parts of an image URL that mark a tag/rebate image instead of the product picture
+TAG_INDICATORS = [
+    '/tags/', 'tags/', 'tagoutlined', 'tag-outlined', 'rebate',
+    'master_images/tags', 'master_images\\tags',  # Handle both slashes
+    'tagoutlined-rebate', 'tag-outlined-rebate'
+]
+
+# Page text that means the item doesn't exist on the website
+NOT_FOUND_INDICATORS = [
+    'product not found', 'item not found', '404', 'page not found',
+    'unavailable', 'error 404', 'item unavailable', 'product unavailable'
+]
+# Page text that only appears on real product pages
+PRODUCT_INDICATORS = [
+    'ess-detail', 'ess-product', 'product-detail', 'item-detail',
+    'product-name', 'product-type', 'global product type'
+]
+
+# Waits (asynchronously, no polling) until an item page can be read and then calls back with
+# {state: 'item' | 'notFound' | 'timeout', elapsed: ms}. A MutationObserver re-checks the page
+# whenever it changes:
+#  - 'notFound' as soon as a NOT_FOUND_INDICATORS text is shown on the page
+#  - 'item' once a unit element that isn't marked stale has text (and, if an item ID is given,
+#    that ID is on the page) and the page then stays unchanged for the quiet time, so the rest of
+#    the item renders in the same pass (at most 5 quiet times after the unit showed up)
+#  - 'timeout' when the deadline passes first
+# Called with arguments[0] = item ID or null, arguments[1] = NOT_FOUND_INDICATORS,
+# arguments[2] = deadline in ms and arguments[3] = quiet time in ms (WebDriver execute_async_script).
+WAIT_FOR_READY_JS = r"""
+var done = arguments[arguments.length - 1];
+var itemId = arguments[0] ? String(arguments[0]).toLowerCase() : null;
+var notFoundIndicators = arguments[1] || [];
+var quietMs = arguments[3] || 0;
+var started = Date.now();
+var finished = false;
+var checkPending = false;
+var itemShown = false;
+var observer = null;
+var quietTimer = null;
+var settleTimer = null;
+var deadlineTimer = null;
+function finish(state) {
+    if (finished) {
+        return;
+    }
+    finished = true;
+    if (observer) {
+        observer.disconnect();
+    }
+    clearTimeout(quietTimer);
+    clearTimeout(settleTimer);
+    clearTimeout(deadlineTimer);
+    done({state: state, elapsed: Date.now() - started});
+}
+function itemRendered() {
+    var nodes = document.querySelectorAll('.ess-detail-uom:not([data-scraper-stale])');
+    for (var i = 0; i < nodes.length; i++) {
+        if (nodes[i].textContent.trim()) {
+            return !itemId || document.documentElement.outerHTML.toLowerCase().indexOf(itemId) !== -1;
+        }
+    }
+    return false;
+}
+function check() {
+    checkPending = false;
+    if (finished || !document.body) {
+        return;
+    }
+    if (itemShown) {
+        // Still rendering the rest of the item - wait for a quiet moment
+        clearTimeout(quietTimer);
+        quietTimer = setTimeout(function() { finish('item'); }, quietMs);
+        return;
+    }
+    var text = (document.body.textContent || '').toLowerCase();
+    for (var i = 0; i < notFoundIndicators.length; i++) {
+        if (text.indexOf(notFoundIndicators[i]) !== -1) {
+            finish('notFound');
+            return;
+        }
+    }
+    if (itemRendered()) {
+        if (!quietMs) {
+            finish('item');
+            return;
+        }
+        itemShown = true;
+        quietTimer = setTimeout(function() { finish('item'); }, quietMs);
+        settleTimer = setTimeout(function() { finish('item'); }, quietMs * 5);
+    }
+}
+function scheduleCheck() {
+    // Many mutations arrive per render - check once per batch
+    if (!checkPending && !finished) {
+        checkPending = true;
+        setTimeout(check, 0);
+    }
+}
+deadlineTimer = setTimeout(function() { finish('timeout'); }, arguments[2]);
+observer = new MutationObserver(scheduleCheck);
+observer.observe(document, {childList: true, subtree: true, characterData: true});
+check();
+"""
+
+# Opens another item inside the already loaded app by changing location.hash.
+# Unit elements of the current item are marked stale first, so WAIT_FOR_READY_JS can tell
+# them apart from the ones the app renders for the new item.
+# Called with arguments[0] = host of the item link and arguments[1] = the link's fragment.
+# Returns false (nothing changed) when a full page load is needed instead.
+HASH_NAVIGATE_JS = r"""
+if (!document.body || location.host !== arguments[0] || location.hash === '#' + arguments[1]) {
+    return false;
+}
+var nodes = document.querySelectorAll('.ess-detail-uom');
+for (var i = 0; i < nodes.length; i++) {
+    nodes[i].setAttribute('data-scraper-stale', '1');
+}
+location.hash = arguments[1];
+return true;
+"""
+
+# Reads every field of an item page in one call and returns them as one JSON object.
+# Called with arguments[0] = NOT_FOUND_INDICATORS and arguments[1] = PRODUCT_INDICATORS.
+# The page HTML is only searched inside the browser, so it never has to be transferred.
+EXTRACT_PAGE_JS = r"""
+var notFoundIndicators = arguments[0] || [];
+var productIndicators = arguments[1] || [];
+var result = {
+    hasBody: document.body !== null,
+    notFoundIndicator: null,
+    hasProductIndicator: false,
+    hasPriceWithUnit: false,
+    unitText: null,
+    unitSource: null,
+    productName: null,
+    description: null,
+    images: [],
+    htmlLength: 0
+};
+if (!result.hasBody) {
+    return result;
+}
+var pageHtml = document.documentElement.outerHTML;
+var pageLower = pageHtml.toLowerCase();
+result.htmlLength = pageHtml.length;
+
+// Quick check for "not found" indicators first
+for (var i = 0; i < notFoundIndicators.length; i++) {
+    if (pageLower.indexOf(notFoundIndicators[i]) !== -1) {
+        result.notFoundIndicator = notFoundIndicators[i];
+        return result;
+    }
+}
+for (var i = 0; i < productIndicators.length; i++) {
+    if (pageLower.indexOf(productIndicators[i]) !== -1) {
+        result.hasProductIndicator = true;
+        break;
+    }
+}
+result.hasPriceWithUnit = /\$[\d,]+\.?\d*\s*\/([A-Z]{2,4})\b/i.test(pageHtml);
+
+// Unit: the price unit span, then any uom-like class, then the raw HTML
+var uom = document.querySelector('span.ess-detail-uom:not([data-scraper-stale]), .ess-detail-uom:not([data-scraper-stale])');
+if (uom && uom.textContent.trim()) {
+    result.unitText = uom.textContent.trim();
+    result.unitSource = 'selector';
+} else {
+    var uoms = document.querySelectorAll("[class*='ess-detail-uom']:not([data-scraper-stale]), [class*='ess-product-uom']:not([data-scraper-stale])");
+    for (var i = 0; i < uoms.length; i++) {
+        var text = (uoms[i].textContent || '').trim();
+        if (text.indexOf('/') === 0 && text.length >= 3) {
+            result.unitText = text;
+            result.unitSource = 'css';
+            break;
+        }
+    }
+    if (!result.unitText) {
+        var uomMatch = pageHtml.match(/class="ess-detail-uom"[^>]*>\/([A-Z]{2,4})\b/i);
+        if (uomMatch) {
+            result.unitText = uomMatch[1];
+            result.unitSource = 'regex';
+        }
+    }
+}
+
+// Images: product images from Master_Variants first, then other oppictures images
+var imgs = document.querySelectorAll('img[src*="oppictures"]');
+var productImages = [];
+var otherImages = [];
+for (var i = 0; i < imgs.length; i++) {
+    var src = imgs[i].src || '';
+    var srcLower = src.toLowerCase();
+    // Exclude tag/rebate images (case-insensitive)
+    if (srcLower.indexOf('/tags/') !== -1 ||
+        srcLower.indexOf('tags/') !== -1 ||
+        srcLower.indexOf('tagoutlined') !== -1 ||
+        srcLower.indexOf('tag-outlined') !== -1 ||
+        srcLower.indexOf('rebate') !== -1 ||
+        srcLower.indexOf('master_images/tags') !== -1 ||
+        srcLower.indexOf('master_images\\tags') !== -1) {
+        continue;
+    }
+    if (srcLower.indexOf('master_variants') !== -1 || srcLower.indexOf('variant_') !== -1) {
+        productImages.push(src);
+    } else if (srcLower.indexOf('oppictures.com') !== -1) {
+        if (srcLower.indexOf('/tags') === -1 && srcLower.indexOf('\\tags') === -1) {
+            otherImages.push(src);
+        }
+    }
+}
+result.images = productImages.concat(otherImages);
+
+// Product name: the td next to "Global Product Type"
+var tds = document.querySelectorAll('td');
+for (var i = 0; i < tds.length; i++) {
+    if (tds[i].textContent && tds[i].textContent.trim().indexOf('Global Product Type') !== -1) {
+        var nextTd = tds[i].nextElementSibling;
+        if (nextTd && nextTd.textContent) {
+            var name = nextTd.textContent.trim();
+            if (name && name !== 'Global Product Type' && name.length > 5) {
+                result.productName = name;
+                break;
+            }
+        }
+    }
+}
+
+// Description: text after "Description :" up to the next section
+var elements = document.querySelectorAll('*');
+for (var i = 0; i < elements.length; i++) {
+    var text = elements[i].textContent || '';
+    if (text.indexOf('Description') !== -1 && text.indexOf(':') !== -1) {
+        var match = text.match(/Description\s*:?\s*(.+?)(?:Product Details|ADD TO LIST|People Who|List price)/i);
+        if (match && match[1]) {
+            var desc = match[1].trim();
+            if (desc.length >= 20 && desc.length <= 10000) {
+                result.description = desc;
+                break;
+            }
+        }
+    }
+}
+return result;
+"""
+
+# Pre-compile regex patterns for faster matching
+item_id_pattern = re.compile(r'itemId=([^&#/]+)', re.IGNORECASE)
+html_tag_pattern = re.compile(r'<[^>]+>')
+desc_pattern = re.compile(r'description\s*:?\s*', re.IGNORECASE)
+stop_markers_pattern = re.compile(r'(Product Details|ADD TO LIST|People Who Bought|Also Consider|List price)', re.IGNORECASE)
+price_pattern = re.compile(r'\$\d+[.,]\d+\s*/[A-Z]{2,4}', re.IGNORECASE)
+price_with_unit_pattern = re.compile(r'\$[\d,]+\.?\d*\s*/([A-Z]{2,4})\b', re.IGNORECASE)
+uom_source_pattern = re.compile(r'class="ess-detail-uom"[^>]*>/([A-Z]{2,4})\b', re.IGNORECASE)
+img_tag_pattern_oppictures = re.compile(r'<img[^>]+src=["\']([^"\']*oppictures[^"\']+)["\']', re.IGNORECASE)
+product_type_pattern = re.compile(r'Global Product Type[:\s]+([^\n<]+)', re.IGNORECASE)
+
+def scan_page_source(page_source):
+    """Build the not-found and diagnostic part of EXTRACT_PAGE_JS's result from raw page HTML"""
+    page_lower = page_source.lower()
+    page_data = {
+        'hasBody': '<body' in page_lower,
+        'notFoundIndicator': None,
+        'hasProductIndicator': any(indicator in page_lower for indicator in PRODUCT_INDICATORS),
+        'hasPriceWithUnit': bool(price_with_unit_pattern.search(page_source)),
+        'htmlLength': len(page_source),
+    }
+    for indicator in NOT_FOUND_INDICATORS:
+        if indicator in page_lower:
+            page_data['notFoundIndicator'] = indicator
+            break
+    return page_data
+
+def get_item_id(link):
+    """Get the item ID from a product link like '...ui#/itemDetail?itemId=BOB33041'"""
+    if not link:
+        return None
+    match = item_id_pattern.search(str(link))
+    return match.group(1).strip() if match else None
+
+def normalize_unit(text):
+    """Turn unit text like '/EA' or 'ea' into 'EA' (None if it doesn't look like a unit)"""
+    if not text:
+        return None
+    unit = str(text).strip()
+    if unit.startswith('/'):
+        unit = unit[1:].strip()
+    unit = unit.upper()
+    if len(unit) < 2 or len(unit) > 4:
+        return None
+    if unit in COMMON_UNITS or unit not in FILE_EXTENSIONS:
+        return unit
+    return None
+
+def is_tag_image_url(url):
+    """Check if URL is a tag/rebate image (these must never be used as the product image)"""
+    url_lower = url.lower()
+    if any(indicator in url_lower for indicator in TAG_INDICATORS):
+        return True
+    # Exclude if path contains "Tags" folder (case-insensitive check)
+    return '/tags' in url_lower or '\\tags' in url_lower or 'tags/' in url_lower or 'tags\\' in url_lower
+
+def is_product_image_url(url):
+    """Check if URL is a product image (not a tag/rebate image)"""
+    if not url:
+        return False
+    if is_tag_image_url(url):
+        return False
+    url_lower = url.lower()
+    # Prioritize actual product images from Master_Variants
+    if 'master_variants' in url_lower or 'variant_' in url_lower:
+        return True
+    # Also accept other oppictures images that aren't tags
+    return 'oppictures.com' in url_lower
+
+def choose_product_image(urls):
+    """Pick the best product image from a list of image URLs
+
+    Master_Variants images come first, then any other oppictures image.
+    Tag/rebate images are never returned.
+    """
+    product_images = []
+    other_images = []
+    for url in urls or []:
+        if not url:
+            continue
+        url = str(url).strip()
+        if url.startswith('//'):
+            url = 'https:' + url
+        if not is_product_image_url(url):
+            continue
+        url_lower = url.lower()
+        if 'master_variants' in url_lower or 'variant_' in url_lower:
+            product_images.append(url)
+        else:
+            other_images.append(url)
+    candidates = product_images + other_images
+    return candidates[0] if candidates else None
+
+def clean_description_text(text):
+    """Clean description text by removing HTML fragments, section markers, and unwanted content"""
+    if not text:
+        return None
+
+    # Remove any remaining HTML tags and fragments
+    text = html_tag_pattern.sub(' ', text)
+    text = html.unescape(text)
+
+    # Remove section markers and UI elements at the end
+    text = stop_markers_pattern.sub('', text)
+
+    # Remove the "Description :" or "Description:" prefix
+    text = desc_pattern.sub('', text, count=1)
+
+    # Remove item numbers at the start
+    text = re.sub(r'^[A-Z0-9]{6,15}\s+', '', text)
+
+    # Remove price patterns
+    text = price_pattern.sub('', text)
+
+    # Normalize whitespace
+    text = ' '.join(text.split())
+    text = text.strip()
+
+    # Remove trailing punctuation
+    text = re.sub(r'\*+\s*$', '', text)
+    text = text.strip()
+
+    return text if text else None
+
+def clean_description(text):
+    """Clean a description and return it only if it has a sensible length (20-10000 chars)"""
+    text = clean_description_text(text)
+    if text and 20 <= len(text) <= 10000:
+        return text
+    return None
+
+def build_scrape_result(website_unit, expected_unit, product_name, description, image_url):
+    """Build the (product_name, description, image_url, website_unit) tuple the scraper returns
+
+    Applies the same rules as the browser scraper: no unit means "Product not found",
+    a different unit means "Unit not matched", otherwise the scraped fields are returned.
+    """
+    if not website_unit:
+        print(f"    Product not found (unit not extractable)")
+        return "Product not found", "Product not found", "Product not found", None
+
+    print(f"    Website unit: {website_unit}, Expected unit: {expected_unit}")
+
+    # Check if unit matches
+    if website_unit.upper() != str(expected_unit).upper().strip():
+        print(f"    ⚠️  Unit mismatch! Website: {website_unit}, Expected: {expected_unit}")
+        return "Unit not matched", "Unit not matched", "Unit not matched", None
+
+    # Final validation: Make absolutely sure we never return a tag/rebate image
+    if image_url and is_tag_image_url(image_url):
+        print(f"    ⚠️  Rejected tag/rebate image: {image_url[:80]}...")
+        image_url = None
+
+    return product_name, description, image_url, website_unit
+
+def extract_unit_from_source(page_source):
+    """Find the price unit in raw page HTML"""
+    match = uom_source_pattern.search(page_source)
+    if match:
+        return normalize_unit(match.group(1))
+    return None
+
+def extract_image_from_source(page_source):
+    """Find the product image in raw page HTML
+
+    Returns:
+        (image_url, candidate_count) - candidate_count is how many oppictures images were seen
+    """
+    candidates = [match.group(1) for match in img_tag_pattern_oppictures.finditer(page_source)]
+    return choose_product_image(candidates), len(candidates)
+
+def extract_product_name_from_source(page_source):
+    """Find the Global Product Type value in raw page HTML"""
+    match = product_type_pattern.search(page_source)
+    if match:
+        product_name = re.sub(r'<[^>]+>', '', match.group(1)).strip()
+        return product_name or None
+    return None
+
+def extract_description_from_source(page_source):
+    """Find the product description in raw page HTML"""
+    desc_heading_patterns = ['Description :', 'Description:', 'Description']
+    desc_index = -1
+    for pattern in desc_heading_patterns:
+        desc_index = page_source.find(pattern)
+        if desc_index != -1:
+            break
+
+    if desc_index == -1:
+        return None
+
+    # Get text chunk after the description heading
+    text_chunk = page_source[desc_index:desc_index + 10000]
+
+    # Remove HTML tags and decode HTML entities
+    text_only = html_tag_pattern.sub(' ', text_chunk)
+    text_only = html.unescape(text_only)
+    text_only = ' '.join(text_only.split())
+
+    # Remove the "Description :" prefix
+    text_only = desc_pattern.sub('', text_only, count=1)
+    text_only = text_only.strip()
+
+    # Find stop markers and truncate if in last 30% of text
+    text_length = len(text_only)
+    stop_match = stop_markers_pattern.search(text_only)
+    if stop_match and stop_match.start() > text_length * 0.7:
+        text_only = text_only[:stop_match.start()].strip()
+
+    # Clean the description text and validate its length
+    return clean_description(text_only)
+
+def parse_captured_page(page, expected_unit, prefer_source=False):
+    """Parse stage: turn a captured page into the (product_name, description, image_url, website_unit) tuple
+
+    Args:
+        page: dict with 'page_data' (the EXTRACT_PAGE_JS result) and 'page_source'
+              (raw HTML, only present when the script left a field empty)
+        expected_unit: Expected unit of measure
+        prefer_source: Run the Python extractors over page_source first and only use the
+                       in-page script values as a fallback (re-extraction from snapshots,
+                       so fixes to the extractors apply to already captured pages)
+
+    Runs without a browser, so it can be used in a process pool.
+    """
+    page_data = page.get('page_data') or {}
+    page_source = page.get('page_source')
+    if page_source and not page_data:
+        page_data = scan_page_source(page_source)
+    elif page_source and prefer_source:
+        page_data = dict(page_data, **scan_page_source(page_source))
+
+    if not page_data.get('hasBody'):
+        print(f"    Product not found (page load timeout)")
+        return "Product not found", "Product not found", "Product not found", None
+
+    if page_data.get('notFoundIndicator'):
+        print(f"    Product not found (detected: '{page_data['notFoundIndicator']}')")
+        return "Product not found", "Product not found", "Product not found", None
+
+    from_source = bool(prefer_source and page_source)
+    website_unit = extract_unit_from_source(page_source) if from_source else None
+    if not website_unit:
+        website_unit = normalize_unit(page_data.get('unitText'))
+    if not website_unit:
+        # Check for key product elements - if none found, product doesn't exist
+        if not page_data.get('hasProductIndicator') and not page_data.get('hasPriceWithUnit'):
+            print(f"    Product not found (no product elements detected)")
+            return "Product not found", "Product not found", "Product not found", None
+        if page_source and not from_source:
+            website_unit = extract_unit_from_source(page_source)
+
+    image_url = extract_image_from_source(page_source)[0] if from_source else None
+    if not image_url:
+        image_url = choose_product_image(page_data.get('images'))
+    if not image_url and page_source and not from_source:
+        image_url, _ = extract_image_from_source(page_source)
+
+    product_name = extract_product_name_from_source(page_source) if from_source else None
+    if not product_name:
+        product_name = page_data.get('productName')
+    if not product_name and page_source and not from_source:
+        product_name = extract_product_name_from_source(page_source)
+
+    description = extract_description_from_source(page_source) if from_source else None
+    if not description:
+        description = clean_description(page_data.get('description'))
+    if not description and page_source and not from_source:
+        description = extract_description_from_source(page_source)
+
+    return build_scrape_result(website_unit, expected_unit, product_name, description, image_url)
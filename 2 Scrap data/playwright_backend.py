@@ -0,0 +1,276 @@
+"""Playwright fetch backend: many browser contexts inside one Chromium process
+
+Instead of one Chrome (and one chromedriver) per worker, a single Chromium runs
+PLAYWRIGHT_CONCURRENCY isolated browser contexts on one asyncio event loop. A context
+that breaks is replaced in milliseconds, without a browser cold start.
+
+Pages are read with the same EXTRACT_PAGE_JS script and parsed with parse_captured_page,
+and every result goes through the normal results queue, so process_products writes it
+with the same update rules as the Selenium workers.
+
+Needs: pip install playwright && python -m playwright install chromium
+"""
+import asyncio
+import concurrent.futures
+import fnmatch
+import threading
+import time
+
+try:
+    from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError, Error as PlaywrightError
+except ImportError:
+    async_playwright = None  # Only needed when FETCH_BACKEND is "playwright"
+
+from page_extraction import (
+    EXTRACT_PAGE_JS, WAIT_FOR_READY_JS, HASH_NAVIGATE_JS, NOT_FOUND_INDICATORS, PRODUCT_INDICATORS,
+    parse_captured_page, get_item_id,
+)
+from crawl_history import result_outcome
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+PAGE_LOAD_TIMEOUT = 15  # Seconds, same budget as the Selenium scraper
+
+def as_function(script):
+    """Wrap a WebDriver-style script (uses 'arguments' and a top-level return) for page.evaluate"""
+    return "(args) => (function() {" + script + "}).apply(null, args)"
+
+def as_async_function(script):
+    """Wrap a WebDriver async script (calls back with its last argument) for page.evaluate"""
+    return "(args) => new Promise((resolve) => (function() {" + script + "}).apply(null, args.concat([resolve])))"
+
+class PageStats:
+    """Pages opened and how long they took until readable (same fields as DriverSlot)"""
+    def __init__(self):
+        self.pages_loaded = 0
+        self.load_seconds = 0.0
+
+class PlaywrightWorker(threading.Thread):
+    """Scrapes rows from the task queue with one Chromium and many browser contexts
+
+    Takes the place of the ScrapeWorker threads: reads (idx, link, expected_unit, current_values)
+    tasks until the None marker and puts (idx, current_values, result, context number,
+    expected_unit) on the results queue. Each context takes one row at a time and goes through
+    the same pace controller and circuit breaker as a ScrapeWorker (context number = worker id).
+    """
+    def __init__(self, tasks, results, stop_event, capture_only=False, concurrency=8, headless=True,
+                 blocked_url_patterns=None, blocked_resource_types=None, page_ready_timeout=10, hash_navigation=True,
+                 ready_quiet_ms=50, history=None, pace=None, breaker=None):
+        super().__init__(name="playwright-worker", daemon=True)
+        self.tasks = tasks
+        self.results = results
+        self.stop_event = stop_event
+        self.capture_only = capture_only
+        self.concurrency = concurrency
+        self.headless = headless
+        self.blocked_url_patterns = list(blocked_url_patterns or [])
+        self.blocked_resource_types = {resource_type.lower() for resource_type in (blocked_resource_types or [])}
+        self.page_ready_timeout = page_ready_timeout
+        self.hash_navigation = hash_navigation
+        self.ready_quiet_ms = ready_quiet_ms
+        self.history = history  # CrawlHistory every result is added to (None = off)
+        self.pace = pace  # PaceController shared with the scrape loop (None = fixed pause)
+        self.breaker = breaker  # CircuitBreaker shared with the scrape loop (None = off)
+        self.slot = PageStats()
+
+    def run(self):
+        if async_playwright is None:
+            print("\nERROR: The Playwright backend needs playwright (pip install playwright && python -m playwright install chromium)")
+            return
+        try:
+            asyncio.run(self.scrape_all())
+        except Exception as e:
+            print(f"\n[Playwright] ERROR: {e}")
+
+    async def scrape_all(self):
+        # Every row is queued before the worker starts (the stop marker is one more item)
+        contexts = max(1, min(self.concurrency, self.tasks.qsize() - 1))
+        # Waiting for a task, a pace turn or the circuit blocks a thread - one per context
+        loop = asyncio.get_running_loop()
+        loop.set_default_executor(concurrent.futures.ThreadPoolExecutor(max_workers=contexts + 1))
+        async with async_playwright() as playwright:
+            browser = await playwright.chromium.launch(headless=self.headless, args=['--disable-blink-features=AutomationControlled'])
+            try:
+                print(f"[Playwright] {contexts} browser contexts in one Chromium")
+                await asyncio.gather(*(self.context_loop(browser, number) for number in range(1, contexts + 1)))
+            finally:
+                await browser.close()
+
+    async def route_request(self, route):
+        """Abort requests for blocked resource types and URL patterns, continue everything else"""
+        request = route.request
+        if request.resource_type in self.blocked_resource_types or \
+                any(fnmatch.fnmatchcase(request.url, pattern) for pattern in self.blocked_url_patterns):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def new_page(self, browser):
+        context = await browser.new_context(user_agent=USER_AGENT, viewport={'width': 1920, 'height': 1080})
+        if self.blocked_resource_types or self.blocked_url_patterns:
+            await context.route("**/*", self.route_request)
+        page = await context.new_page()
+        page.set_default_timeout(PAGE_LOAD_TIMEOUT * 1000)
+        return context, page
+
+    async def close_tab(self, tab):
+        """Close the tab's browser context; the next row opens a fresh one"""
+        context, tab['context'], tab['page'] = tab['context'], None, None
+        tab['app_loaded'] = False
+        if context is not None:
+            try:
+                await context.close()
+            except Exception:
+                pass
+
+    async def context_loop(self, browser, number):
+        """Scrape rows with one browser context until the stop marker or a stop is requested"""
+        loop = asyncio.get_running_loop()
+        # app_loaded is True while the page shows a rendered item (next one can be opened by hash)
+        tab = {'context': None, 'page': None, 'app_loaded': False}
+        try:
+            while not self.stop_event.is_set():
+                # Paused while the pace controller runs fewer contexts than there are
+                if self.pace is not None and not await loop.run_in_executor(None, self.pace.wait_turn, number, self.stop_event):
+                    break
+                task = await loop.run_in_executor(None, self.tasks.get)
+                if task is None:  # No more rows to scrape
+                    self.tasks.put(None)  # Left for the other contexts
+                    if self.pace is not None:
+                        self.pace.release_all()  # Paused contexts only have the stop marker left to pick up
+                    break
+                idx, link, expected_unit, current_values = task
+                result = await self.scrape_row(browser, number, tab, link, expected_unit)
+                if result is None:
+                    break  # Stopped while the circuit was open - the row stays as it is
+                # Blocks while the results queue is full (pipeline backpressure), off the event loop
+                await loop.run_in_executor(None, self.results.put, (idx, current_values, result, number, expected_unit))
+        finally:
+            await self.close_tab(tab)
+
+    async def scrape_row(self, browser, number, tab, link, expected_unit):
+        """Scrape one row, then pause as the pace controller says (scrape_row of the Selenium workers)
+
+        Waits while the circuit breaker is open, and a timeout that comes back during a timeout
+        storm is tried again once the website answers. Returns None if a stop was requested
+        while the circuit was open.
+        """
+        loop = asyncio.get_running_loop()
+        probe = lambda probe_link, probe_unit: self.probe_website(loop, browser, number, tab, probe_link, probe_unit)
+        while True:
+            if self.breaker is not None and not await loop.run_in_executor(
+                    None, self.breaker.wait_until_closed, probe, self.stop_event, (link, expected_unit)):
+                return None
+            started = time.time()
+            result = await self.scrape_in_tab(browser, number, tab, link, expected_unit)
+            seconds = time.time() - started
+            outcome = result_outcome(result)
+            if self.history is not None:
+                try:
+                    self.history.record(get_item_id(link), seconds, outcome)
+                except OSError as e:
+                    print(f"    [Context {number}] Could not write crawl history: {e}")
+            held = self.breaker is not None and self.breaker.record(outcome == "timeout", link, expected_unit)
+            if self.pace is None:
+                delay = 0.2
+            else:
+                message = self.pace.record(seconds, outcome in ("timeout", "no data"))
+                if message:
+                    print(f"\n[Playwright] Pace: {message}")
+                delay = self.pace.delay
+            # Small delay to avoid overwhelming the server
+            await loop.run_in_executor(None, self.stop_event.wait, delay)
+            if not held:
+                return result
+            print(f"    [Context {number}] Circuit open - the row is tried again once the website answers")
+
+    def probe_website(self, loop, browser, number, tab, link, expected_unit):
+        """Scrape a known item with this context to see if the website answers again (runs off the event loop)"""
+        print(f"\n[Context {number}] Circuit probe: {link}")
+        result = asyncio.run_coroutine_threadsafe(self.scrape_in_tab(browser, number, tab, link, expected_unit), loop).result()
+        if isinstance(result, dict):
+            result = parse_captured_page(result, expected_unit)
+        return result_outcome(result) not in ("timeout", "no data")
+
+    async def scrape_in_tab(self, browser, number, tab, link, expected_unit):
+        """Scrape one item in the tab's context; on any error the context is replaced for the next row"""
+        try:
+            if tab['page'] is None:
+                tab['context'], tab['page'] = await self.new_page(browser)
+            return await self.scrape_product(tab['page'], link, expected_unit, tab)
+        except Exception as e:
+            print(f"    [Context {number}] Error scraping: {e}")
+            # Start over with a fresh context - cheap compared to a browser restart
+            await self.close_tab(tab)
+            return None, None, None, None
+
+    async def open_by_hash(self, page, link, item_id):
+        """Open an item inside the loaded app by changing location.hash (see HASH_NAVIGATE_JS)
+
+        Returns False when the app didn't render the item in time and a full load is needed.
+        """
+        host = link.split('//', 1)[-1].split('/', 1)[0]
+        if not await page.evaluate(as_function(HASH_NAVIGATE_JS), [host, link.partition('#')[2]]):
+            return False
+        if await self.wait_until_ready(page, item_id) is None:
+            print(f"    App did not show {item_id} after the hash change - reloading the page")
+            return False
+        return True
+
+    async def wait_until_ready(self, page, item_id=None):
+        """Wait until the unit element or a not-found message shows (WAIT_FOR_READY_JS, no polling)
+
+        Returns 'item', 'notFound' or None when page_ready_timeout passed first.
+        """
+        deadline = time.time() + self.page_ready_timeout
+        while True:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return None
+            try:
+                state = (await page.evaluate(as_async_function(WAIT_FOR_READY_JS),
+                                             [item_id, NOT_FOUND_INDICATORS, int(remaining * 1000), self.ready_quiet_ms]) or {}).get('state')
+            except PlaywrightError:
+                # The document was replaced while waiting (page still loading) - watch the new one
+                state = None
+                await asyncio.sleep(0.05)
+            if state in ('item', 'notFound'):
+                return state
+
+    async def scrape_product(self, page, link, expected_unit, state):
+        """Open one item page and return its result tuple (or the captured page in pipeline mode)"""
+        print(f"  Accessing: {link}")
+        load_start = time.time()
+        item_id = get_item_id(link)
+        navigated = False
+        if self.hash_navigation and state['app_loaded'] and item_id and '#' in link:
+            navigated = await self.open_by_hash(page, link, item_id)
+        state['app_loaded'] = False
+        try:
+            if not navigated:
+                if '#' in page.url:
+                    # A link that only differs in the hash would not reload the app (stale page)
+                    await page.goto("about:blank")
+                await page.goto(link, wait_until="domcontentloaded", timeout=PAGE_LOAD_TIMEOUT * 1000)
+        except PlaywrightTimeoutError:
+            print(f"    Page load timeout ({PAGE_LOAD_TIMEOUT}s) - skipping")
+            try:
+                await page.goto("about:blank")
+            except PlaywrightError:
+                pass
+            return "Timeout error", "Timeout error", "Timeout error", None
+        if not navigated:
+            await self.wait_until_ready(page)  # Not ready in time: read whatever is there, parse_captured_page decides
+        self.slot.pages_loaded += 1
+        self.slot.load_seconds += time.time() - load_start
+
+        page_data = await page.evaluate(as_function(EXTRACT_PAGE_JS), [NOT_FOUND_INDICATORS, PRODUCT_INDICATORS]) or {}
+        state['app_loaded'] = bool(page_data.get('unitText')) and not page_data.get('notFoundIndicator')
+        page_source = None
+        fields_missing = not (page_data.get('unitText') and page_data.get('images') and
+                              page_data.get('productName') and page_data.get('description'))
+        if page_data.get('hasBody') and not page_data.get('notFoundIndicator') and fields_missing:
+            page_source = await page.content()  # Only needed by the regex fallbacks
+        captured = {'link': link, 'page_data': page_data, 'page_source': page_source}
+        if self.capture_only:
+            return captured
+        return parse_captured_page(captured, expected_unit)
@@ -0,0 +1,381 @@
+"""Adaptive pacing of the scrape loop (AIMD: additive increase, multiplicative decrease),
+a circuit breaker that pauses it while the website keeps timing out, the retry schedule
+for rows that timed out, and hedging of slow items in parallel mode
+
+The pause after each product and, in parallel mode, the number of active workers follow
+how the website responds:
+- After a healthy round (as many good results as there are active workers) the pause gets
+  one step shorter - once it is at the minimum, one more paused worker is let back in
+- A timeout/error, or a rolling average product time above the slow limit, doubles the
+  pause and halves the active workers (at most once per round, so one burst of failures
+  from several workers counts once)
+"""
+import heapq
+import itertools
+import random
+import threading
+import time
+from collections import deque
+
+class PaceController:
+    """Thread-safe AIMD controller shared by the scrape loop and the workers"""
+    def __init__(self, max_workers=1, min_workers=1, min_delay=0.0, max_delay=5.0, delay_step=0.05,
+                 slow_seconds=20.0, start_delay=0.2, window=20):
+        self.max_workers = max(1, max_workers)
+        self.min_workers = max(1, min(min_workers, self.max_workers))
+        self.min_delay = min_delay
+        self.max_delay = max(max_delay, min_delay)
+        self.delay_step = delay_step
+        self.slow_seconds = slow_seconds
+        self.delay = min(max(start_delay, self.min_delay), self.max_delay)
+        self.active = self.max_workers
+        self.recent = deque(maxlen=window)  # (seconds, failed) of the latest products
+        self.since_change = 0  # Results since the last increase or cut
+        self.since_cut = window  # Results since the last cut (a cut only counts once per round)
+        self.released = False  # True when the task queue is empty and paused workers may exit
+        self.condition = threading.Condition()
+
+    def record(self, seconds, failed):
+        """Feed one product result: how long it took and whether it was a timeout/error
+
+        Returns a message when the pace changed (None otherwise).
+        """
+        with self.condition:
+            self.recent.append((seconds, failed))
+            self.since_change += 1
+            self.since_cut += 1
+            average = sum(s for s, _ in self.recent) / len(self.recent)
+            slow = len(self.recent) >= 5 and average > self.slow_seconds
+            if failed or slow:
+                self.since_change = 0  # No increase until a whole round went well
+                if self.since_cut < self.active:
+                    return None  # Already cut for this round
+                self.delay = min(self.max_delay, max(self.delay * 2, self.delay_step))
+                self.active = max(self.min_workers, self.active // 2)
+                self.since_cut = 0
+                self.condition.notify_all()
+                return f"slowing down ({'timeouts/errors' if failed else f'{average:.1f}s per product'}): {self.describe()}"
+            if self.since_change < self.active:
+                return None
+            self.since_change = 0
+            if self.delay > self.min_delay:
+                self.delay = max(self.min_delay, round(self.delay - self.delay_step, 3))
+                return None  # Small steps - not worth a message each
+            if self.active < self.max_workers:
+                self.active += 1
+                self.condition.notify_all()
+                return f"speeding up: {self.describe()}"
+            return None
+
+    def hold(self):
+        """Pause workers above the active count again (a new batch of rows is queued)"""
+        with self.condition:
+            self.released = False
+
+    def wait_turn(self, worker_id, stop_event):
+        """Block a worker while it is paused (worker_id above the active count)
+
+        Returns False if stop_event was set while waiting.
+        """
+        with self.condition:
+            while worker_id > self.active and not self.released:
+                if stop_event.is_set():
+                    return False
+                self.condition.wait(timeout=0.5)
+        return not stop_event.is_set()
+
+    def release_all(self):
+        """Let every paused worker run (no rows left - they only pick up their stop marker)"""
+        with self.condition:
+            self.released = True
+            self.condition.notify_all()
+
+    def describe(self):
+        """Current pace for the progress output"""
+        text = f"pause {self.delay:.2f}s"
+        if self.max_workers > 1:
+            text += f", {self.active}/{self.max_workers} workers"
+        return text
+
+    def status(self):
+        """Current pace plus rolling product time and error rate"""
+        with self.condition:
+            if not self.recent:
+                return self.describe()
+            average = sum(s for s, _ in self.recent) / len(self.recent)
+            errors = sum(1 for _, failed in self.recent if failed) / len(self.recent)
+            return f"{self.describe()}, {average:.1f}s/product, {errors:.0%} errors"
+
+class CircuitBreaker:
+    """Stops the scrape loop during a timeout storm and probes until the website answers again
+
+    Opens after consecutive_limit timeouts in a row, or window_limit timeouts among the last
+    window results. While open every worker waits; one of them scrapes a probe item after
+    first_probe_seconds, then at doubling intervals (up to max_probe_seconds), and the circuit
+    closes as soon as a probe (or a product still in flight) gets an answer.
+
+    The probe item is probe_link if given, otherwise the last product that was scraped
+    without a timeout (or the waiting row itself if nothing worked yet).
+    """
+    def __init__(self, consecutive_limit=5, window=20, window_limit=10, first_probe_seconds=15, max_probe_seconds=300,
+                 probe_link=None, probe_unit=None, clock=time.time):
+        self.clock = clock
+        self.consecutive_limit = consecutive_limit
+        self.window_limit = window_limit
+        self.first_probe_seconds = first_probe_seconds
+        self.max_probe_seconds = max_probe_seconds
+        self.fixed_probe = probe_link is not None
+        self.good_item = (probe_link, probe_unit) if probe_link else None
+        self.recent = deque(maxlen=window)  # True for every timeout among the latest results
+        self.consecutive = 0
+        self.is_open = False
+        self.probing = False
+        self.probe_interval = first_probe_seconds
+        self.next_probe = 0.0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.open_seconds = 0.0
+        self.condition = threading.Condition()
+
+    def record(self, timed_out, link=None, expected_unit=None):
+        """Feed one product result
+
+        Returns True when the result must not be written: it timed out while the circuit is
+        (or just went) open, so the row is retried once the website answers again.
+        """
+        with self.condition:
+            if self.is_open:
+                if timed_out:
+                    return True
+                self.close("a product got an answer")
+                return False
+            self.recent.append(timed_out)
+            if not timed_out:
+                self.consecutive = 0
+                if not self.fixed_probe and link:
+                    self.good_item = (link, expected_unit)
+                return False
+            self.consecutive += 1
+            if self.consecutive >= self.consecutive_limit:
+                self.trip(f"{self.consecutive} timeouts in a row")
+                return True
+            if sum(self.recent) >= self.window_limit:
+                self.trip(f"{sum(self.recent)} timeouts in the last {len(self.recent)} products")
+                return True
+            return False
+
+    def trip(self, reason):
+        """Open the circuit (caller holds the lock)"""
+        self.is_open = True
+        self.times_opened += 1
+        self.opened_at = self.clock()
+        self.probe_interval = self.first_probe_seconds
+        self.next_probe = self.opened_at + self.probe_interval
+        print(f"\n🔌 Circuit open ({reason}) - pausing the scrape, first probe in {self.probe_interval:.0f}s")
+
+    def close(self, reason):
+        """Close the circuit (caller holds the lock)"""
+        paused = self.clock() - self.opened_at
+        self.open_seconds += paused
+        self.is_open = False
+        self.consecutive = 0
+        self.recent.clear()
+        self.condition.notify_all()
+        print(f"\n🔌 Circuit closed ({reason}) after {paused:.0f}s - scraping again")
+
+    def wait_until_closed(self, probe, stop_event=None, fallback_item=None):
+        """Block while the circuit is open; the caller whose turn it is runs probe(link, expected_unit)
+
+        probe returns True when the website answered. Returns False if stop_event was set
+        while waiting (True once the circuit is closed).
+        """
+        while True:
+            with self.condition:
+                if not self.is_open:
+                    return True
+                if stop_event is not None and stop_event.is_set():
+                    return False
+                now = self.clock()
+                if self.probing or now < self.next_probe:
+                    self.condition.wait(timeout=min(1.0, max(0.05, self.next_probe - now)))
+                    continue
+                self.probing = True
+                item = self.good_item or fallback_item
+            answered = False
+            try:
+                answered = probe(*item)
+            finally:
+                with self.condition:
+                    self.probing = False
+                    if answered:
+                        if self.is_open:
+                            self.close("probe answered")
+                    elif self.is_open:
+                        self.probe_interval = min(self.max_probe_seconds, self.probe_interval * 2)
+                        self.next_probe = self.clock() + self.probe_interval
+                        print(f"\n🔌 Probe failed - circuit stays open, next probe in {self.probe_interval:.0f}s")
+                    self.condition.notify_all()
+
+    def summary(self):
+        with self.condition:
+            if not self.times_opened:
+                return None
+            open_seconds = self.open_seconds + (self.clock() - self.opened_at if self.is_open else 0)
+            return f"Circuit breaker opened {self.times_opened} times, scraping paused for {open_seconds:.0f}s"
+
+class RetryScheduler:
+    """Rows whose scrape timed out or lost its session, waiting for another attempt
+
+    A row is tried again base_delay seconds after it failed, doubled for every further
+    attempt (up to max_delay) with random jitter, so rows that failed together don't all
+    come back at the same moment. The rows wait until the main pass is done. After
+    max_attempts attempts (the first one included) the row keeps its last result.
+
+    Used by the thread that writes the results only (not thread-safe).
+    """
+    def __init__(self, max_attempts=4, base_delay=30, max_delay=600, jitter=0.5, clock=time.time):
+        self.clock = clock
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max(max_delay, base_delay)
+        self.jitter = jitter
+        self.waiting = []  # Heap of (due time, order, key, task)
+        self.order = itertools.count()
+        self.failures = {}  # key -> failed attempts so far
+        self.finished = {}  # key -> (attempts, outcome) of rows that needed more than one attempt
+
+    def __len__(self):
+        return len(self.waiting)
+
+    def attempt(self, key):
+        """Number of the attempt a row is on (1 = first)"""
+        return self.failures.get(key, 0) + 1
+
+    def defer(self, key, task):
+        """Count a failed attempt and schedule the next one
+
+        Returns the delay in seconds, or None when the row has used all its attempts.
+        """
+        failures = self.failures[key] = self.failures.get(key, 0) + 1
+        if failures >= self.max_attempts:
+            self.finished[key] = (failures, "gave up")
+            return None
+        delay = min(self.max_delay, self.base_delay * 2 ** (failures - 1))
+        delay *= random.uniform(1 - self.jitter, 1 + self.jitter)
+        heapq.heappush(self.waiting, (self.clock() + delay, next(self.order), key, task))
+        return delay
+
+    def finish(self, key, outcome):
+        """Record the outcome of a row that got an answer after failed attempts"""
+        if key in self.failures:
+            self.finished[key] = (self.failures[key] + 1, outcome)
+
+    def seconds_until_due(self):
+        """Seconds until the next row is due (0 if one is due, None if none is waiting)"""
+        if not self.waiting:
+            return None
+        return max(0.0, self.waiting[0][0] - self.clock())
+
+    def pop_due(self):
+        """Remove and return the tasks of every row that is due"""
+        now = self.clock()
+        tasks = []
+        while self.waiting and self.waiting[0][0] <= now:
+            tasks.append(heapq.heappop(self.waiting)[3])
+        return tasks
+
+    def summary(self):
+        """(rows retried, rows that got an answer, rows given up, rows still waiting)"""
+        answered = sum(1 for _, outcome in self.finished.values() if outcome != "gave up")
+        return len(self.failures), answered, len(self.finished) - answered, len(self.waiting)
+
+class Hedger:
+    """Lets idle workers open items that take unusually long a second time (first answer wins)
+
+    Every worker registers the item it starts. A worker with nothing left to do asks for an
+    item that has been running longer than the given percentile of the item times so far
+    (and at least min_seconds), and scrapes it too. The first good result is used and the
+    other worker is told to stop through its cancel event. At most max_rate of the items
+    are hedged, so the load on the website can't double.
+    """
+    def __init__(self, percentile=90, min_seconds=4.0, max_rate=0.05, min_samples=20, clock=time.time):
+        self.clock = clock
+        self.percentile = percentile
+        self.min_seconds = min_seconds
+        self.max_rate = max_rate
+        self.min_samples = min_samples
+        self.durations = deque(maxlen=200)  # Seconds of the latest finished attempts
+        self.running = {}  # key -> {'task', 'started', 'attempts': {worker_id: cancel event}, 'primary', 'hedged', 'done'}
+        self.started_count = 0
+        self.hedge_count = 0
+        self.hedge_wins = 0
+        self.lock = threading.Lock()
+
+    def threshold(self):
+        """Seconds after which an item may be hedged (None until enough items finished)"""
+        if len(self.durations) < self.min_samples:
+            return None
+        ordered = sorted(self.durations)
+        position = min(len(ordered) - 1, int(len(ordered) * self.percentile / 100))
+        return max(self.min_seconds, ordered[position])
+
+    def start(self, key, task, worker_id, cancel_event):
+        """Register the first attempt of an item"""
+        with self.lock:
+            self.started_count += 1
+            self.running[key] = {'task': task, 'started': self.clock(), 'attempts': {worker_id: cancel_event},
+                                 'primary': worker_id, 'hedged': False, 'done': False}
+
+    def pick(self, worker_id, cancel_event):
+        """Task of the slowest running item that may be hedged by this (idle) worker, or None"""
+        with self.lock:
+            threshold = self.threshold()
+            if threshold is None or self.hedge_count >= max(1, int(self.started_count * self.max_rate)):
+                return None
+            now = self.clock()
+            candidates = [(now - entry['started'], key) for key, entry in self.running.items()
+                          if not entry['hedged'] and not entry['done'] and now - entry['started'] >= threshold]
+            if not candidates:
+                return None
+            elapsed, key = max(candidates)
+            entry = self.running[key]
+            entry['hedged'] = True
+            entry['attempts'][worker_id] = cancel_event
+            self.hedge_count += 1
+            print(f"\n🪁 Hedging: item running for {elapsed:.1f}s (over {threshold:.1f}s) opened by an idle worker too")
+            return entry['task']
+
+    def finish(self, key, worker_id, result, seconds, failed):
+        """Hand in one attempt's result
+
+        Returns the result to write, or None when it must be dropped: the other attempt
+        already won, or this one failed while the other is still running.
+        """
+        with self.lock:
+            self.durations.append(seconds)
+            entry = self.running.get(key)
+            if entry is None:
+                return result
+            entry['attempts'].pop(worker_id, None)
+            if entry['done']:
+                delivered = None  # The other attempt already answered
+            elif failed and entry['attempts']:
+                delivered = None  # The other attempt may still get an answer
+            else:
+                entry['done'] = True
+                delivered = result
+                if entry['hedged'] and not failed and worker_id != entry['primary']:
+                    self.hedge_wins += 1
+                for cancel_event in entry['attempts'].values():
+                    cancel_event.set()  # The other attempt stops at its next check
+            if not entry['attempts']:
+                del self.running[key]
+            return delivered
+
+    def summary(self):
+        with self.lock:
+            if not self.hedge_count:
+                return None
+            rate = self.hedge_count / max(1, self.started_count)
+            return (f"Hedged {self.hedge_count} of {self.started_count} items ({rate:.1%}, limit {self.max_rate:.0%}), "
+                    f"the second worker answered first {self.hedge_wins} times")
@@ -0,0 +1,105 @@
+"""Blocks requests of a browser tab by resource type (DevTools Fetch domain)
+
+Network.setBlockedURLs only takes URL patterns, so a font or image whose URL has no file
+extension (or a query string instead) would still load. The Fetch domain can hold back
+requests by resource type, but every held request must then be answered, and WebDriver's
+execute_cdp_cmd can't receive the events that announce them. So a ResourceTypeBlocker
+thread opens its own DevTools connection to the tab, asks Chrome to hold back only the
+blocked types, and fails each of them at once. Every other request is never held.
+
+When the browser closes, the connection ends and so does the thread. If the connection
+breaks earlier, Chrome stops holding requests (nothing hangs, the types load again).
+
+Uses websocket-client, which Selenium already installs.
+"""
+import json
+import threading
+import urllib.request
+
+try:
+    import websocket
+except ImportError:
+    websocket = None  # Without it no type is blocked - the page loads as before
+
+def page_websocket_url(driver):
+    """DevTools websocket URL of the driver's tab (None if Chrome doesn't tell)"""
+    address = driver.capabilities.get('goog:chromeOptions', {}).get('debuggerAddress')
+    if not address:
+        return None
+    with urllib.request.urlopen(f"http://{address}/json/list", timeout=5) as response:
+        targets = json.loads(response.read().decode('utf-8'))
+    pages = [target for target in targets if target.get('type') == 'page']
+    return pages[0].get('webSocketDebuggerUrl') if pages else None
+
+class ResourceTypeBlocker(threading.Thread):
+    """Fails every request of the given resource types ("Image", "Font", ...) in one tab"""
+
+    def __init__(self, websocket_url, resource_types):
+        super().__init__(name="resource-blocker", daemon=True)
+        self.websocket_url = websocket_url
+        self.resource_types = list(resource_types)
+        self.blocked = 0
+        self.connection = None
+        self.ready = threading.Event()  # Set once Chrome holds back the blocked types (or that failed)
+        self.error = None
+        self.next_id = 0
+
+    def send(self, method, params):
+        self.next_id += 1
+        self.connection.send(json.dumps({'id': self.next_id, 'method': method, 'params': params}))
+        return self.next_id
+
+    def start_blocking(self, connection):
+        """Ask Chrome to hold back the blocked types, returns when it confirmed"""
+        self.connection = connection
+        request_id = self.send('Fetch.enable', {'patterns': [
+            {'urlPattern': '*', 'resourceType': resource_type, 'requestStage': 'Request'}
+            for resource_type in self.resource_types]})
+        while True:
+            message = json.loads(self.connection.recv())
+            if message.get('id') == request_id:
+                if 'error' in message:
+                    raise RuntimeError(message['error'].get('message', 'Fetch.enable failed'))
+                return
+            self.handle(message)
+
+    def handle(self, message):
+        """Fail a held request (other messages need no answer)"""
+        if message.get('method') == 'Fetch.requestPaused':
+            self.send('Fetch.failRequest', {'requestId': message['params']['requestId'], 'errorReason': 'BlockedByClient'})
+            self.blocked += 1
+
+    def run(self):
+        try:
+            # No Origin header: Chrome refuses DevTools connections from other origins
+            self.start_blocking(websocket.create_connection(self.websocket_url, timeout=None, suppress_origin=True))
+        except Exception as e:
+            self.error = e
+            return
+        finally:
+            self.ready.set()
+        try:
+            while True:
+                self.handle(json.loads(self.connection.recv()))
+        except Exception:
+            pass  # The browser closed (or the connection broke, then Chrome stops holding requests)
+        finally:
+            try:
+                self.connection.close()
+            except Exception:
+                pass
+
+def block_resource_types(driver, resource_types, timeout=5):
+    """Start a ResourceTypeBlocker for the driver's tab, returns it (raises if blocking could not start)"""
+    if websocket is None:
+        raise RuntimeError("websocket-client is not installed")
+    url = page_websocket_url(driver)
+    if url is None:
+        raise RuntimeError("Chrome did not report a DevTools address")
+    blocker = ResourceTypeBlocker(url, resource_types)
+    blocker.start()
+    if not blocker.ready.wait(timeout):
+        raise RuntimeError("Chrome did not confirm Fetch.enable")
+    if blocker.error is not None:
+        raise blocker.error
+    return blocker
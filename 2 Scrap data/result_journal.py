@@ -0,0 +1,231 @@
+"""Append-only journal of scrape results with per-record checksums
+
+Every written result is appended to the journal at once, as one line:
+
+    <crc32 of the JSON, 8 hex digits> <JSON record>
+
+A record holds the row, its Item Number and the cells the row has after the result was
+applied, so replaying the journal in order (last record of a row wins) always gives the
+same data, however often it is replayed. A line with a wrong checksum (a write cut off by
+a crash) is skipped.
+
+Lines are written by one background thread: whatever was appended while it wrote the
+previous group goes out in a single write and fsync (group commit). append() returns at
+once; flush() waits until everything appended is on disk, so callers wait once per batch
+(checkpoint) instead of once per record.
+
+Records are dropped once a workbook that contains them has been written, so the journal
+only ever holds the results the workbook doesn't have yet.
+
+Usage:
+    python result_journal.py check [journal]             verify the checksums
+    python result_journal.py replay workbook [journal]   fold the journal into a workbook
+"""
+import json
+import os
+import sys
+import threading
+import zlib
+
+DEFAULT_JOURNAL = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ScrappedProducts.journal")
+
+def encode_record(record):
+    data = json.dumps(record, ensure_ascii=False, separators=(',', ':'))
+    return f"{zlib.crc32(data.encode('utf-8')):08x} {data}\n"
+
+def decode_line(line):
+    """Record of a journal line (None if the line is cut off or its checksum doesn't match)"""
+    checksum, _, data = line.rstrip("\n").partition(" ")
+    try:
+        if len(checksum) != 8 or int(checksum, 16) != zlib.crc32(data.encode('utf-8')):
+            return None
+        return json.loads(data)
+    except ValueError:
+        return None
+
+def read_journal(path):
+    """(records, bad line count) of a journal file (no file = no records)"""
+    records = []
+    bad = 0
+    if not os.path.exists(path):
+        return records, bad
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = decode_line(line)
+            if record is None:
+                bad += 1
+            else:
+                records.append(record)
+    return records, bad
+
+def replay_records(df, records):
+    """Set the journaled cells in a DataFrame, returns how many records were applied
+
+    A record goes to its row index if that row still has the same Item Number, otherwise
+    to the row with that Item Number (rows added or sorted since). Records whose row can't
+    be found are skipped.
+    """
+    rows_by_key = {}
+    applied = 0
+    for record in records:
+        idx = record.get("row")
+        key = record.get("key")
+        key_col = record.get("key_col")
+        if key_col in df.columns and key is not None:
+            matches = lambda i: 0 <= i < len(df) and str(df.iloc[i][key_col]).strip() == key
+            if idx is None or not matches(idx):
+                if key_col not in rows_by_key:
+                    rows_by_key[key_col] = {str(value).strip(): i for i, value in enumerate(df[key_col])}
+                idx = rows_by_key[key_col].get(key)
+        if idx is None or not 0 <= idx < len(df):
+            continue
+        for col, value in record.get("cells", {}).items():
+            if col not in df.columns:
+                continue
+            if df[col].dtype != object:
+                df[col] = df[col].astype(str).replace('nan', '')
+            df.at[idx, col] = value
+        applied += 1
+    return applied
+
+class ResultJournal:
+    """Group-committed, checksummed append-only journal (thread-safe)"""
+
+    def __init__(self, path):
+        self.path = path
+        # Records of an earlier session stay in the file until a workbook has them, so the
+        # numbering continues after them (discard(upto) must never keep older records)
+        records, _ = read_journal(path)
+        last_seq = max((record.get("seq", 0) for record in records), default=0)
+        self.fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        if not self._ends_with_newline():
+            os.write(self.fd, b"\n")  # End a line cut off by a crash, so the next record starts a line of its own
+        self.condition = threading.Condition()
+        self.buffer = []  # Encoded lines waiting for the writer
+        self.appended = last_seq  # Sequence number of the last appended record
+        self.committed = last_seq  # Sequence number of the last record on disk
+        self.error = None
+        self.closed = False
+        self.writer = threading.Thread(target=self._write_loop, name="result-journal", daemon=True)
+        self.writer.start()
+
+    def _ends_with_newline(self):
+        with open(self.path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() == 0:
+                return True
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def append(self, record, wait=False):
+        """Add a record for the writer; with wait, return once it is on disk (raises OSError if writing failed)"""
+        with self.condition:
+            if self.closed:
+                raise ValueError("journal is closed")
+            self.appended += 1
+            seq = self.appended
+            self.buffer.append(encode_record(dict(record, seq=seq)))
+            self.condition.notify_all()
+            if wait:
+                while self.committed < seq and self.error is None:
+                    self.condition.wait()
+                if self.error is not None:
+                    raise self.error
+        return seq
+
+    def _write_loop(self):
+        while True:
+            with self.condition:
+                while not self.buffer and not self.closed:
+                    self.condition.wait()
+                if not self.buffer and self.closed:
+                    return
+                lines, self.buffer = self.buffer, []
+                seq = self.appended
+            try:
+                data = "".join(lines).encode("utf-8")
+                while data:
+                    written = os.write(self.fd, data)
+                    data = data[written:]
+                os.fsync(self.fd)
+            except OSError as e:
+                with self.condition:
+                    self.error = e
+                    self.condition.notify_all()
+                continue
+            with self.condition:
+                self.committed = seq
+                self.condition.notify_all()
+
+    def flush(self):
+        """Wait until every appended record is on disk (raises OSError once if a write failed since the last flush)"""
+        with self.condition:
+            while self.committed < self.appended and self.error is None:
+                self.condition.wait()
+            error, self.error = self.error, None
+        if error is not None:
+            raise error
+
+    def position(self):
+        """Sequence number of the last appended record (what a workbook snapshot taken now contains)"""
+        with self.condition:
+            return self.appended
+
+    def discard(self, upto=None):
+        """Drop the records the workbook has now: up to sequence number upto (default: all of them)"""
+        with self.condition:
+            # Holding the lock keeps new records out until the file is rewritten
+            while self.committed < self.appended and self.error is None:
+                self.condition.wait()
+            if upto is None or upto >= self.committed:
+                os.ftruncate(self.fd, 0)
+                os.fsync(self.fd)
+                return
+            records, _ = read_journal(self.path)
+            temp_path = self.path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                for record in records:
+                    if record.get("seq", 0) > upto:
+                        f.write(encode_record(record))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+            os.close(self.fd)
+            self.fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            with self.condition:
+                self.closed = True
+                self.condition.notify_all()
+            self.writer.join()
+            os.close(self.fd)
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in ("check", "replay") or (sys.argv[1] == "replay" and len(sys.argv) < 3):
+        print(__doc__.split("Usage:")[1])
+        sys.exit(1)
+    if sys.argv[1] == "check":
+        path = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_JOURNAL
+        records, bad = read_journal(path)
+        rows = {(record.get("key"), record.get("row")) for record in records}
+        print(f"{path}: {len(records)} records for {len(rows)} rows, {bad} damaged lines")
+        sys.exit(1 if bad else 0)
+
+    import pandas as pd
+    workbook = sys.argv[2]
+    path = sys.argv[3] if len(sys.argv) > 3 else DEFAULT_JOURNAL
+    records, bad = read_journal(path)
+    df = pd.read_excel(workbook)
+    applied = replay_records(df, records)
+    temp_path = workbook + ".replay.xlsx"
+    df.to_excel(temp_path, index=False)
+    os.replace(temp_path, workbook)
+    print(f"Replayed {applied} of {len(records)} records into {workbook} ({bad} damaged lines skipped)")
+
+if __name__ == "__main__":
+    main()
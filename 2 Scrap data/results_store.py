@@ -0,0 +1,133 @@
+"""SQLite results store: the working state of a scrape, keyed by Item Number
+
+Rewriting the whole workbook every 20 products gets slower as the catalog grows. Instead,
+every result is upserted into one row of a SQLite database (WAL mode), in transactions of
+a few rows, and the workbook is only written at the end of a run or on demand.
+
+The update rules of the workbook are enforced by the store itself: a cell only takes a
+new value when it is empty or holds an error the new value may replace (valid data is
+never replaced by an error). A row is seeded with the workbook's cells the first time it
+is written after an export, so it starts from what the user sees in Excel.
+
+Rows written since the last export are marked pending. After a crash they are put back
+into the workbook data when the scraper starts (see pending_rows).
+"""
+import sqlite3
+import time
+
+COLUMNS = ("product_name", "description", "image_url")
+
+def may_overwrite(column):
+    """SQL condition: the new value (named parameter :column) may replace the stored cell
+
+    Same rules as apply_scrape_result:
+    - "Timeout error" only fills empty cells (or refreshes an earlier timeout)
+    - "Product not found" replaces empty cells and timeouts
+    - "Unit not matched" and valid data replace empty cells, timeouts and "Unit not matched"
+    - An empty new value never replaces anything
+    """
+    return f"""CASE
+        WHEN :{column} = '' THEN 0
+        WHEN :{column} = 'Timeout error' THEN {column} IN ('', 'Timeout error')
+        WHEN :{column} = 'Product not found' THEN {column} IN ('', 'Product not found', 'Timeout error')
+        ELSE {column} IN ('', 'Unit not matched', 'Timeout error')
+    END"""
+
+SEED_SQL = f"""
+    INSERT INTO results (key, row_idx, {', '.join(COLUMNS)}, pending, updated_at)
+    VALUES (:key, :row_idx, :seed_product_name, :seed_description, :seed_image_url, 0, :now)
+    ON CONFLICT(key) DO UPDATE SET
+        row_idx = excluded.row_idx,
+        {', '.join(f'{column} = excluded.{column}' for column in COLUMNS)}
+    WHERE pending = 0
+"""
+
+UPDATE_SQL = f"""
+    UPDATE results SET
+        {', '.join(f'{column} = CASE WHEN {may_overwrite(column)} THEN :{column} ELSE {column} END' for column in COLUMNS)},
+        pending = 1,
+        updated_at = :now
+    WHERE key = :key
+"""
+
+class ResultsStore:
+    """Row-level results of the scrape in SQLite (used by the thread that writes results)"""
+
+    def __init__(self, path, batch_size=20, batch_seconds=2.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.batch_seconds = batch_seconds
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")  # Durable at every checkpoint of the WAL, fast commits
+        self.connection.execute(f"""
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                row_idx INTEGER NOT NULL,
+                {', '.join(f"{column} TEXT NOT NULL DEFAULT ''" for column in COLUMNS)},
+                pending INTEGER NOT NULL DEFAULT 0,
+                updated_at REAL NOT NULL
+            )""")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS results_pending ON results (pending)")
+        self.connection.commit()
+        self.uncommitted = 0
+        self.last_commit = time.time()
+
+    def write(self, key, row_idx, current_values, new_values):
+        """Upsert one row's result, returns the (product_name, description, image_url) the row has now
+
+        Args:
+            key: Item Number of the row
+            row_idx: Row index in the workbook (to find the row again after a crash)
+            current_values: cells the workbook has for the row (the starting point after an export)
+            new_values: cells the scrape result wants to write ('' = nothing to write)
+        """
+        params = {"key": key, "row_idx": row_idx, "now": time.time()}
+        for column, seed, value in zip(COLUMNS, current_values, new_values):
+            params[f"seed_{column}"] = seed or ''
+            params[column] = value or ''
+        self.connection.execute(SEED_SQL, params)
+        self.connection.execute(UPDATE_SQL, params)
+        row = self.connection.execute(f"SELECT {', '.join(COLUMNS)} FROM results WHERE key = ?", (key,)).fetchone()
+        self.uncommitted += 1
+        if self.uncommitted >= self.batch_size or time.time() - self.last_commit >= self.batch_seconds:
+            self.commit()
+        return tuple(row)
+
+    def restore(self, key, row_idx, cells):
+        """Set a row's cells as they were before a crash (from the result journal), no rules applied"""
+        params = {"key": key, "row_idx": row_idx, "now": time.time()}
+        params.update(zip(COLUMNS, (value or '' for value in cells)))
+        self.connection.execute(f"""
+            INSERT INTO results (key, row_idx, {', '.join(COLUMNS)}, pending, updated_at)
+            VALUES (:key, :row_idx, {', '.join(f':{column}' for column in COLUMNS)}, 1, :now)
+            ON CONFLICT(key) DO UPDATE SET
+                row_idx = excluded.row_idx,
+                {', '.join(f'{column} = excluded.{column}' for column in COLUMNS)},
+                pending = 1,
+                updated_at = excluded.updated_at""", params)
+        self.uncommitted += 1
+
+    def commit(self):
+        """Make every write so far durable (one transaction for the whole batch)"""
+        self.connection.commit()
+        self.uncommitted = 0
+        self.last_commit = time.time()
+
+    def pending_rows(self):
+        """[(key, row_idx, product_name, description, image_url)] of rows written since the last export"""
+        return self.connection.execute(
+            f"SELECT key, row_idx, {', '.join(COLUMNS)} FROM results WHERE pending = 1 ORDER BY row_idx").fetchall()
+
+    def mark_exported(self):
+        """The workbook now holds every pending row"""
+        self.connection.execute("UPDATE results SET pending = 0 WHERE pending = 1")
+        self.commit()
+
+    def stats(self):
+        """(rows stored, rows not in the workbook yet)"""
+        return self.connection.execute("SELECT COUNT(*), COALESCE(SUM(pending), 0) FROM results").fetchone()
+
+    def close(self):
+        self.commit()
+        self.connection.close()
@@ -0,0 +1,132 @@
+"""Run manifest: which rows a scrape run planned, finished and had in flight, to resume it
+
+The manifest is a JSON-lines file next to the workbook. The first line is the plan (rows
+in crawl order with their Item Numbers, and the run's options), every later line is one
+event:
+
+    {"start": [rows]}   rows handed to a browser
+    {"done": row}       row finished (scraped, skipped or given up)
+    {"resumed": time}   the run was continued
+    {"finished": time}  the run completed
+
+Appending one short line per event keeps the manifest cheap to update however many rows
+the run has. A line cut off by a crash is ignored when the manifest is read.
+"""
+import json
+import os
+import time
+
+class RunManifest:
+    """Plan and progress of one scrape run (written by the thread that writes results)"""
+
+    def __init__(self, path, planned, keys, options, started=None):
+        self.path = path
+        self.planned = planned  # Row indices in crawl order
+        self.keys = keys  # Row index -> Item Number when the run was planned
+        self.options = options
+        self.started = started or time.time()
+        self.started_rows = set()
+        self.done_rows = set()
+        self.finished = False
+        self.file = None
+
+    @classmethod
+    def create(cls, path, planned, keys, options):
+        """Start a new manifest (replaces the one of an earlier run)"""
+        manifest = cls(path, list(planned), dict(zip(planned, keys)), options)
+        manifest._rewrite()
+        return manifest
+
+    @classmethod
+    def load(cls, path):
+        """Manifest of the last run (None if there is none or its plan can't be read)"""
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            try:
+                header = json.loads(f.readline())
+                planned = [idx for idx, _ in header["planned"]]
+                manifest = cls(path, planned, {idx: key for idx, key in header["planned"]},
+                               header.get("options", {}), header.get("started"))
+            except (ValueError, KeyError, TypeError):
+                return None
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue  # Half-written line from a crash
+                if "start" in event:
+                    manifest.started_rows.update(event["start"])
+                elif "done" in event:
+                    manifest.done_rows.add(event["done"])
+                elif "finished" in event:
+                    manifest.finished = True
+        return manifest
+
+    def in_flight(self):
+        """Rows handed to a browser that never finished"""
+        return self.started_rows - self.done_rows
+
+    def remaining(self):
+        """Rows still to do: the ones in flight first, then the rest in planned order"""
+        in_flight = self.in_flight()
+        return [idx for idx in self.planned if idx in in_flight] + \
+               [idx for idx in self.planned if idx not in in_flight and idx not in self.done_rows]
+
+    def _rewrite(self):
+        """Write the plan and the progress so far as a new manifest (through a temp file)"""
+        self.close()
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"started": round(self.started), "options": self.options,
+                                "planned": [[idx, self.keys.get(idx)] for idx in self.planned]}) + "\n")
+            started = [idx for idx in self.planned if idx in self.started_rows]
+            if started:
+                f.write(json.dumps({"start": started}) + "\n")
+            for idx in self.planned:
+                if idx in self.done_rows:
+                    f.write(json.dumps({"done": idx}) + "\n")
+        os.replace(temp_path, self.path)
+
+    def remap(self, rows):
+        """Move the plan to new row indices (rows: old index -> new index, None = row is gone)
+
+        The manifest is rewritten, so the events of the rest of the run match the plan.
+        """
+        moved = lambda indices: [rows[idx] for idx in indices if rows.get(idx) is not None]
+        self.keys = {rows[idx]: key for idx, key in self.keys.items() if rows.get(idx) is not None}
+        self.planned = moved(self.planned)
+        self.started_rows = set(moved(self.started_rows))
+        self.done_rows = set(moved(self.done_rows))
+        self._rewrite()
+
+    def _append(self, event):
+        if self.file is None:
+            self.file = open(self.path, "a", encoding="utf-8")
+        self.file.write(json.dumps(event) + "\n")
+        self.file.flush()
+
+    def resumed(self):
+        self._append({"resumed": round(time.time())})
+
+    def start(self, rows):
+        """Rows handed to a browser (a retried row is still in flight from its first attempt)"""
+        rows = [idx for idx in rows if idx not in self.started_rows]
+        if rows:
+            self.started_rows.update(rows)
+            self._append({"start": rows})
+
+    def done(self, idx):
+        if idx not in self.done_rows:
+            self.done_rows.add(idx)
+            self._append({"done": idx})
+
+    def finish(self):
+        self.finished = True
+        self._append({"finished": round(time.time())})
+        self.close()
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
@@ -3,20 +3,33 @@ import os
 import sys
 import re
 import time
-import shutil
 import json
+import threading
+from collections import deque
+import queue
+import concurrent.futures
 from datetime import datetime
 from pathlib import Path
 from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, InvalidSessionIdException, WebDriverException
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, InvalidSessionIdException, WebDriverException, JavascriptException
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 from urllib3.exceptions import ReadTimeoutError, ConnectionError as Urllib3ConnectionError
 import socket
-import html
+import signal
+import io
+import base64
+from contextlib import redirect_stdout
+from page_extraction import (
+    EXTRACT_PAGE_JS, WAIT_FOR_READY_JS, HASH_NAVIGATE_JS, NOT_FOUND_INDICATORS, PRODUCT_INDICATORS,
+    scan_page_source, normalize_unit, is_tag_image_url, choose_product_image, clean_description,
+    extract_unit_from_source, extract_image_from_source, extract_product_name_from_source,
+    extract_description_from_source, parse_captured_page, get_item_id, build_scrape_result,
+)
+from item_api import parse_item_detail_json
+from chrome_profiles import acquire_profile, release_profile, reset_profile, is_prewarmed, mark_prewarmed
+from chrome_processes import driver_pid, process_tree_pids, process_tree_memory_mb, kill_processes, kill_driver, reap_orphaned_browsers
 
 # Debug logging helper
 DEBUG_LOG_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), ".cursor", "debug.log")
@@ -42,216 +55,1045 @@ def debug_log(location, message, data=None, hypothesis_id=None):
 # Path to Excel file (in parent folder)
 excel_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "ScrappedProducts.xlsx")
 backup_folder = os.path.join(os.path.dirname(os.path.dirname(__file__)), "Backups")
-MAX_BACKUPS = 5  # Keep last 5 backups
-
-# Read the Excel file
-print("Reading Excel file...")
-try:
-    # Check if file exists
-    if not os.path.exists(excel_path):
-        print(f"ERROR: Excel file not found at: {excel_path}")
-        print("Please make sure the file exists and the path is correct.")
-        sys.exit(1)
-    
-    # Check if file is accessible (not locked by another program)
-    try:
-        # Try to open the file to check if it's locked
-        test_file = open(excel_path, 'r+b')
-        test_file.close()
-    except PermissionError:
-        print(f"ERROR: Excel file is locked or in use!")
-        print("Please close the Excel file if it's open and try again.")
-        sys.exit(1)
-    except Exception as e:
-        print(f"ERROR: Cannot access Excel file: {e}")
-        sys.exit(1)
-    
-    # Try to read the Excel file
-    df = pd.read_excel(excel_path)
-    print(f"Successfully loaded Excel file with {len(df)} rows")
-    
-except pd.errors.EmptyDataError:
-    print(f"ERROR: Excel file is empty: {excel_path}")
-    sys.exit(1)
-except Exception as e:
-    error_msg = str(e).lower()
-    if 'badzipfile' in error_msg or 'not a zip file' in error_msg:
-        print(f"ERROR: Excel file appears to be corrupted or not a valid Excel file!")
-        print(f"File path: {excel_path}")
-        print("Possible causes:")
-        print("  1. File is corrupted - try opening it in Excel and saving again")
-        print("  2. File is currently open in Excel - close it and try again")
-        print("  3. File is not actually an Excel file - check the file extension")
-        print(f"\nError details: {e}")
-    else:
-        print(f"ERROR: Failed to read Excel file: {e}")
-        print(f"File path: {excel_path}")
-    sys.exit(1)
+PARALLEL_WORKERS = 1  # Number of Chrome instances scraping at the same time (1 = single browser)
+ADAPTIVE_PACE = True  # Adapt the pause after each product (and the active workers) to how the website responds, False = fixed 0.2s pause
+MIN_PRODUCT_DELAY = 0.0  # Shortest pause after a product (seconds)
+MAX_PRODUCT_DELAY = 5.0  # Longest pause after a product, reached while the website keeps timing out
+PRODUCT_DELAY_STEP = 0.05  # Pause taken off after every healthy round of products
+MIN_ACTIVE_WORKERS = 1  # Parallel mode: workers never paused below this many
+SLOW_PRODUCT_SECONDS = 20  # Average product time (last 20 products) above this counts as the website struggling
+CIRCUIT_BREAKER = True  # Pause the scrape while the website keeps timing out (rows are left as they are, not marked "Timeout error")
+CIRCUIT_CONSECUTIVE_TIMEOUTS = 5  # Timeouts in a row that open the circuit
+CIRCUIT_WINDOW_TIMEOUTS = 10  # ... or this many timeouts among the last 20 products
+CIRCUIT_FIRST_PROBE_SECONDS = 15  # Wait before the first probe, doubled after every failed probe
+CIRCUIT_MAX_PROBE_SECONDS = 300  # Longest wait between probes
+PROBE_ITEM_LINK = None  # Item page used to check if the website answers again (None = last product that worked)
+PROBE_ITEM_UNIT = "EA"  # Expected unit of PROBE_ITEM_LINK
+RETRY_MAX_ATTEMPTS = 4  # Attempts per row for timeouts and lost sessions - failed rows are tried again after the main pass (1 = no retries)
+RETRY_FIRST_DELAY = 30  # Seconds before a failed row is tried again, doubled for every further attempt (with random jitter)
+RETRY_MAX_DELAY = 600  # Longest wait before a retry
+HEDGE_SLOW_ITEMS = False  # Parallel mode: a worker with no rows left also opens an item that takes unusually long (first answer wins)
+HEDGE_PERCENTILE = 90  # "Unusually long" = longer than this percentile of the item times so far
+HEDGE_MIN_SECONDS = 4  # ... and at least this many seconds
+HEDGE_MAX_RATE = 0.05  # At most this share of the items is opened twice
+FETCH_BACKEND = "selenium"  # "selenium" = browser only, "http" = item API first, browser as fallback, "playwright" = one Chromium with many contexts
+PLAYWRIGHT_CONCURRENCY = 8  # Browser contexts (pages loading at the same time) with FETCH_BACKEND = "playwright"
+ITEM_API_URL = "https://www.biggestbook.com/api/itemDetail?itemId={item_id}"  # Item-detail JSON endpoint for FETCH_BACKEND = "http" ({item_id} = Item Number, copy it from DevTools if the site changes)
+ITEM_API_RECORD_DIR = None  # Folder to save raw item API responses to (for the stand-in server), None = off
+PARSE_PROCESSES = 0  # >0 = browsers only fetch pages, this many processes parse them (pipeline mode)
+PIPELINE_QUEUE_SIZE = 8  # Fetched pages allowed to wait for a parser before the browsers pause
+HEADLESS_MODE = True  # True = run Chrome without a window (new headless mode, minimal rendering), False = show it (useful for debugging)
+PAGE_LOAD_STRATEGY = "eager"  # "normal" = wait for every subresource, "eager" = wait for the HTML only, "none" = don't wait
+PAGE_READY_TIMEOUT = 10  # Seconds to wait for the unit element (or a not-found message) after the page returns
+READY_QUIET_MS = 50  # Once the unit shows, the page must stay unchanged this long so the rest of the item is rendered too
+NAVIGATION_MODE = "hash"  # "hash" = load the app once per browser, then open items by changing location.hash, "reload" = full page load per item
+HASH_NAV_TIMEOUT = 5  # Seconds to wait for the app to render the next item before falling back to a full page load
+HASH_NAV_MAX_FAILURES = 3  # Fallbacks in a row before a browser stops using hash navigation
+CAPTURE_NETWORK = False  # True = read the item JSON the app downloads (Chrome performance log) instead of the rendered page
+ITEM_RESPONSE_URL_MARKER = "itemdetail"  # Part of the app's item-detail request URL (lowercase, check DevTools if the site changes)
+
+# Requests Chrome never makes (DevTools Network.setBlockedURLs, '*' matches anything).
+# Blocking only affects downloads - image URLs are still read from the page.
+BLOCKED_URL_PATTERNS = [
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*googleadservices.com*",
+    "*facebook.net*", "*facebook.com/tr*", "*hotjar.com*", "*nr-data.net*", "*newrelic.com*",
+    "*clarity.ms*", "*bing.com/bat*", "*linkedin.com/px*", "*fonts.googleapis.com*", "*fonts.gstatic.com*",
+]
+# Resource types to block whatever their URL looks like (DevTools Fetch domain, see
+# resource_blocker.py). Don't add "Script" - the item page is built by JavaScript.
+# "Stylesheet" can change which text is visible.
+BLOCKED_RESOURCE_TYPES = ["Image", "Media", "Font"]
+PERSISTENT_PROFILES = True  # Reuse one Chrome profile per browser slot, so the website's scripts stay cached between starts
+profile_folder = os.path.join(os.path.dirname(os.path.dirname(__file__)), "ChromeProfiles")
+PROFILE_CACHE_MB = 300  # Disk cache size of each profile
+PREWARM_URL = "https://www.biggestbook.com/ui"  # Opened once in a new profile to fill its cache (None = off)
+PRODUCT_TIMEOUT = 45  # Hard limit in seconds per product (retries included) - a browser still busy after it is killed
+STANDBY_DRIVERS = 1  # Browsers kept started in the background and swapped in at once when a driver is recycled or lost (0 = off)
+RECYCLE_AFTER_PAGES = 400  # Replace a browser after this many pages, before its memory grows too much (0 = never)
+RECYCLE_MEMORY_MB = 1500  # Replace a browser whose processes use more memory than this (0 = never, JS heap only without psutil)
+RECYCLE_SLOWDOWN = 2.5  # Replace a browser when its last 20 pages take this many times longer than its first 20 (0 = never)
+REAP_ORPHANED_BROWSERS = True  # Kill chrome/chromedriver processes left running by crashed sessions (needs psutil)
+SNAPSHOT_PAGES = False  # Save every rendered item page to the snapshot store (for re-extraction later)
+snapshot_folder = os.path.join(os.path.dirname(os.path.dirname(__file__)), "Snapshots")
+ASSET_PROXY = False  # Send every browser through the local caching proxy (asset_proxy.py), so static files are downloaded once
+ASSET_PROXY_PORT = 8899  # A proxy already running on this port (python asset_proxy.py) is shared instead of starting one
+asset_cache_folder = os.path.join(os.path.dirname(os.path.dirname(__file__)), "AssetCache")
+CRAWL_ORDER = "learned"  # "learned" = items that were fast and worked before go first, slow/failing item groups last, "rows" = sheet order
+crawl_history_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "crawl_history.jsonl")  # Seconds and outcome of every scraped item
+RESULTS_STORE = True  # Checkpoint results in a SQLite store (row writes) instead of rewriting the workbook every 20 products - the workbook is written at the end
+results_store_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "ScrappedProducts.results.sqlite")
+RESULT_JOURNAL = True  # Append every result to a checksummed journal at once (replayed after a crash, emptied when the workbook is written)
+journal_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "ScrappedProducts.journal")
+RUN_MANIFEST = True  # Record the planned, finished and in-flight rows of every run, so it can be continued with --resume
+run_manifest_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "ScrappedProducts.run.jsonl")
+BACKGROUND_SAVES = True  # Write the workbook on a background thread (temp file + rename) while scraping goes on
 
-# Find the required columns
+# Loaded by load_workbook() when the script starts
+df = None
 link_col = None
 unit_col = None
 product_name_col = None
 description_col = None
 image_url_col = None
 
-for col in df.columns:
-    col_lower = col.lower()
-    if 'link' in col_lower and 'product' in col_lower:
-        link_col = col
-    elif 'unit' in col_lower and 'measure' in col_lower:
-        unit_col = col
-    elif 'product' in col_lower and 'name' in col_lower:
-        product_name_col = col
-    elif 'description' in col_lower:
-        description_col = col
-    elif 'image' in col_lower and 'url' in col_lower:
-        image_url_col = col
-
-print(f"Link column: {link_col}")
-print(f"Unit column: {unit_col}")
-print(f"Product Name column: {product_name_col}")
-print(f"Description column: {description_col}")
-print(f"Image URL column: {image_url_col}")
-
-# Global driver variable
-driver = None
-
-def create_backup():
-    """Create a backup of the Excel file and keep only the last MAX_BACKUPS backups"""
+def load_workbook():
+    """Read the Excel file and find the required columns (exits if the file can't be used)"""
+    global df, link_col, unit_col, product_name_col, description_col, image_url_col
+    
+    # Read the Excel file
+    print("Reading Excel file...")
     try:
-        # Create backup folder if it doesn't exist
-        os.makedirs(backup_folder, exist_ok=True)
-        
-        # Check if Excel file exists
+        # Check if file exists
         if not os.path.exists(excel_path):
-            print("Warning: Excel file not found, skipping backup...")
-            return
+            print(f"ERROR: Excel file not found at: {excel_path}")
+            print("Please make sure the file exists and the path is correct.")
+            sys.exit(1)
         
-        # Create backup filename with timestamp
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_filename = f"ScrappedProducts_backup_{timestamp}.xlsx"
-        backup_path = os.path.join(backup_folder, backup_filename)
-        
-        # Copy the Excel file to backup location
-        shutil.copy2(excel_path, backup_path)
-        print(f"Backup created: {backup_filename}")
-        
-        # Get all backup files and sort by modification time (newest first)
-        backup_files = []
-        for file in os.listdir(backup_folder):
-            if file.startswith("ScrappedProducts_backup_") and file.endswith(".xlsx"):
-                file_path = os.path.join(backup_folder, file)
-                backup_files.append((file_path, os.path.getmtime(file_path)))
-        
-        # Sort by modification time (newest first)
-        backup_files.sort(key=lambda x: x[1], reverse=True)
-        
-        # Keep only the last MAX_BACKUPS backups
-        if len(backup_files) > MAX_BACKUPS:
-            # Delete older backups
-            for file_path, _ in backup_files[MAX_BACKUPS:]:
-                try:
-                    os.remove(file_path)
-                    print(f"Deleted old backup: {os.path.basename(file_path)}")
-                except Exception as e:
-                    print(f"Error deleting old backup {file_path}: {e}")
+        # Check if file is accessible (not locked by another program)
+        try:
+            # Try to open the file to check if it's locked
+            test_file = open(excel_path, 'r+b')
+            test_file.close()
+        except PermissionError:
+            print(f"ERROR: Excel file is locked or in use!")
+            print("Please close the Excel file if it's open and try again.")
+            sys.exit(1)
+        except Exception as e:
+            print(f"ERROR: Cannot access Excel file: {e}")
+            sys.exit(1)
         
-        # Show current backup count
-        remaining_backups = min(len(backup_files), MAX_BACKUPS)
-        print(f"Total backups kept: {remaining_backups}/{MAX_BACKUPS}")
+        # Try to read the Excel file
+        df = pd.read_excel(excel_path)
+        print(f"Successfully loaded Excel file with {len(df)} rows")
         
+    except pd.errors.EmptyDataError:
+        print(f"ERROR: Excel file is empty: {excel_path}")
+        sys.exit(1)
     except Exception as e:
-        print(f"Error creating backup: {e}")
-
-def setup_driver():
-    """Setup and return Chrome driver"""
-    global driver
-    if driver is None:
-        print("\nSetting up Chrome driver...")
-        chrome_options = Options()
-        
-        # Set to False to see the browser (useful for debugging)
-        HEADLESS_MODE = False
-        
-        if HEADLESS_MODE:
-            chrome_options.add_argument('--headless')  # Run in background
-        
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--disable-dev-shm-usage')
-        chrome_options.add_argument('--disable-blink-features=AutomationControlled')
-        chrome_options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
-        chrome_options.add_argument('--window-size=1920,1080')
-        
-        # Suppress console errors and warnings to speed up execution
-        chrome_options.add_argument('--log-level=3')  # Only show fatal errors
-        chrome_options.add_argument('--disable-logging')
-        chrome_options.add_argument('--disable-gpu-logging')
-        chrome_options.add_experimental_option('excludeSwitches', ['enable-logging'])
-        chrome_options.add_experimental_option('useAutomationExtension', False)
-        
-        # Disable background services that cause DEPRECATED_ENDPOINT errors
-        chrome_options.add_argument('--disable-background-networking')
-        chrome_options.add_argument('--disable-background-timer-throttling')
-        chrome_options.add_argument('--disable-backgrounding-occluded-windows')
-        chrome_options.add_argument('--disable-breakpad')
-        chrome_options.add_argument('--disable-client-side-phishing-detection')
-        chrome_options.add_argument('--disable-component-extensions-with-background-page')
-        chrome_options.add_argument('--disable-default-apps')
-        chrome_options.add_argument('--disable-extensions')
-        chrome_options.add_argument('--disable-hang-monitor')
-        chrome_options.add_argument('--disable-popup-blocking')
-        chrome_options.add_argument('--disable-prompt-on-repost')
-        chrome_options.add_argument('--disable-sync')
-        chrome_options.add_argument('--disable-translate')
-        chrome_options.add_argument('--metrics-recording-only')
-        chrome_options.add_argument('--no-first-run')
-        chrome_options.add_argument('--safebrowsing-disable-auto-update')
-        chrome_options.add_argument('--enable-automation')
-        chrome_options.add_argument('--password-store=basic')
-        chrome_options.add_argument('--use-mock-keychain')
-        
-        # Additional options to prevent getting stuck:
-        # Disable images to reduce load time and prevent hanging on slow image loads
-        chrome_options.add_argument('--blink-settings=imagesEnabled=false')
-        chrome_options.add_argument('--disable-plugins')  # Disable plugins
-        chrome_options.add_argument('--disable-software-rasterizer')  # Reduce GPU issues
-        chrome_options.add_argument('--disable-web-security')  # Sometimes helps with CORS issues
-        chrome_options.add_argument('--disable-features=TranslateUI')  # Disable translation UI
-        chrome_options.add_argument('--disable-ipc-flooding-protection')  # Prevent IPC issues
-        
-        # Set preferences to limit resource loading
-        prefs = {
-            "profile.managed_default_content_settings.images": 2,  # Block images
-            "profile.default_content_setting_values.notifications": 2,  # Block notifications
-            "profile.default_content_settings.popups": 0,  # Allow popups (might be needed)
-        }
-        chrome_options.add_experimental_option("prefs", prefs)
-        
+        error_msg = str(e).lower()
+        if 'badzipfile' in error_msg or 'not a zip file' in error_msg:
+            print(f"ERROR: Excel file appears to be corrupted or not a valid Excel file!")
+            print(f"File path: {excel_path}")
+            print("Possible causes:")
+            print("  1. File is corrupted - try opening it in Excel and saving again")
+            print("  2. File is currently open in Excel - close it and try again")
+            print("  3. File is not actually an Excel file - check the file extension")
+            print(f"\nError details: {e}")
+        else:
+            print(f"ERROR: Failed to read Excel file: {e}")
+            print(f"File path: {excel_path}")
+        sys.exit(1)
+
+    # Find the required columns
+    link_col = None
+    unit_col = None
+    product_name_col = None
+    description_col = None
+    image_url_col = None
+
+    for col in df.columns:
+        col_lower = col.lower()
+        if 'link' in col_lower and 'product' in col_lower:
+            link_col = col
+        elif 'unit' in col_lower and 'measure' in col_lower:
+            unit_col = col
+        elif 'product' in col_lower and 'name' in col_lower:
+            product_name_col = col
+        elif 'description' in col_lower:
+            description_col = col
+        elif 'image' in col_lower and 'url' in col_lower:
+            image_url_col = col
+
+    print(f"Link column: {link_col}")
+    print(f"Unit column: {unit_col}")
+    print(f"Product Name column: {product_name_col}")
+    print(f"Description column: {description_col}")
+    print(f"Image URL column: {image_url_col}")
+    
+    recover_pending_results()
+    replay_journal()
+
+class DriverSlot:
+    """Holds the Chrome driver owned by one scraping worker"""
+    def __init__(self, index=0):
+        self.index = index
+        self.driver = None
+        self.pages_loaded = 0  # Pages opened and how long they took until readable (for latency stats)
+        self.load_seconds = 0.0
+        self.profile_dir = None  # Persistent Chrome profile locked by this slot (None = temporary profile)
+        self.app_loaded = False  # True while the browser shows a rendered item, so the next one can be opened by hash
+        self.hash_navigation = NAVIGATION_MODE == "hash"
+        self.hash_failures = 0
+        self.driver_pages = 0  # Pages opened by the current browser (for recycling)
+        self.first_seconds = []  # Load times of the current browser's first pages (its baseline)
+        self.recent_seconds = deque(maxlen=20)  # Load times of its latest pages
+        self.hung = False  # Set by the watchdog when it killed this slot's browser mid-product
+        self.cancel = threading.Event()  # Set when another worker already got the item this slot is scraping (hedging)
+    
+    def attach(self, driver, profile_dir):
+        """Give the slot a freshly started browser"""
+        self.driver = driver
+        self.profile_dir = profile_dir
+        self.app_loaded = False
+        self.hash_navigation = NAVIGATION_MODE == "hash"
+        self.hash_failures = 0
+        self.driver_pages = 0
+        self.first_seconds = []
+        self.recent_seconds.clear()
+    
+    def detach(self):
+        """Take the browser away from the slot, returns (driver, profile folder) for retire_driver"""
+        driver, profile_dir = self.driver, self.profile_dir
+        self.driver = None
+        self.profile_dir = None
+        self.app_loaded = False
+        return driver, profile_dir
+    
+    def record_page(self, seconds):
+        """Count a page and how long it took until readable"""
+        self.pages_loaded += 1
+        self.load_seconds += seconds
+        self.driver_pages += 1
+        if self.driver_pages > 1 and len(self.first_seconds) < self.recent_seconds.maxlen:
+            self.first_seconds.append(seconds)  # The first page also loads the app, so it's left out
+        self.recent_seconds.append(seconds)
+    
+    def quit(self):
+        """Close the browser owned by this slot (errors are ignored)"""
+        retire_driver(*self.detach())
+
+# Driver slot used by the single-browser mode (workers get their own slots)
+main_slot = DriverSlot(0)
+
+# Shared item API client (created on first use when FETCH_BACKEND is "http")
+item_api_client = None
+item_api_lock = threading.Lock()
+
+def get_item_api_client():
+    """Return the shared item API client, creating it on first use"""
+    global item_api_client
+    with item_api_lock:
+        if item_api_client is None:
+            from item_api import ItemApiClient
+            item_api_client = ItemApiClient(ITEM_API_URL, record_dir=ITEM_API_RECORD_DIR)
+        return item_api_client
+
+# Shared page snapshot store (opened on first use)
+snapshot_store = None
+snapshot_store_lock = threading.Lock()
+
+def get_snapshot_store():
+    """Return the shared snapshot store, opening it on first use"""
+    global snapshot_store
+    with snapshot_store_lock:
+        if snapshot_store is None:
+            from snapshot_store import SnapshotStore
+            snapshot_store = SnapshotStore(snapshot_folder)
+        return snapshot_store
+
+def save_snapshot(link, page_data, page_source):
+    """Save a rendered page to the snapshot store (errors are printed, never raised)"""
+    item_id = get_item_id(link)
+    if not item_id:
+        return
+    try:
+        get_snapshot_store().save(item_id, {'link': link, 'page_data': page_data, 'page_source': page_source})
+    except Exception as e:
+        print(f"    Could not save page snapshot: {e}")
+
+# SQLite results store, the working state while scraping (opened on first use when RESULTS_STORE is True)
+results_store = None
+results_store_lock = threading.Lock()
+
+def get_results_store():
+    """Return the shared results store, opening it on first use (None when RESULTS_STORE is off)"""
+    global results_store
+    if not RESULTS_STORE:
+        return None
+    with results_store_lock:
+        if results_store is None:
+            from results_store import ResultsStore
+            results_store = ResultsStore(results_store_path)
+        return results_store
+
+# Result journal (opened on first use when RESULT_JOURNAL is True)
+result_journal = None
+result_journal_lock = threading.Lock()
+
+def get_result_journal():
+    """Return the shared result journal, opening it on first use (None when RESULT_JOURNAL is off)"""
+    global result_journal
+    if not RESULT_JOURNAL:
+        return None
+    with result_journal_lock:
+        if result_journal is None:
+            from result_journal import ResultJournal
+            result_journal = ResultJournal(journal_path)
+        return result_journal
+
+def journal_result(idx, result):
+    """Append the cells a row has after a result to the journal (on disk at the latest after flush_journal)"""
+    journal = get_result_journal()
+    if journal is None:
+        return
+    from crawl_history import result_outcome
+    cells = {col: df.at[idx, col] for col in [product_name_col, description_col, image_url_col]}
+    try:
+        journal.append({"row": idx, "key": result_key(idx), "key_col": find_item_number_col(),
+                        "outcome": result_outcome(result), "cells": cells})
+    except (OSError, ValueError) as e:
+        print(f"    Could not write the result journal: {e}")
+
+def flush_journal():
+    """Wait until every journaled result is on disk (once per checkpoint, not once per result)"""
+    journal = get_result_journal()
+    if journal is None:
+        return
+    try:
+        journal.flush()
+    except OSError as e:
+        print(f"    Could not write the result journal: {e}")
+
+def replay_journal():
+    """Put results from the journal back into the data (they never reached the workbook)"""
+    if not RESULT_JOURNAL:
+        return
+    from result_journal import read_journal, replay_records
+    started = time.time()
+    records, bad = read_journal(journal_path)
+    if not records and not bad:
+        return
+    applied = replay_records(df, records)
+    store = get_results_store()
+    if store is not None:
+        # The store may have missed the last uncommitted rows - the journal has them
+        for record in records:
+            cells = record.get("cells", {})
+            store.restore(record.get("key"), record.get("row"), [cells.get(col, '') for col in [product_name_col, description_col, image_url_col]])
+        store.commit()
+    print(f"Replayed {applied} results from the journal in {(time.time() - started) * 1000:.0f}ms"
+          f"{f' ({bad} damaged lines skipped)' if bad else ''}")
+
+def find_item_number_col():
+    """Name of the Item Number column (None if the workbook has none)"""
+    item_number_col = None
+    for col in df.columns:
+        col_lower = col.lower()
+        if col_lower == 'item number':
+            return col
+        elif 'item' in col_lower and 'number' in col_lower:
+            if 'stock' not in col_lower and 'butted' not in col_lower and item_number_col is None:
+                item_number_col = col
+    return item_number_col
+
+def result_key(idx):
+    """Results store key of a row: its Item Number (row number if it has none)"""
+    item_number_col = find_item_number_col()
+    if item_number_col and pd.notna(df.iloc[idx][item_number_col]):
+        return str(df.iloc[idx][item_number_col]).strip()
+    return f"row {idx + 1}"
+
+def result_keys(indices):
+    """Results store keys of many rows (same as result_key, read column-wise)"""
+    item_number_col = find_item_number_col()
+    if not item_number_col:
+        return [f"row {idx + 1}" for idx in indices]
+    values = df[item_number_col]
+    return [str(values.iat[idx]).strip() if pd.notna(values.iat[idx]) else f"row {idx + 1}" for idx in indices]
+
+def result_cells(result):
+    """(product_name, description, image_url) a scrape result writes ('' = nothing to write)"""
+    product_name, description, image_url, website_unit = result
+    if product_name in ("Unit not matched", "Product not found", "Timeout error"):
+        return product_name, product_name, product_name
+    return product_name or '', description or '', image_url or ''
+
+def store_result(idx, result, current_values):
+    """Write a result to the results store and take the row's cells from it (the store decides what is kept)"""
+    store = get_results_store()
+    if store is None or not any(result_cells(result)):
+        return
+    cells = store.write(result_key(idx), idx, current_values, result_cells(result))
+    for col, value in zip([product_name_col, description_col, image_url_col], cells):
+        df.at[idx, col] = value
+
+# Background writer of the workbook (started on first use when BACKGROUND_SAVES is True)
+workbook_writer = None
+workbook_writer_lock = threading.Lock()
+
+def get_workbook_writer():
+    """Return the shared workbook writer, starting it on first use (None when BACKGROUND_SAVES is off)"""
+    global workbook_writer
+    if not BACKGROUND_SAVES:
+        return None
+    with workbook_writer_lock:
+        if workbook_writer is None:
+            from workbook_writer import WorkbookWriter
+            workbook_writer = WorkbookWriter(excel_path)
+        return workbook_writer
+
+def submit_workbook_save():
+    """Queue a snapshot of the data for the background writer, returns its save number"""
+    from workbook_writer import snapshot_frame
+    journal = get_result_journal()
+    upto = journal.position() if journal is not None else None
+    snapshot = snapshot_frame(df, [product_name_col, description_col, image_url_col])
+    # Journal records older than the snapshot are in the workbook once it is renamed into place
+    on_written = (lambda: journal.discard(upto)) if journal is not None else None
+    return get_workbook_writer().submit(snapshot, on_written)
+
+def save_checkpoint():
+    """Make the results so far durable: commit the results store (or save the workbook without one)"""
+    flush_journal()
+    store = get_results_store()
+    if store is not None:
+        store.commit()
+    elif get_workbook_writer() is not None:
+        submit_workbook_save()  # Written in the background - scraping goes on
+    else:
+        export_workbook()
+
+def export_workbook(path=None):
+    """Write the workbook (to excel_path unless another path is given) with every result so far, returns when it is on disk"""
+    from workbook_writer import write_workbook_atomic
+    store = get_results_store()
+    if store is not None:
+        store.commit()
+    if path is not None:
+        write_workbook_atomic(df, path)
+        return
+    writer = get_workbook_writer()
+    if writer is not None:
+        writer.wait(submit_workbook_save())
+    else:
+        write_workbook_atomic(df, excel_path)
+        journal = get_result_journal()
+        if journal is not None:
+            journal.discard()  # Everything in it is in the workbook now
+    if store is not None:
+        store.mark_exported()
+
+def recover_pending_results():
+    """Put results that reached the store but not the workbook (crash, closed window) back into the data"""
+    if not RESULTS_STORE or not os.path.exists(results_store_path):
+        return
+    rows = get_results_store().pending_rows()
+    if not rows:
+        return
+    for col in [product_name_col, description_col, image_url_col]:
+        df[col] = df[col].astype(str).replace('nan', '')
+    rows_by_key = None
+    recovered = 0
+    for key, row_idx, *cells in rows:
+        if not (row_idx < len(df) and result_key(row_idx) == key):
+            # The workbook changed since - find the row by its Item Number
+            if rows_by_key is None:
+                rows_by_key = {result_key(idx): idx for idx in range(len(df))}
+            row_idx = rows_by_key.get(key)
+            if row_idx is None:
+                continue
+        for col, value in zip([product_name_col, description_col, image_url_col], cells):
+            df.at[row_idx, col] = value
+        recovered += 1
+    print(f"Recovered {recovered} results from the results store that were not saved to the workbook yet")
+
+# Latency/outcome history of scraped items (loaded on first use)
+crawl_history = None
+crawl_history_lock = threading.Lock()
+
+def get_crawl_history():
+    """Return the shared crawl history, loading it on first use (None if it can't be read)"""
+    global crawl_history
+    with crawl_history_lock:
+        if crawl_history is None:
+            from crawl_history import CrawlHistory
+            try:
+                crawl_history = CrawlHistory(crawl_history_path)
+            except OSError as e:
+                print(f"Warning: Could not load crawl history: {e}")
+                return None
+        return crawl_history
+
+def record_history(link, seconds, result):
+    """Add a scrape result to the crawl history (errors are printed, never raised)"""
+    history = get_crawl_history()
+    if history is None:
+        return
+    from crawl_history import result_outcome
+    try:
+        history.record(get_item_id(link), seconds, result_outcome(result))
+    except OSError as e:
+        print(f"    Could not write crawl history: {e}")
+
+# Local caching proxy for static files (started on first use when ASSET_PROXY is True)
+asset_proxy = None
+asset_proxy_lock = threading.Lock()
+asset_proxy_spki = None  # Public key hash of the proxy's own certificate when it decrypts HTTPS
+
+def get_asset_proxy_port():
+    """Return the port of the asset proxy, starting it on first use (None if it can't be started)"""
+    global asset_proxy, asset_proxy_spki
+    from asset_proxy import AssetProxy, fetch_stats
+    with asset_proxy_lock:
+        if asset_proxy is not None:
+            return asset_proxy.port
+        running = fetch_stats(ASSET_PROXY_PORT)
+        if running is not None:
+            asset_proxy_spki = running.get('certificate_spki')
+            return ASSET_PROXY_PORT  # Shared with another scraper process
+        try:
+            asset_proxy = AssetProxy(asset_cache_folder, ASSET_PROXY_PORT).start()
+        except OSError as e:
+            print(f"Warning: Could not start the asset proxy on port {ASSET_PROXY_PORT}: {e} - browsers connect directly")
+            return None
+        asset_proxy_spki = asset_proxy.spki_hash
+        print(f"Asset proxy running on 127.0.0.1:{asset_proxy.port} (cache: {asset_cache_folder})")
+        return asset_proxy.port
+
+def print_asset_proxy_stats():
+    """Print the asset proxy's cache hits and misses (nothing if no proxy is used)"""
+    if not ASSET_PROXY:
+        return
+    from asset_proxy import fetch_stats
+    stats = asset_proxy.stats() if asset_proxy is not None else fetch_stats(ASSET_PROXY_PORT)
+    if stats:
+        revalidated = stats.get('revalidated', 0)
+        print(f"Asset cache: {stats['memory_hits'] + stats['disk_hits'] + revalidated} hits "
+              f"({stats['memory_hits']} memory, {stats['disk_hits']} disk, {revalidated} revalidated), {stats['misses']} misses, "
+              f"{stats['bytes_from_cache'] / (1024 * 1024):.1f} MB served from cache")
+
+def create_backup():
+    """Back up the workbook file in the background (deduplicated chunks in the Backups folder, see backup_store.py)"""
+    from backup_store import backup_in_background
+    backup_in_background(excel_path, "ScrappedProducts", backup_folder)
+
+def apply_resource_policy(driver):
+    """Block BLOCKED_URL_PATTERNS and BLOCKED_RESOURCE_TYPES through the DevTools protocol"""
+    if BLOCKED_URL_PATTERNS:
+        try:
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_URL_PATTERNS})
+        except Exception as e:
+            print(f"Warning: Could not apply URL blocking ({e.__class__.__name__}), loading all resources")
+    if BLOCKED_RESOURCE_TYPES:
+        from resource_blocker import block_resource_types
+        try:
+            block_resource_types(driver, BLOCKED_RESOURCE_TYPES)
+        except Exception as e:
+            print(f"Warning: Could not block resource types ({e}), loading them")
+
+def prewarm_profile(driver, profile_dir):
+    """Open the website once in a new profile so its scripts are in the cache before the first product"""
+    print(f"Prewarming Chrome profile (first use)...")
+    try:
+        driver.get(PREWARM_URL)
+        time.sleep(3)  # Let the app download and compile its scripts
+        mark_prewarmed(profile_dir)
+    except Exception as e:
+        print(f"Warning: Could not prewarm the profile ({e.__class__.__name__})")
+
+# Profile folders used by a browser of this process right now (a standby or a browser that is
+# still shutting down holds one too, so the same folder is never given to two browsers)
+profiles_in_use = set()
+profiles_in_use_lock = threading.Lock()
+STANDBY_PROFILE_SLOTS = list(range(50, 70))  # Profile slots for standby browsers (and slots whose own profile is busy)
+
+def claim_profile(slot_indices):
+    """Lock the first free profile of the given slots, returns its folder (None if all are busy)"""
+    with profiles_in_use_lock:
+        for slot_index in slot_indices:
+            if os.path.join(profile_folder, f"slot_{slot_index}") in profiles_in_use:
+                continue
+            profile_dir = acquire_profile(profile_folder, slot_index)
+            if profile_dir is not None:
+                profiles_in_use.add(profile_dir)
+                return profile_dir
+    return None
+
+def unclaim_profile(profile_dir):
+    """Unlock a profile after its browser has quit"""
+    release_profile(profile_dir)
+    with profiles_in_use_lock:
+        profiles_in_use.discard(profile_dir)
+
+def retire_driver(driver, profile_dir):
+    """Quit a browser, kill whatever of it is still running afterwards and unlock its profile (errors are ignored)"""
+    if driver is not None:
+        pids = process_tree_pids(driver_pid(driver))  # Read before quitting - orphans can't be traced to it later
+        try:
+            driver.quit()
+        except:
+            pass  # Ignore errors when closing the driver
+        kill_processes(pids, grace_seconds=3)
+    if profile_dir is not None:
+        unclaim_profile(profile_dir)
+
+def browser_memory_mb(driver):
+    """Memory used by a driver's processes in MB (page JS heap without psutil, None if unknown)"""
+    memory_mb = process_tree_memory_mb(driver_pid(driver))
+    if memory_mb is not None:
+        return memory_mb
+    try:
+        heap = driver.execute_script("return performance.memory ? performance.memory.usedJSHeapSize : null;")
+        return heap / (1024 * 1024) if heap else None
+    except Exception:
+        return None
+
+def setup_driver(slot=None):
+    """Setup and return the Chrome driver of a slot (defaults to the main slot)"""
+    if slot is None:
+        slot = main_slot
+    if slot.driver is None:
+        if slot is main_slot:
+            print("\nSetting up Chrome driver...")
+        else:
+            print(f"\n[Worker {slot.index}] Setting up Chrome driver...")
+        slot.attach(*launch_driver([slot.index] + STANDBY_PROFILE_SLOTS))
+        driver_manager.fill()
+    return slot.driver
+
+def launch_driver(profile_slots):
+    """Start a Chrome with the scraper's settings
+    
+    Args:
+        profile_slots: Profile slots to try in order - the browser gets the first free one
+                       (a temporary profile if none is free)
+    
+    Returns:
+        (driver, profile folder or None)
+    """
+    chrome_options = Options()
+    # "eager"/"none": driver.get returns before every subresource has finished loading,
+    # scrape_product_data then waits for the unit element itself
+    chrome_options.page_load_strategy = PAGE_LOAD_STRATEGY
+    
+    if HEADLESS_MODE:
+        chrome_options.add_argument('--headless=new')  # Run in background
+        # Nothing is looked at, so skip as much rendering work as possible
+        chrome_options.add_argument('--disable-gpu')
+        chrome_options.add_argument('--mute-audio')
+        chrome_options.add_argument('--hide-scrollbars')
+        chrome_options.add_argument('--disable-smooth-scrolling')
+        chrome_options.add_argument('--force-device-scale-factor=1')
+    
+    chrome_options.add_argument('--no-sandbox')
+    chrome_options.add_argument('--disable-dev-shm-usage')
+    chrome_options.add_argument('--disable-blink-features=AutomationControlled')
+    chrome_options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+    chrome_options.add_argument('--window-size=1920,1080')
+    
+    # Suppress console errors and warnings to speed up execution
+    chrome_options.add_argument('--log-level=3')  # Only show fatal errors
+    chrome_options.add_argument('--disable-logging')
+    chrome_options.add_argument('--disable-gpu-logging')
+    chrome_options.add_experimental_option('excludeSwitches', ['enable-logging'])
+    chrome_options.add_experimental_option('useAutomationExtension', False)
+    
+    # Disable background services that cause DEPRECATED_ENDPOINT errors
+    chrome_options.add_argument('--disable-background-networking')
+    chrome_options.add_argument('--disable-background-timer-throttling')
+    chrome_options.add_argument('--disable-backgrounding-occluded-windows')
+    chrome_options.add_argument('--disable-breakpad')
+    chrome_options.add_argument('--disable-client-side-phishing-detection')
+    chrome_options.add_argument('--disable-component-extensions-with-background-page')
+    chrome_options.add_argument('--disable-default-apps')
+    chrome_options.add_argument('--disable-extensions')
+    chrome_options.add_argument('--disable-hang-monitor')
+    chrome_options.add_argument('--disable-popup-blocking')
+    chrome_options.add_argument('--disable-prompt-on-repost')
+    chrome_options.add_argument('--disable-sync')
+    chrome_options.add_argument('--disable-translate')
+    chrome_options.add_argument('--metrics-recording-only')
+    chrome_options.add_argument('--no-first-run')
+    chrome_options.add_argument('--safebrowsing-disable-auto-update')
+    chrome_options.add_argument('--enable-automation')
+    chrome_options.add_argument('--password-store=basic')
+    chrome_options.add_argument('--use-mock-keychain')
+    
+    # Additional options to prevent getting stuck:
+    # Disable images to reduce load time and prevent hanging on slow image loads
+    chrome_options.add_argument('--blink-settings=imagesEnabled=false')
+    chrome_options.add_argument('--disable-plugins')  # Disable plugins
+    chrome_options.add_argument('--disable-software-rasterizer')  # Reduce GPU issues
+    chrome_options.add_argument('--disable-web-security')  # Sometimes helps with CORS issues
+    disabled_features = ['TranslateUI']  # Disable translation UI
+    if HEADLESS_MODE:
+        disabled_features += ['PaintHolding', 'BackForwardCache', 'MediaRouter', 'OptimizationHints']
+    chrome_options.add_argument('--disable-features=' + ','.join(disabled_features))  # Chrome only reads one --disable-features
+    chrome_options.add_argument('--disable-ipc-flooding-protection')  # Prevent IPC issues
+    
+    # Set preferences to limit resource loading
+    prefs = {
+        "profile.managed_default_content_settings.images": 2,  # Block images
+        "profile.default_content_setting_values.notifications": 2,  # Block notifications
+        "profile.default_content_settings.popups": 0,  # Allow popups (might be needed)
+    }
+    chrome_options.add_experimental_option("prefs", prefs)
+    
+    profile_dir = None
+    if PERSISTENT_PROFILES:
+        profile_dir = claim_profile(profile_slots)
+        if profile_dir is None:
+            print(f"Warning: No free Chrome profile (slot {profile_slots[0]} is in use by another scraper), using a temporary profile")
+        else:
+            chrome_options.add_argument(f'--user-data-dir={profile_dir}')
+            chrome_options.add_argument(f'--disk-cache-size={PROFILE_CACHE_MB * 1024 * 1024}')
+    
+    if ASSET_PROXY:
+        proxy_port = get_asset_proxy_port()
+        if proxy_port is not None:
+            chrome_options.add_argument(f'--proxy-server=http://127.0.0.1:{proxy_port}')
+            if asset_proxy_spki:
+                # Accept the proxy's own certificate only - every other site's certificate is still checked
+                chrome_options.add_argument(f'--ignore-certificate-errors-spki-list={asset_proxy_spki}')
+    
+    if CAPTURE_NETWORK:
+        # Network events go to the performance log, so the app's item response can be found
+        chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+        chrome_options.add_experimental_option('perfLoggingPrefs', {'enableNetwork': True, 'enablePage': False})
+    
+    try:
         driver = webdriver.Chrome(options=chrome_options)
-        driver.implicitly_wait(1)  # Reduced to 1 second for faster failure detection
-        # Set page load timeout to prevent hanging (15 seconds max - optimized for speed)
-        driver.set_page_load_timeout(15)
-        # Set script timeout to prevent JS from hanging
-        driver.set_script_timeout(15)
-    return driver
-
-def recreate_driver():
-    """Recreate the Chrome driver when session is lost"""
-    global driver
+    except Exception as e:
+        if profile_dir is None:
+            raise
+        # A profile damaged by a crash can keep Chrome from starting - try once more with an empty one
+        print(f"Chrome could not start with profile {profile_dir} ({e.__class__.__name__}), resetting the profile...")
+        reset_profile(profile_dir)
+        try:
+            driver = webdriver.Chrome(options=chrome_options)
+        except Exception:
+            unclaim_profile(profile_dir)
+            raise
+    driver.implicitly_wait(0)  # Fallback lookups answer at once - wait_until_ready already waited for the page
+    # Set page load timeout to prevent hanging (15 seconds max - optimized for speed)
+    driver.set_page_load_timeout(15)
+    # Set script timeout to prevent JS from hanging
+    driver.set_script_timeout(15)
+    apply_resource_policy(driver)
+    if profile_dir is not None and PREWARM_URL and not is_prewarmed(profile_dir):
+        prewarm_profile(driver, profile_dir)
+    return driver, profile_dir
+
+def recreate_driver(slot=None):
+    """Recreate the Chrome driver of a slot when its session is lost"""
+    if slot is None:
+        slot = main_slot
+    if slot is main_slot:
+        print("\nRecreating Chrome driver (session was lost)...")
+    else:
+        print(f"\n[Worker {slot.index}] Recreating Chrome driver (session was lost)...")
+    return driver_manager.replace(slot)
+
+class DriverManager:
+    """Keeps standby browsers started in the background and replaces worn-out ones
+    
+    A lost or recycled browser is swapped for a standby at once; the old one quits on a
+    background thread and a new standby is started behind it. Without a ready standby the
+    slot's browser is started the usual way (cold start).
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.standby = []  # (driver, profile folder) started and waiting
+        self.launching = []  # Threads starting a standby
+        self.retiring = []  # Threads quitting old browsers
+        self.launch_failures = 0
+        self.closed = False
+    
+    def fill(self):
+        """Start standby browsers in the background until STANDBY_DRIVERS are ready or starting"""
+        with self.lock:
+            self.launching = [thread for thread in self.launching if thread.is_alive()]
+            # Stop trying after 3 failed starts in a row (Chrome keeps failing - don't start it over and over)
+            if self.closed or self.launch_failures >= 3:
+                return
+            while len(self.standby) + len(self.launching) < STANDBY_DRIVERS:
+                thread = threading.Thread(target=self.launch_standby, name="standby-driver", daemon=True)
+                self.launching.append(thread)
+                thread.start()
+    
+    def launch_standby(self):
+        try:
+            driver, profile_dir = launch_driver(STANDBY_PROFILE_SLOTS)
+        except Exception as e:
+            print(f"Warning: Could not start a standby browser: {e.__class__.__name__}")
+            with self.lock:
+                self.launch_failures += 1
+            return
+        with self.lock:
+            self.launch_failures = 0
+            if not self.closed:
+                self.standby.append((driver, profile_dir))
+                return
+        retire_driver(driver, profile_dir)  # Finished starting after close()
+    
+    def take(self):
+        """Return a ready standby (driver, profile folder) or None, and start its replacement"""
+        while True:
+            with self.lock:
+                standby = self.standby.pop(0) if self.standby else None
+            if standby is None:
+                return None
+            try:
+                standby[0].current_url  # Still alive after waiting?
+                break
+            except Exception:
+                self.retire(*standby)
+        self.fill()
+        return standby
+    
+    def retire(self, driver, profile_dir):
+        """Quit a browser on a background thread"""
+        thread = threading.Thread(target=retire_driver, args=(driver, profile_dir), name="retire-driver", daemon=True)
+        with self.lock:
+            self.retiring = [old for old in self.retiring if old.is_alive()]
+            self.retiring.append(thread)
+        thread.start()
+    
+    def replace(self, slot, reason=None):
+        """Give a slot a new browser (a standby if one is ready), the old one quits in the background"""
+        old_driver, old_profile_dir = slot.detach()
+        if old_driver is not None or old_profile_dir is not None:
+            self.retire(old_driver, old_profile_dir)
+        standby = self.take()
+        if standby is None:
+            return setup_driver(slot)
+        slot.attach(*standby)
+        print(f"    Swapped in a standby browser{f' ({reason})' if reason else ''}")
+        return slot.driver
+    
+    def recycle_reason(self, slot):
+        """Why the slot's browser should be replaced now (None = keep it)"""
+        if RECYCLE_AFTER_PAGES and slot.driver_pages >= RECYCLE_AFTER_PAGES:
+            return f"{slot.driver_pages} pages"
+        if RECYCLE_SLOWDOWN and len(slot.recent_seconds) == slot.recent_seconds.maxlen and \
+                len(slot.first_seconds) == slot.recent_seconds.maxlen and slot.driver_pages >= 2 * slot.recent_seconds.maxlen:
+            first = sum(slot.first_seconds) / len(slot.first_seconds)
+            recent = sum(slot.recent_seconds) / len(slot.recent_seconds)
+            if recent > first * RECYCLE_SLOWDOWN:
+                return f"pages slowed down from {first:.2f}s to {recent:.2f}s"
+        # Memory is only measured every 10 pages (walking the process tree isn't free)
+        if RECYCLE_MEMORY_MB and slot.driver_pages and slot.driver_pages % 10 == 0:
+            memory_mb = browser_memory_mb(slot.driver)
+            if memory_mb is not None and memory_mb > RECYCLE_MEMORY_MB:
+                return f"using {memory_mb:.0f} MB"
+        return None
+    
+    def check(self, slot):
+        """Recycle the slot's browser if it has done enough pages, uses too much memory or got slow"""
+        if slot.driver is None:
+            return
+        reason = self.recycle_reason(slot)
+        if reason is not None:
+            if slot is not main_slot:
+                print(f"\n[Worker {slot.index}] Recycling browser ({reason})...")
+            else:
+                print(f"\nRecycling browser ({reason})...")
+            try:
+                self.replace(slot, reason)
+            except Exception as e:
+                print(f"    Failed to start a new browser, will try on next product: {e}")
+    
+    def reap(self):
+        """Kill chrome/chromedriver processes left running by crashed sessions"""
+        if not REAP_ORPHANED_BROWSERS:
+            return
+        killed = reap_orphaned_browsers()
+        if killed:
+            print(f"Cleaned up {killed} Chrome/chromedriver processes left by crashed sessions")
+    
+    def close(self):
+        """Quit the standby browsers and wait for old browsers to finish quitting"""
+        with self.lock:
+            self.closed = True
+            standby, self.standby = self.standby, []
+            threads = self.launching + self.retiring
+        for driver, profile_dir in standby:
+            retire_driver(driver, profile_dir)
+        for thread in threads:
+            thread.join(timeout=30)
+        self.reap()
+
+driver_manager = DriverManager()
+
+class Watchdog(threading.Thread):
+    """Enforces PRODUCT_TIMEOUT: kills the browser of a slot that is still busy with a product after it
+    
+    A hung browser can block every WebDriver call (even window.stop() and current_url), so
+    the processes are killed directly. The blocked call then fails at once and the slot's
+    worker returns "Timeout error" for the product (see scrape_with_retries).
+    """
+    def __init__(self):
+        super().__init__(name="product-watchdog", daemon=True)
+        self.condition = threading.Condition()
+        self.deadlines = {}  # slot -> (deadline, link)
+    
+    def arm(self, slot, seconds, link):
+        with self.condition:
+            slot.hung = False
+            self.deadlines[slot] = (time.time() + seconds, link)
+            self.condition.notify()
+    
+    def disarm(self, slot):
+        """Stop watching a slot, returns True if its browser was killed"""
+        with self.condition:
+            self.deadlines.pop(slot, None)
+            return slot.hung
+    
+    def run(self):
+        while True:
+            with self.condition:
+                now = time.time()
+                # The browser is taken now: once the slot is disarmed its worker may already get a new one
+                expired = [(slot, link, slot.driver) for slot, (deadline, link) in self.deadlines.items() if deadline <= now]
+                for slot, _, _ in expired:
+                    del self.deadlines[slot]
+                    slot.hung = True
+                if not expired:
+                    next_deadline = min((deadline for deadline, _ in self.deadlines.values()), default=None)
+                    self.condition.wait(None if next_deadline is None else max(0.05, next_deadline - now))
+                    continue
+            for slot, link, driver in expired:
+                # Outside the lock: killing can take a moment
+                prefix = "" if slot is main_slot else f"[Worker {slot.index}] "
+                print(f"\n⏱️  {prefix}No result after {PRODUCT_TIMEOUT}s for {link} - killing the browser")
+                if driver is not None:
+                    kill_driver(driver)
+
+watchdog = None
+watchdog_lock = threading.Lock()
+
+def get_watchdog():
+    """Return the watchdog thread, starting it on first use"""
+    global watchdog
+    with watchdog_lock:
+        if watchdog is None:
+            watchdog = Watchdog()
+            watchdog.start()
+        return watchdog
+
+def ensure_driver_responsive(slot=None):
+    """Recreate the slot's driver if the browser stopped responding"""
+    if slot is None:
+        slot = main_slot
     try:
-        if driver is not None:
+        slot.driver.current_url  # Simple check to see if browser is responsive
+    except (InvalidSessionIdException, WebDriverException, Exception) as e:
+        # Browser became unresponsive, recreate driver
+        error_msg = str(e).lower()
+        if 'timeout' in error_msg or 'session' in error_msg or 'connection' in error_msg:
+            print(f"    Browser unresponsive, recreating driver...")
             try:
-                driver.quit()
+                recreate_driver(slot)
             except:
-                pass  # Ignore errors when closing old driver
-    except:
-        pass
+                print(f"    Failed to recreate driver, will try on next product")
+
+class ItemResponseCapture:
+    """Finds the app's item-detail JSON response for one item in Chrome's performance log
+    
+    Create it right before navigating (it skips older log entries), then call poll()
+    until it returns True - the parsed response is in .data.
+    """
+    def __init__(self, driver, item_id):
+        self.driver = driver
+        self.item_id = item_id.lower()
+        self.request_ids = set()
+        self.data = None
+        try:
+            driver.get_log('performance')  # Drop events of earlier pages
+            self.available = True
+        except WebDriverException as e:
+            print(f"    Performance log not available ({e.__class__.__name__}), reading the page instead")
+            self.available = False
     
-    driver = None
-    print("\nRecreating Chrome driver (session was lost)...")
-    time.sleep(1)  # Brief pause before recreating (reduced from 2s)
-    return setup_driver()
+    def poll(self):
+        """Read new log entries, returns True once the item's response has been read"""
+        if self.data is not None:
+            return True
+        if not self.available:
+            return False
+        for entry in self.driver.get_log('performance'):
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, ValueError):
+                continue
+            params = message.get('params', {})
+            if message.get('method') == 'Network.responseReceived':
+                url = params.get('response', {}).get('url', '').lower()
+                if ITEM_RESPONSE_URL_MARKER in url:
+                    self.request_ids.add(params.get('requestId'))
+            elif message.get('method') == 'Network.loadingFinished' and params.get('requestId') in self.request_ids:
+                # The body can only be read once the response has finished loading
+                try:
+                    body = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': params['requestId']})
+                    text = body.get('body', '')
+                    if body.get('base64Encoded'):
+                        text = base64.b64decode(text).decode('utf-8', errors='replace')
+                    # The response must be about this item (not a related item the page also loads)
+                    if self.item_id in text.lower():
+                        self.data = json.loads(text)
+                        return True
+                except (WebDriverException, ValueError):
+                    continue
+        return False
+
+def wait_until_ready(driver, timeout, item_id=None, capture=None, cancel=None):
+    """Wait until an item page can be read: its unit element or a not-found message is shown
+    
+    The browser watches the page with a MutationObserver (WAIT_FOR_READY_JS) and answers the
+    moment it changes, so fast pages don't pay for a polling interval.
+    
+    Args:
+        timeout: Seconds until giving up (one deadline for the whole wait)
+        item_id: Also wait until this item ID is on the page (hash navigation)
+        capture: ItemResponseCapture - the wait is cut in short pieces to check it in between
+        cancel: threading.Event that ends the wait early (checked every second)
+    
+    Returns:
+        'item', 'notFound', 'response' (the capture got the item response) or None if the deadline passed
+        (or the wait was cancelled)
+    """
+    deadline = time.time() + timeout
+    while True:
+        remaining = deadline - time.time()
+        if remaining <= 0 or (cancel is not None and cancel.is_set()):
+            return None
+        # Stay under the 15s script timeout, and check the network capture 4 times a second
+        wait_seconds = min(remaining, 0.25 if capture is not None else 1 if cancel is not None else 10)
+        try:
+            state = (driver.execute_async_script(WAIT_FOR_READY_JS, item_id, NOT_FOUND_INDICATORS,
+                                                 int(wait_seconds * 1000), READY_QUIET_MS) or {}).get('state')
+        except (JavascriptException, TimeoutException):
+            # The document was replaced while waiting (page still loading) - watch the new one
+            state = None
+            time.sleep(0.05)
+        if state in ('item', 'notFound'):
+            return state
+        if capture is not None and capture.poll():
+            return 'response'
+
+def navigate_by_hash(driver, slot, link, item_id, capture=None):
+    """Open an item inside the already loaded app by changing location.hash
+    
+    Returns True once the app has rendered the new item (or, with a capture, once its
+    item response arrived), False if a full page load is needed.
+    After HASH_NAV_MAX_FAILURES fallbacks in a row the slot stops using hash navigation.
+    """
+    host = link.split('//', 1)[-1].split('/', 1)[0]
+    fragment = link.partition('#')[2]
+    if not driver.execute_script(HASH_NAVIGATE_JS, host, fragment):
+        return False
+    if wait_until_ready(driver, HASH_NAV_TIMEOUT, item_id, capture, slot.cancel) is None:
+        if slot.cancel.is_set():
+            return False
+        slot.hash_failures += 1
+        print(f"    App did not show {item_id} after the hash change - reloading the page")
+        if slot.hash_failures >= HASH_NAV_MAX_FAILURES:
+            print(f"    Hash navigation keeps failing - using full page loads for this browser")
+            slot.hash_navigation = False
+        return False
+    slot.hash_failures = 0
+    return True
 
 def extract_unit_from_price(price_text):
     """Extract unit from price text like '$1,053.27 /EA'"""
@@ -277,20 +1119,42 @@ def extract_unit_from_price(price_text):
                 return unit
     return None
 
-def scrape_product_data(link, expected_unit, retry_count=0):
+def scrape_product_data(link, expected_unit, retry_count=0, slot=None, capture_only=False):
     """Scrape product data from the webpage - optimized for speed
     
     Args:
         link: URL to scrape
         expected_unit: Expected unit of measure
         retry_count: Internal counter to prevent infinite recursion (max 1 retry)
+        slot: DriverSlot whose browser is used (defaults to the main slot)
+        capture_only: If True, don't parse the page here - return the captured page
+                      (dict for parse_captured_page) so it can be parsed in another process.
+                      Errors (timeouts, lost sessions) are still returned as result tuples.
     """
+    if slot is None:
+        slot = main_slot
     try:
+        driver = setup_driver(slot)
         print(f"  Accessing: {link}")
+        load_start = time.time()
+        item_id = get_item_id(link)
+        capture = ItemResponseCapture(driver, item_id) if CAPTURE_NETWORK and item_id else None
+        navigated = False
+        if slot.hash_navigation and slot.app_loaded and item_id and '#' in link:
+            # The app is already running - open the item without reloading it
+            navigated = navigate_by_hash(driver, slot, link, item_id, capture)
+        slot.app_loaded = False
+        if slot.cancel.is_set():
+            print(f"    Another worker already got this item - stopping")
+            return None, None, None, None
         # Use set_page_load_timeout to prevent hanging (already set in setup_driver, but ensure it's active)
         try:
-            driver.set_page_load_timeout(15)  # 15 second timeout for page load (optimized)
-            driver.get(link)
+            if not navigated:
+                driver.set_page_load_timeout(15)  # 15 second timeout for page load (optimized)
+                if '#' in link and '#' in driver.current_url:
+                    # A link that only differs in the hash would not reload the app (a wedged app stays wedged)
+                    driver.get("about:blank")
+                driver.get(link)
         except TimeoutException:
             print(f"    Page load timeout (15s) - stopping page load and skipping")
             try:
@@ -306,129 +1170,108 @@ def scrape_product_data(link, expected_unit, retry_count=0):
             time.sleep(0.2)  # Brief pause to let browser recover (reduced from 0.5s)
             return "Timeout error", "Timeout error", "Timeout error", None
         
-        # ULTRA-FAST DETECTION: Use JavaScript to check for body (faster than WebDriverWait)
-        try:
-            # Use JavaScript check for faster detection
-            body_exists = driver.execute_script("return document.body !== null;")
-            if not body_exists:
-                # Fallback to WebDriverWait with shorter timeout
-                WebDriverWait(driver, 1).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-        except:
-            print(f"    Product not found (page load timeout)")
-            return "Product not found", "Product not found", "Product not found", None
+        if not navigated:
+            # driver.get may return before the app rendered - wait for the unit element (or a not-found page).
+            # A page that isn't ready by the deadline is read as it is - the checks below decide what it is.
+            wait_until_ready(driver, PAGE_READY_TIMEOUT, capture=capture, cancel=slot.cancel)
+            if slot.cancel.is_set():
+                print(f"    Another worker already got this item - stopping")
+                return None, None, None, None
+        load_time = time.time() - load_start
+        slot.record_page(load_time)
+        print(f"    Page ready in {load_time:.2f}s{' (hash navigation)' if navigated else ''}")
         
-        # IMMEDIATE CHECK: Look for key product elements (fastest way to detect if product exists)
-        # Cache page_source to avoid multiple fetches
-        page_source = driver.page_source
-        page_source_lower = page_source.lower()
+        if capture is not None and capture.poll():
+            # The app's own item response arrived - no need to wait for it to be rendered
+            result = parse_item_detail_json(capture.data, expected_unit)
+            if result is not None:
+                print(f"    Read item data from the app's network response")
+                slot.app_loaded = True
+                return result
+            print(f"    Item response has no unit, reading the page instead")
+            # Navigation stopped waiting when the response arrived - give the app time to render
+            wait_until_ready(driver, PAGE_READY_TIMEOUT, item_id if navigated else None)
         
-        # Quick check for "not found" indicators first (fastest check)
-        not_found_indicators = [
-            'product not found', 'item not found', '404', 'page not found', 
-            'unavailable', 'error 404', 'item unavailable', 'product unavailable'
-        ]
-        for indicator in not_found_indicators:
-            if indicator in page_source_lower:
-                print(f"    Product not found (detected: '{indicator}')")
-                return "Product not found", "Product not found", "Product not found", None
+        # Cache page_source: it is only pulled (once) when a fallback below really needs it
+        page_source = None
+        def get_page_source():
+            nonlocal page_source
+            if page_source is None:
+                page_source = driver.page_source
+            return page_source
+        
+        # ONE ROUND TRIP: read every field, plus not-found and diagnostic signals, in a single script call
+        def run_extraction_script():
+            return driver.execute_script(EXTRACT_PAGE_JS, NOT_FOUND_INDICATORS, PRODUCT_INDICATORS) or {}
         
-        # Try to find the unit element with a very short timeout (0.5 second - optimized)
-        # This is the fastest way to confirm product exists
         try:
-            uom_element = WebDriverWait(driver, 0.5).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "span.ess-detail-uom, .ess-detail-uom"))
-            )
-            # If we found it, product exists - continue to extraction
-        except:
-            # Unit element not found - do quick checks to confirm product doesn't exist
-            # Use JavaScript for faster checking (no need to wait for full page load)
-            try:
-                # Fast JavaScript check for unit element
-                uom_exists = driver.execute_script(
-                    "return document.querySelector('span.ess-detail-uom, .ess-detail-uom') !== null;"
-                )
-                if uom_exists:
-                    uom_element = driver.find_element(By.CSS_SELECTOR, "span.ess-detail-uom, .ess-detail-uom")
-                else:
-                    raise NoSuchElementException("Unit element not found")
-            except:
-                # Check for key product elements - if none found, product doesn't exist
-                product_indicators = [
-                    'ess-detail', 'ess-product', 'product-detail', 'item-detail',
-                    'product-name', 'product-type', 'global product type'
-                ]
-                has_product_indicator = any(indicator in page_source_lower for indicator in product_indicators)
-                
-                # Also check if there's a price with unit pattern (real products have this)
-                has_price_with_unit = bool(re.search(r'\$[\d,]+\.?\d*\s*/([A-Z]{2,4})\b', page_source, re.IGNORECASE))
-                
-                if not has_product_indicator and not has_price_with_unit:
-                    print(f"    Product not found (no product elements detected)")
-                    return "Product not found", "Product not found", "Product not found", None
-                
-                # If we have indicators but no unit element, might be loading - try one more quick check (no wait)
-                try:
-                    uom_element = driver.find_element(By.CSS_SELECTOR, "span.ess-detail-uom, .ess-detail-uom")
-                except:
-                    # Still can't find unit element - likely product not available
-                    print(f"    Product not found (unit element not found)")
-                    return "Product not found", "Product not found", "Product not found", None
+            page_data = run_extraction_script()
+        except TimeoutException:
+            raise
+        except Exception as e:
+            if 'session' in str(e).lower():
+                raise
+            # Script failed - get the same signals from the page source instead
+            print(f"    Extraction script failed ({e.__class__.__name__}), using page source")
+            page_data = scan_page_source(get_page_source())
         
-        # Extract unit - we already found the element in the check above, so use it
-        website_unit = None
+        # Only a page showing a rendered item is a safe starting point for the next hash change
+        slot.app_loaded = bool(page_data.get('unitText')) and not page_data.get('notFoundIndicator')
         
-        # Common unit abbreviations (EA, BX, CS, PK, CT, DZ, PR, etc.)
-        common_units = ['EA', 'BX', 'CS', 'PK', 'CT', 'DZ', 'PR', 'RL', 'FT', 'YD', 'LB', 'OZ', 'GA', 'QT', 'PT', 'FL', 'PC', 'SET', 'PAIR', 'PKG', 'CASE', 'PACK', 'ROLL', 'TUBE', 'BAG', 'BOX', 'CARTON', 'PKT', 'BTL', 'CAN', 'JAR', 'TIN']
-        # Common file extensions to exclude
-        file_extensions = ['SVG', 'PNG', 'JPG', 'JPEG', 'GIF', 'PDF', 'XML', 'HTML', 'CSS', 'JS', 'JSON']
+        if SNAPSHOT_PAGES and page_data.get('hasBody'):
+            # Keep the full page so fixed extractors can be re-run over it later without a browser
+            save_snapshot(link, page_data, get_page_source())
         
-        # Pre-compile regex pattern for faster matching
-        uom_pattern = re.compile(r'class="ess-detail-uom"[^>]*>/([A-Z]{2,4})\b', re.IGNORECASE)
+        if capture_only:
+            # Pipeline mode: hand the page over to the parser processes. The page source is only
+            # included when the script left a field empty and the regex fallbacks will need it.
+            fields_missing = not (page_data.get('unitText') and page_data.get('images') and
+                                  page_data.get('productName') and page_data.get('description'))
+            if page_data.get('hasBody') and not page_data.get('notFoundIndicator') and fields_missing:
+                get_page_source()
+            return {'link': link, 'page_data': page_data, 'page_source': page_source}
         
-        try:
-            # We already found the unit element in the check above, extract from it
+        if not page_data.get('hasBody'):
+            print(f"    Product not found (page load timeout)")
+            return "Product not found", "Product not found", "Product not found", None
+        
+        # Quick check for "not found" indicators first (fastest check)
+        if page_data.get('notFoundIndicator'):
+            print(f"    Product not found (detected: '{page_data['notFoundIndicator']}')")
+            return "Product not found", "Product not found", "Product not found", None
+        
+        # 1. Unit - from the script, fallbacks only if it came back empty
+        website_unit = normalize_unit(page_data.get('unitText'))
+        if website_unit:
+            print(f"    Found unit ({page_data.get('unitSource')}): {website_unit}")
+        else:
+            # Check for key product elements - if none found, product doesn't exist
+            if not page_data.get('hasProductIndicator') and not page_data.get('hasPriceWithUnit'):
+                print(f"    Product not found (no product elements detected)")
+                return "Product not found", "Product not found", "Product not found", None
+            
+            # Fallback: CSS selector with class contains (element may have rendered since the script ran)
             try:
-                uom_element = driver.find_element(By.CSS_SELECTOR, "span.ess-detail-uom, .ess-detail-uom")
-                uom_text = uom_element.text.strip()
-                # Extract unit from text like "/EA" or "EA"
-                if uom_text.startswith('/'):
-                    website_unit = uom_text[1:].strip().upper()
-                else:
-                    website_unit = uom_text.upper()
-                if website_unit and len(website_unit) >= 2 and len(website_unit) <= 4:
-                    print(f"    Found unit: {website_unit}")
+                uom_elements = driver.find_elements(By.CSS_SELECTOR, "[class*='ess-detail-uom']:not([data-scraper-stale]), [class*='ess-product-uom']:not([data-scraper-stale])")
+                for elem in uom_elements:
+                    unit = normalize_unit(elem.text)
+                    if unit:
+                        website_unit = unit
+                        print(f"    Found unit (CSS): {website_unit}")
+                        break
             except:
-                # Fallback: Try CSS selector with class contains (faster than XPath)
-                try:
-                    uom_elements = driver.find_elements(By.CSS_SELECTOR, "[class*='ess-detail-uom'], [class*='ess-product-uom']")
-                    for elem in uom_elements:
-                        text = elem.text.strip()
-                        if text.startswith('/'):
-                            unit = text[1:].strip().upper()
-                            if unit and len(unit) >= 2 and len(unit) <= 4:
-                                website_unit = unit
-                                print(f"    Found unit (CSS): {website_unit}")
-                                break
-                except:
-                    pass
+                pass
             
-            # If still not found, try page source regex (quick check using cached page_source)
+            # Fallback: page source regex
             if not website_unit:
-                match = uom_pattern.search(page_source)
-                if match:
-                    potential_unit = match.group(1).upper()
-                    if potential_unit in common_units or (len(potential_unit) >= 2 and len(potential_unit) <= 4 and potential_unit not in file_extensions):
-                        website_unit = potential_unit
-                        print(f"    Found unit (regex): {website_unit}")
+                website_unit = extract_unit_from_source(get_page_source())
+                if website_unit:
+                    print(f"    Found unit (regex): {website_unit}")
             
             # If still no unit, product likely not available
             if not website_unit:
                 print(f"    Product not found (unit not extractable)")
                 return "Product not found", "Product not found", "Product not found", None
-                
-        except Exception as e:
-            print(f"    Error finding unit: {e}")
-            return "Product not found", "Product not found", "Product not found", None
         
         print(f"    Website unit: {website_unit}, Expected unit: {expected_unit}")
         
@@ -440,192 +1283,43 @@ def scrape_product_data(link, expected_unit, retry_count=0):
         # Unit matches, proceed with scraping
         print(f"    ✅ Unit matched! Scraping data...")
         
-        # 1. Scrape Image URL - OPTIMIZED for speed
-        image_url = None
-        try:
-            # Pre-compile regex patterns for faster matching
-            img_tag_pattern_oppictures = re.compile(r'<img[^>]+src=["\']([^"\']*oppictures[^"\']+)["\']', re.IGNORECASE)
-            img_tag_pattern_general = re.compile(r'<img[^>]+src=["\']([^"\']+)["\']', re.IGNORECASE)
-            
-            # Helper function to check if URL is a product image (prioritize these)
-            def is_product_image_url(url):
-                """Check if URL is a product image (not a tag/rebate image)"""
-                if not url:
-                    return False
-                url_lower = url.lower()
-                # Exclude tag/rebate images - check for various patterns (case-insensitive)
-                tag_indicators = [
-                    '/tags/', 'tags/', 'tagoutlined', 'tag-outlined', 'rebate',
-                    'master_images/tags', 'master_images\\tags',  # Handle both slashes
-                    'tagoutlined-rebate', 'tag-outlined-rebate'
-                ]
-                if any(indicator in url_lower for indicator in tag_indicators):
-                    return False
-                # Exclude if path contains "Tags" folder (case-insensitive check)
-                if '/tags' in url_lower or '\\tags' in url_lower or 'tags/' in url_lower or 'tags\\' in url_lower:
-                    return False
-                # Prioritize actual product images from Master_Variants
-                if 'master_variants' in url_lower or 'variant_' in url_lower:
-                    return True
-                # Also accept other oppictures images that aren't tags
-                if 'oppictures.com' in url_lower:
-                    # Double-check: make sure it's not in a Tags folder
-                    if '/tags' not in url_lower and '\\tags' not in url_lower and 'tags/' not in url_lower:
-                        return True
-                return False
-            
-            # METHOD 1: Use JavaScript to quickly find product images (faster than Selenium)
+        # 2. Image URL - from the script, fallbacks only if it came back empty
+        image_url = choose_product_image(page_data.get('images'))
+        if image_url:
+            print(f"    Found product image (JS): {image_url[:80]}...")
+        else:
             try:
-                # Use JavaScript to find images with oppictures in src (much faster)
-                # Make sure to exclude tag/rebate images with case-insensitive checks
-                img_srcs = driver.execute_script("""
-                    var imgs = document.querySelectorAll('img[src*="oppictures"]');
-                    var productImages = [];
-                    var otherImages = [];
-                    for (var i = 0; i < imgs.length; i++) {
-                        var src = imgs[i].src || '';
-                        var srcLower = src.toLowerCase();
-                        // Exclude tag/rebate images (case-insensitive)
-                        if (srcLower.indexOf('/tags/') !== -1 || 
-                            srcLower.indexOf('tags/') !== -1 ||
-                            srcLower.indexOf('tagoutlined') !== -1 ||
-                            srcLower.indexOf('tag-outlined') !== -1 ||
-                            srcLower.indexOf('rebate') !== -1 ||
-                            srcLower.indexOf('master_images/tags') !== -1 ||
-                            srcLower.indexOf('master_images\\\\tags') !== -1) {
-                            continue; // Skip tag/rebate images
-                        }
-                        // Prioritize actual product images from Master_Variants
-                        if (srcLower.indexOf('master_variants') !== -1 || srcLower.indexOf('variant_') !== -1) {
-                            productImages.push(src);
-                        } else if (srcLower.indexOf('oppictures.com') !== -1) {
-                            // Only add if not in Tags folder
-                            if (srcLower.indexOf('/tags') === -1 && srcLower.indexOf('\\\\tags') === -1) {
-                                otherImages.push(src);
-                            }
-                        }
-                    }
-                    // Return product images first, then other images
-                    return productImages.concat(otherImages);
-                """)
-                
-                if img_srcs and len(img_srcs) > 0:
-                    image_url = img_srcs[0]
-                    print(f"    Found product image (JS): {image_url[:80]}...")
-            except Exception as e:
-                pass  # Fallback to other methods
-            
-            # METHOD 2: Fallback to CSS selector (faster than XPath)
-            if not image_url:
+                # Fallback: CSS selector
                 try:
                     img_elements = driver.find_elements(By.CSS_SELECTOR, "img[src*='oppictures']")
-                    for img in img_elements:
-                        src = img.get_attribute('src')
-                        if src and is_product_image_url(src):
-                            if src.startswith('//'):
-                                src = 'https:' + src
-                            image_url = src
-                            print(f"    Found product image (CSS): {image_url[:80]}...")
-                            break
+                    image_url = choose_product_image([img.get_attribute('src') for img in img_elements])
+                    if image_url:
+                        print(f"    Found product image (CSS): {image_url[:80]}...")
                 except Exception as e:
                     pass
-            
-            # METHOD 3: Fallback to page source regex (using cached page_source)
-            if not image_url:
-                # First, prioritize product images from Master_Variants
-                matches = img_tag_pattern_oppictures.finditer(page_source)
-                product_image_candidates = []
-                other_image_candidates = []
-                
-                for match in matches:
-                    src = match.group(1)
-                    if src.startswith('//'):
-                        src = 'https:' + src
-                    src_lower = src.lower()
-                    # Skip tag/rebate images with comprehensive case-insensitive checks
-                    tag_indicators = [
-                        '/tags/', 'tags/', 'tagoutlined', 'tag-outlined', 'rebate',
-                        'master_images/tags', 'master_images\\tags'
-                    ]
-                    if any(indicator in src_lower for indicator in tag_indicators):
-                        continue
-                    # Also check for Tags folder (case-insensitive)
-                    if '/tags' in src_lower or '\\tags' in src_lower or 'tags/' in src_lower or 'tags\\' in src_lower:
-                        continue
-                    # Check if it's a valid product image
-                    if is_product_image_url(src):
-                        product_image_candidates.append(src)
-                    elif 'oppictures.com' in src_lower:
-                        # Double-check it's not a tag image
-                        if not any(indicator in src_lower for indicator in tag_indicators):
-                            other_image_candidates.append(src)
                 
-                # Use product images first
-                if product_image_candidates:
-                    image_url = product_image_candidates[0]
-                    print(f"    Found product image from page source (Master_Variants): {image_url[:80]}...")
-                elif other_image_candidates:
-                    # Filter out any tag images that might have slipped through (extra safety check)
-                    filtered_candidates = []
-                    for c in other_image_candidates:
-                        c_lower = c.lower()
-                        # Exclude if contains any tag indicators
-                        if not any(indicator in c_lower for indicator in ['/tags/', 'tags/', 'tagoutlined', 'rebate', '/tags', '\\tags']):
-                            filtered_candidates.append(c)
-                    if filtered_candidates:
-                        image_url = filtered_candidates[0]
-                        print(f"    Found image from page source (oppictures): {image_url[:80]}...")
-                    else:
+                # Fallback: page source regex
+                if not image_url:
+                    image_url, candidate_count = extract_image_from_source(get_page_source())
+                    if image_url:
+                        print(f"    Found product image from page source: {image_url[:80]}...")
+                    elif candidate_count:
                         print(f"    Warning: All candidates were tag/rebate images, skipping...")
-                                
-        except Exception as e:
-            print(f"    Error finding image: {e}")
+            except Exception as e:
+                print(f"    Error finding image: {e}")
         
         # Final validation: Make absolutely sure we never return a tag/rebate image
-        if image_url:
-            url_lower = image_url.lower()
-            tag_indicators = [
-                '/tags/', 'tags/', 'tagoutlined', 'tag-outlined', 'rebate',
-                'master_images/tags', 'master_images\\tags',
-                'tagoutlined-rebate', 'tag-outlined-rebate'
-            ]
-            # Check if it's a tag/rebate image
-            if any(indicator in url_lower for indicator in tag_indicators):
-                print(f"    ⚠️  Rejected tag/rebate image: {image_url[:80]}...")
-                image_url = None
-            # Also check for Tags folder in path
-            elif '/tags' in url_lower or '\\tags' in url_lower or 'tags/' in url_lower or 'tags\\' in url_lower:
-                print(f"    ⚠️  Rejected image from Tags folder: {image_url[:80]}...")
-                image_url = None
-        
-        # 2. Scrape Product Name (Global Product Type from Product Details section)
-        # OPTIMIZED: Use JavaScript for faster extraction
-        product_name = None
-        try:
-            # METHOD 1: Use JavaScript to quickly find product name (faster than XPath)
+        if image_url and is_tag_image_url(image_url):
+            print(f"    ⚠️  Rejected tag/rebate image: {image_url[:80]}...")
+            image_url = None
+        
+        # 3. Product Name (Global Product Type from Product Details section)
+        product_name = page_data.get('productName')
+        if product_name:
+            print(f"    Found product name (JS): {product_name}")
+        else:
             try:
-                product_name = driver.execute_script("""
-                    var tds = document.querySelectorAll('td');
-                    for (var i = 0; i < tds.length; i++) {
-                        if (tds[i].textContent && tds[i].textContent.trim().indexOf('Global Product Type') !== -1) {
-                            var nextTd = tds[i].nextElementSibling;
-                            if (nextTd && nextTd.textContent) {
-                                var name = nextTd.textContent.trim();
-                                if (name && name !== 'Global Product Type' && name.length > 5) {
-                                    return name;
-                                }
-                            }
-                        }
-                    }
-                    return null;
-                """)
-                if product_name:
-                    print(f"    Found product name (JS): {product_name}")
-            except:
-                pass
-            
-            # METHOD 2: Fallback to XPath (CSS :contains() is not standard)
-            if not product_name:
+                # Fallback: XPath (CSS :contains() is not standard)
                 try:
                     # Find the td containing "Global Product Type" and get the following sibling td
                     name_element = driver.find_element(By.XPATH, "//td[contains(text(), 'Global Product Type')]/following-sibling::td[1]")
@@ -633,210 +1327,614 @@ def scrape_product_data(link, expected_unit, retry_count=0):
                     if product_name:
                         print(f"    Found product name from td: {product_name}")
                 except:
-                    # Alternative: Find all tds and search
-                    try:
-                        name_elements = driver.find_elements(By.CSS_SELECTOR, "td")
-                        for i, elem in enumerate(name_elements):
-                            text = elem.text.strip()
-                            if 'Global Product Type' in text and i + 1 < len(name_elements):
-                                next_text = name_elements[i + 1].text.strip()
-                                if next_text and next_text != 'Global Product Type' and len(next_text) > 5:
-                                    product_name = next_text
-                                    print(f"    Found product name from alternative td: {product_name}")
-                                    break
-                    except:
-                        pass
-            
-            # METHOD 3: Fallback to page source pattern (using cached page_source)
-            if not product_name:
-                pattern = re.compile(r'Global Product Type[:\s]+([^\n<]+)', re.IGNORECASE)
-                match = pattern.search(page_source)
-                if match:
-                    product_name = match.group(1).strip()
-                    product_name = re.sub(r'<[^>]+>', '', product_name).strip()
+                    pass
+                
+                # Fallback: page source pattern
+                if not product_name:
+                    product_name = extract_product_name_from_source(get_page_source())
                     if product_name:
                         print(f"    Found product name from page source: {product_name}")
-                    
-        except Exception as e:
-            print(f"    Error finding product name: {e}")
+            except Exception as e:
+                print(f"    Error finding product name: {e}")
         
-        # 3. Scrape Description - OPTIMIZED for speed
-        # Extract only the actual product description, excluding warnings, recommendations, pricing, and UI elements
-        description = None
+        # 4. Description - only the actual product description, excluding warnings, recommendations, pricing, and UI elements
+        description = clean_description(page_data.get('description'))
+        if description:
+            print(f"    Found description (JS): {len(description)} chars")
+        else:
+            try:
+                # Fallback: page source pattern
+                description = extract_description_from_source(get_page_source())
+                if description:
+                    print(f"    Found description (page source): {len(description)} chars")
+            except Exception as e:
+                pass  # Silently continue
         
-        # Pre-compile regex patterns for faster matching
-        html_tag_pattern = re.compile(r'<[^>]+>')
-        desc_pattern = re.compile(r'description\s*:?\s*', re.IGNORECASE)
-        stop_markers_pattern = re.compile(r'(Product Details|ADD TO LIST|People Who Bought|Also Consider|List price)', re.IGNORECASE)
-        price_pattern = re.compile(r'\$\d+[.,]\d+\s*/[A-Z]{2,4}', re.IGNORECASE)
+        if page_source is not None:
+            print(f"    Page source pulled for fallbacks ({len(page_source)} chars, page is {page_data.get('htmlLength', 0)} chars)")
+        return product_name, description, image_url, website_unit
         
-        def clean_description_text(text):
-            """Clean description text by removing HTML fragments, section markers, and unwanted content"""
-            if not text:
-                return None
-            
-            # Remove any remaining HTML tags and fragments
-            text = html_tag_pattern.sub(' ', text)
-            text = html.unescape(text)
-            
-            # Remove section markers and UI elements at the end
-            text = stop_markers_pattern.sub('', text)
-            
-            # Remove the "Description :" or "Description:" prefix
-            text = desc_pattern.sub('', text, count=1)
-            
-            # Remove item numbers at the start
-            text = re.sub(r'^[A-Z0-9]{6,15}\s+', '', text)
-            
-            # Remove price patterns
-            text = price_pattern.sub('', text)
-            
-            # Normalize whitespace
-            text = ' '.join(text.split())
-            text = text.strip()
+    except TimeoutException:
+        print(f"    Page load timeout (30s) - stopping page load")
+        try:
+            # Stop the page from loading to prevent browser from getting stuck
+            driver.execute_script("window.stop();")
+        except:
+            pass  # Ignore if we can't execute script
+        try:
+            # Navigate to about:blank to reset browser state
+            driver.get("about:blank")
+        except:
+            pass  # Ignore if navigation fails
+        time.sleep(0.2)  # Brief pause to let browser recover (optimized)
+        return "Timeout error", "Timeout error", "Timeout error", None
+    except (ReadTimeoutError, Urllib3ConnectionError, socket.timeout, ConnectionResetError) as e:
+        error_msg = str(e).lower()
+        if 'read timeout' in error_msg or 'connection' in error_msg or 'timeout' in error_msg:
+            print(f"    Connection timeout/error - marking as timeout")
+            return "Timeout error", "Timeout error", "Timeout error", None
+        else:
+            print(f"    Connection error: {e}")
+            return "Timeout error", "Timeout error", "Timeout error", None
+    except (InvalidSessionIdException, WebDriverException) as e:
+        error_msg = str(e).lower()
+        if 'invalid session id' in error_msg or 'session id' in error_msg:
+            if retry_count < 1 and not slot.hung:  # Only retry once (not after the watchdog killed the browser)
+                print(f"    Browser session lost. Recreating driver and retrying...")
+                try:
+                    recreate_driver(slot)
+                    # Retry the entire scraping operation
+                    print(f"    Retrying: {link}")
+                    return scrape_product_data(link, expected_unit, retry_count + 1, slot, capture_only=capture_only)  # Recursive retry
+                except Exception as retry_error:
+                    print(f"    Failed to recreate driver or retry failed: {retry_error}")
+                    return None, None, None, None
+            else:
+                print(f"    Browser session lost (max retries reached)")
+                return None, None, None, None
+        else:
+            print(f"    WebDriver error: {e}")
+            return None, None, None, None
+    except Exception as e:
+        error_msg = str(e).lower()
+        # Check for invalid session id in error message (sometimes it's wrapped in a generic exception)
+        if 'invalid session id' in error_msg or 'session id' in error_msg:
+            if retry_count < 1 and not slot.hung:  # Only retry once (not after the watchdog killed the browser)
+                print(f"    Browser session lost. Recreating driver and retrying...")
+                try:
+                    recreate_driver(slot)
+                    # Retry the entire scraping operation
+                    print(f"    Retrying: {link}")
+                    return scrape_product_data(link, expected_unit, retry_count + 1, slot, capture_only=capture_only)  # Recursive retry
+                except Exception as retry_error:
+                    print(f"    Failed to recreate driver or retry failed: {retry_error}")
+                    return None, None, None, None
+            else:
+                print(f"    Browser session lost (max retries reached)")
+                return None, None, None, None
+        # Check for timeout/connection errors in generic exceptions
+        elif 'timeout' in error_msg or 'read timeout' in error_msg or 'connection' in error_msg:
+            print(f"    Timeout/connection error detected")
+            return "Timeout error", "Timeout error", "Timeout error", None
+        else:
+            print(f"    Error scraping: {e}")
+            return None, None, None, None
+
+def get_status_emoji(value, error_messages):
+    """Return the status emoji and label for a cell value"""
+    if not value or value == '':
+        return '⚪', 'Empty'
+    elif value in error_messages:
+        if value == 'Product not found':
+            return '❌', 'Product not found'
+        elif value == 'Unit not matched':
+            return '⚠️', 'Unit not matched'
+        elif value == 'Timeout error':
+            return '⏱️', 'Timeout error'
+        else:
+            return '⚠️', value
+    else:
+        return '✅', 'Found'
+
+def prepare_row(idx, recheck_not_found=False, verbose=True):
+    """Check a row and decide whether it needs to be scraped
+    
+    Args:
+        idx: Row index (0-based)
+        recheck_not_found: If True, rows marked "Product not found" are scraped again
+        verbose: If True, print the current status block of the row
+    
+    Returns:
+        (link, expected_unit, current_values) if the row should be scraped, otherwise None.
+        current_values is a (product_name, description, image_url) tuple of the current cell values.
+    """
+    row = df.iloc[idx]
+    
+    # Get link
+    link = row[link_col]
+    if pd.isna(link) or str(link).strip() == '':
+        if verbose:
+            print("  ❌ No link found, skipping...")
+        return None
+    
+    # Get expected unit
+    expected_unit = row[unit_col]
+    if pd.isna(expected_unit):
+        if verbose:
+            print("  ❌ No unit of measure found, skipping...")
+        return None
+    
+    # Check current status of the three columns
+    current_product_name = str(row[product_name_col]).strip() if pd.notna(row[product_name_col]) else ''
+    current_description = str(row[description_col]).strip() if pd.notna(row[description_col]) else ''
+    current_image_url = str(row[image_url_col]).strip() if pd.notna(row[image_url_col]) else ''
+    
+    error_messages = ['Unit not matched', 'Product not found', 'Timeout error', '']
+    
+    if verbose:
+        # Display current status
+        pn_emoji, pn_status = get_status_emoji(current_product_name, error_messages)
+        desc_emoji, desc_status = get_status_emoji(current_description, error_messages)
+        img_emoji, img_status = get_status_emoji(current_image_url, error_messages)
+        
+        print(f"\n📊 Current Status:")
+        print(f"   {pn_emoji} Product Name: {pn_status}")
+        print(f"   {desc_emoji} Description: {desc_status}")
+        print(f"   {img_emoji} Image URL: {img_status}")
+    
+    # Skip if any column has "Product not found" (product wasn't found on website)
+    # Unless we're in recheck mode
+    if not recheck_not_found:
+        if (current_product_name == 'Product not found' or 
+            current_description == 'Product not found' or 
+            current_image_url == 'Product not found'):
+            if verbose:
+                print(f"\n  ⏭️  Already marked as 'Product not found', skipping...")
+            return None
+    else:
+        # In recheck mode, show that we're rechecking
+        if verbose and (current_product_name == 'Product not found' or 
+            current_description == 'Product not found' or 
+            current_image_url == 'Product not found'):
+            print(f"\n  🔄 Rechecking product previously marked as 'Product not found'...")
+    
+    # Count how many columns have valid data (not empty, not error messages)
+    filled_count = 0
+    if current_product_name and current_product_name not in error_messages:
+        filled_count += 1
+    if current_description and current_description not in error_messages:
+        filled_count += 1
+    if current_image_url and current_image_url not in error_messages:
+        filled_count += 1
+    
+    # Skip if all 3 columns are already filled
+    if filled_count == 3:
+        if verbose:
+            print(f"\n  ✅ All columns already filled, skipping...")
+        return None
+    
+    if verbose:
+        # If 1 or 2 columns are filled, we'll re-scrape to fill the empty ones
+        if filled_count > 0:
+            print(f"\n  🔄 Partial data found ({filled_count}/3 columns filled), re-scraping to fill empty columns...")
+        else:
+            print(f"\n  🆕 New product, scraping all columns...")
+    
+    current_values = (current_product_name, current_description, current_image_url)
+    return str(link).strip(), expected_unit, current_values
+
+def plan_rows(indices, recheck_not_found=False, parallel=1):
+    """Order rows by their learned cost and estimate how long they take
+    
+    Rows whose items (or item group) were fast and worked before come first, slow or
+    failing groups last. With CRAWL_ORDER = "rows" the order stays as it is and only the
+    estimate is made.
+    
+    Returns:
+        (indices, RunEstimate), or (indices, None) without a crawl history
+    """
+    history = get_crawl_history()
+    if history is None:
+        return indices, None
+    from crawl_history import RunEstimate, expected_cost, format_duration
+    
+    expected = {}
+    costs = {}
+    sources = {"item": 0, "group": 0, "brand": 0, "default": 0}
+    for idx in indices:
+        if prepare_row(idx, recheck_not_found, verbose=False) is None:
+            continue  # Skipped right away - costs nothing
+        item_id = get_item_id(df.iloc[idx][link_col])
+        seconds, fail_rate, source = history.estimate(item_id)
+        expected[idx] = seconds
+        costs[idx] = expected_cost(seconds, fail_rate)
+        sources[source] += 1
+    
+    if CRAWL_ORDER == "learned" and sources["default"] < len(expected):
+        indices = sorted(indices, key=lambda idx: costs.get(idx, 0.0))
+        print(f"🧭 Crawl order: {len(expected)} rows by learned cost ({sources['item']} from their own history, "
+              f"{sources['group'] + sources['brand']} from their item group, {sources['default']} unknown)")
+        worst = history.worst_groups(get_item_id(df.iloc[idx][link_col]) for idx in expected)
+        if worst:
+            print(f"   Last: " + ", ".join(f"{group} ({seconds:.1f}s, {fail_rate:.0%} failing)" for group, seconds, fail_rate in worst))
+    estimate = RunEstimate(expected, parallel)
+    if expected:
+        print(f"⏱️  Estimated time: {format_duration(estimate.eta_seconds())} for {len(expected)} rows")
+    return indices, estimate
+
+def load_resumed_run():
+    """Manifest and rows left of an interrupted run, (None, None) if there is nothing to resume
+    
+    Rows that were in flight come first. Finished rows are not looked at again.
+    """
+    from run_manifest import RunManifest
+    run = RunManifest.load(run_manifest_path)
+    if run is None or run.finished:
+        print("\nNo interrupted run to resume.")
+        return None, None
+    in_workbook = [idx for idx in run.planned if idx < len(df)]
+    keys = dict(zip(in_workbook, result_keys(in_workbook)))
+    if any(keys.get(idx) != run.keys.get(idx) for idx in run.planned):
+        # Rows were added, removed or sorted since the run started - find them by their Item Number
+        # and move the plan to their new rows, so their start/done events match it
+        rows_by_key = {key: idx for idx, key in enumerate(result_keys(range(len(df))))}
+        found = {idx: idx if keys.get(idx) == run.keys.get(idx) else rows_by_key.get(run.keys.get(idx))
+                 for idx in run.planned}
+        missing = [idx for idx in run.remaining() if found[idx] is None]
+        print(f"⚠️  The workbook changed since the run started - rows were matched by Item Number "
+              f"({len(missing)} are not in the workbook any more)")
+        run.remap(found)
+    in_flight = run.in_flight()
+    rows = run.remaining()
+    if not rows:
+        print("\nEvery row of the last run is done.")
+        run.finish()
+        return None, None
+    print(f"\n▶️  Resuming the run of {datetime.fromtimestamp(run.started).strftime('%Y-%m-%d %H:%M')}: "
+          f"{len(run.done_rows)}/{len(run.planned)} rows done, {len(in_flight)} were in flight, {len(rows)} left")
+    return run, rows
+
+def apply_scrape_result(idx, result, current_values):
+    """Write a scrape_product_data result into the DataFrame
+    
+    Only empty cells or cells holding an error message are overwritten, so valid data
+    is never replaced by an error.
+    
+    Args:
+        idx: Row index (0-based)
+        result: (product_name, description, image_url, website_unit) tuple from the scraper
+        current_values: (product_name, description, image_url) values the row had before scraping
+    
+    Returns:
+        True if the row counts as processed, False if the scraper returned no data
+    """
+    product_name, description, image_url, website_unit = result
+    current_product_name, current_description, current_image_url = current_values
+    error_messages = ['Unit not matched', 'Product not found', 'Timeout error', '']
+    
+    # Display scraping results
+    print(f"\n📥 Scraping Results:")
+    
+    # Update Excel row - only fill empty columns, don't overwrite existing data
+    if product_name == "Unit not matched":
+        print(f"   ⚠️  Unit not matched! Website unit doesn't match expected unit.")
+        # Only update if column is empty or has error message
+        updated_pn = not current_product_name or current_product_name in ['Unit not matched', 'Timeout error', '']
+        updated_desc = not current_description or current_description in ['Unit not matched', 'Timeout error', '']
+        updated_img = not current_image_url or current_image_url in ['Unit not matched', 'Timeout error', '']
+        
+        if updated_pn:
+            df.at[idx, product_name_col] = "Unit not matched"
+        if updated_desc:
+            df.at[idx, description_col] = "Unit not matched"
+        if updated_img:
+            df.at[idx, image_url_col] = "Unit not matched"
+        
+        print(f"   📝 Updated: Product Name: {'✅' if updated_pn else '⏭️'}, Description: {'✅' if updated_desc else '⏭️'}, Image URL: {'✅' if updated_img else '⏭️'}")
+        return True
+    elif product_name == "Product not found":
+        print(f"   ❌ Product not found on website!")
+        # Only update if column is empty or has error message
+        updated_pn = not current_product_name or current_product_name in ['Product not found', 'Timeout error', '']
+        updated_desc = not current_description or current_description in ['Product not found', 'Timeout error', '']
+        updated_img = not current_image_url or current_image_url in ['Product not found', 'Timeout error', '']
+        
+        if updated_pn:
+            df.at[idx, product_name_col] = "Product not found"
+        if updated_desc:
+            df.at[idx, description_col] = "Product not found"
+        if updated_img:
+            df.at[idx, image_url_col] = "Product not found"
+        
+        print(f"   📝 Updated: Product Name: {'✅' if updated_pn else '⏭️'}, Description: {'✅' if updated_desc else '⏭️'}, Image URL: {'✅' if updated_img else '⏭️'}")
+        return True
+    elif product_name == "Timeout error":
+        print(f"   ⏱️  Timeout error occurred!")
+        # Only update if column is empty (don't overwrite valid data with timeout error)
+        updated_pn = not current_product_name or current_product_name in ['Timeout error', '']
+        updated_desc = not current_description or current_description in ['Timeout error', '']
+        updated_img = not current_image_url or current_image_url in ['Timeout error', '']
+        
+        if updated_pn:
+            df.at[idx, product_name_col] = "Timeout error"
+        if updated_desc:
+            df.at[idx, description_col] = "Timeout error"
+        if updated_img:
+            df.at[idx, image_url_col] = "Timeout error"
+        
+        print(f"   📝 Updated: Product Name: {'✅' if updated_pn else '⏭️'}, Description: {'✅' if updated_desc else '⏭️'}, Image URL: {'✅' if updated_img else '⏭️'}")
+        return True
+    elif product_name:
+        # Display what was found
+        pn_found = '✅' if product_name else '❌'
+        desc_found = '✅' if description else '❌'
+        img_found = '✅' if image_url else '❌'
+        
+        print(f"   {pn_found} Product Name: {'Found' if product_name else 'Not found'}")
+        if product_name:
+            print(f"      └─ {product_name[:60]}{'...' if len(product_name) > 60 else ''}")
+        
+        print(f"   {desc_found} Description: {'Found' if description else 'Not found'}")
+        if description:
+            print(f"      └─ {description[:60]}{'...' if len(description) > 60 else ''} ({len(description)} chars)")
+        
+        print(f"   {img_found} Image URL: {'Found' if image_url else 'Not found'}")
+        if image_url:
+            print(f"      └─ {image_url[:60]}{'...' if len(image_url) > 60 else ''}")
+        
+        # Only fill empty columns, preserve existing valid data
+        updated_pn = not current_product_name or current_product_name in ['Unit not matched', 'Timeout error', '']
+        updated_desc = description and (not current_description or current_description in ['Unit not matched', 'Timeout error', ''])
+        updated_img = image_url and (not current_image_url or current_image_url in ['Unit not matched', 'Timeout error', ''])
+        
+        # Update Product Name if empty or has error message
+        if updated_pn:
+            df.at[idx, product_name_col] = product_name
+        # Update Description if empty or has error message
+        if updated_desc:
+            df.at[idx, description_col] = description
+        # Update Image URL if empty or has error message
+        if updated_img:
+            df.at[idx, image_url_col] = image_url
+        
+        print(f"\n   📝 Excel Update:")
+        print(f"      Product Name: {'✅ Updated' if updated_pn else '⏭️  Preserved (already has data)'}")
+        print(f"      Description: {'✅ Updated' if updated_desc else '⏭️  Preserved (already has data)' if current_description and current_description not in error_messages else '❌ Not found'}")
+        print(f"      Image URL: {'✅ Updated' if updated_img else '⏭️  Preserved (already has data)' if current_image_url and current_image_url not in error_messages else '❌ Not found'}")
+        return True
+    else:
+        print(f"   ❌ Error: No data returned from scraper")
+        return False
+
+def scrape_with_retries(link, expected_unit, slot=None, capture_only=False):
+    """Scrape a product, retrying once when no data came back (e.g. lost session)
+    
+    With FETCH_BACKEND = "http" the item API is asked first and the browser is only
+    used when the API can't answer. With capture_only the browser result is the captured
+    page (see scrape_product_data) instead of a parsed result tuple.
+    """
+    if FETCH_BACKEND == "http":
+        try:
+            result = get_item_api_client().fetch(link, expected_unit)
+        except Exception as e:
+            print(f"    Item API unavailable: {e}")
+            result = None
+        if result is not None:
+            return result
+        print(f"    Falling back to the browser...")
+    
+    if slot is None:
+        slot = main_slot
+    max_retries = 1  # Reduced retries to avoid getting stuck
+    retry_count = 0
+    result = (None, None, None, None)
+    
+    product_watchdog = get_watchdog() if PRODUCT_TIMEOUT else None
+    if product_watchdog is not None:
+        product_watchdog.arm(slot, PRODUCT_TIMEOUT, link)
+    try:
+        while retry_count <= max_retries:
+            result = scrape_product_data(link, expected_unit, slot=slot, capture_only=capture_only)
             
-            # Remove trailing punctuation
-            text = re.sub(r'\*+\s*$', '', text)
-            text = text.strip()
+            # If we got results (even if error like "Timeout error"), break immediately
+            if isinstance(result, dict) or result[0] is not None or slot.hung or slot.cancel.is_set():
+                break
             
-            return text if text else None
-        
+            # If we got None, None, None, None and it might be a session issue, retry once
+            retry_count += 1
+            if retry_count <= max_retries:
+                print(f"    🔄 Retrying ({retry_count}/{max_retries})...")
+                time.sleep(1)  # Pause before retry (reduced from 2s)
+    finally:
+        killed = product_watchdog is not None and product_watchdog.disarm(slot)
+    if killed:
+        # Whatever came back was cut off by the kill - the row gets "Timeout error" and the next product a new browser
+        print(f"    Browser killed after {PRODUCT_TIMEOUT}s - marking as timeout and starting a new browser")
+        slot.hung = False
         try:
-            # METHOD 1: Use JavaScript to quickly find description (faster than DOM traversal)
-            try:
-                description = driver.execute_script("""
-                    var elements = document.querySelectorAll('*');
-                    for (var i = 0; i < elements.length; i++) {
-                        var text = elements[i].textContent || '';
-                        if (text.indexOf('Description') !== -1 && (text.indexOf(':') !== -1 || text.indexOf(' :') !== -1)) {
-                            // Try to get text after "Description :"
-                            var match = text.match(/Description\\s*:?\\s*(.+?)(?:Product Details|ADD TO LIST|People Who|List price)/i);
-                            if (match && match[1]) {
-                                var desc = match[1].trim();
-                                if (desc.length >= 20 && desc.length <= 10000) {
-                                    return desc;
-                                }
-                            }
-                        }
-                    }
-                    return null;
-                """)
-                if description:
-                    description = clean_description_text(description)
-                    if description and 20 <= len(description) <= 10000:
-                        print(f"    Found description (JS): {len(description)} chars")
-                    else:
-                        description = None
-            except:
-                pass
+            driver_manager.replace(slot, "killed by the watchdog")
+        except Exception as e:
+            print(f"    Failed to start a new browser, will try on next product: {e}")
+        return "Timeout error", "Timeout error", "Timeout error", None
+    return result
+
+def create_pace_controller(workers):
+    """Pace controller for one run (None = fixed pause, when ADAPTIVE_PACE is off)"""
+    if not ADAPTIVE_PACE:
+        return None
+    from rate_control import PaceController
+    return PaceController(max_workers=workers, min_workers=MIN_ACTIVE_WORKERS, min_delay=MIN_PRODUCT_DELAY,
+                          max_delay=MAX_PRODUCT_DELAY, delay_step=PRODUCT_DELAY_STEP, slow_seconds=SLOW_PRODUCT_SECONDS)
+
+def is_failed_result(result):
+    """Timeouts and empty results (lost session, errors) mean the website or browser struggled"""
+    return not isinstance(result, dict) and result[0] in (None, "Timeout error")
+
+def create_retry_scheduler():
+    """Retry schedule for one run (None when RETRY_MAX_ATTEMPTS is 1)"""
+    if RETRY_MAX_ATTEMPTS <= 1:
+        return None
+    from rate_control import RetryScheduler
+    return RetryScheduler(max_attempts=RETRY_MAX_ATTEMPTS, base_delay=RETRY_FIRST_DELAY, max_delay=RETRY_MAX_DELAY)
+
+def create_hedger(workers):
+    """Hedger for a parallel run (None when HEDGE_SLOW_ITEMS is off or there is one worker)"""
+    if not HEDGE_SLOW_ITEMS or workers < 2:
+        return None
+    from rate_control import Hedger
+    return Hedger(percentile=HEDGE_PERCENTILE, min_seconds=HEDGE_MIN_SECONDS, max_rate=HEDGE_MAX_RATE)
+
+def create_circuit_breaker():
+    """Circuit breaker for one run (None when CIRCUIT_BREAKER is off)"""
+    if not CIRCUIT_BREAKER:
+        return None
+    from rate_control import CircuitBreaker
+    return CircuitBreaker(consecutive_limit=CIRCUIT_CONSECUTIVE_TIMEOUTS, window_limit=CIRCUIT_WINDOW_TIMEOUTS,
+                          first_probe_seconds=CIRCUIT_FIRST_PROBE_SECONDS, max_probe_seconds=CIRCUIT_MAX_PROBE_SECONDS,
+                          probe_link=PROBE_ITEM_LINK, probe_unit=PROBE_ITEM_UNIT)
+
+def is_timeout_result(result):
+    return not isinstance(result, dict) and result[0] == "Timeout error"
+
+def probe_website(slot, link, expected_unit):
+    """Scrape a known item to see if the website answers again (for the circuit breaker)"""
+    print(f"\n🔎 Circuit probe: {link}")
+    return not is_failed_result(scrape_with_retries(link, expected_unit, slot))
+
+def scrape_row(link, expected_unit, slot=None, capture_only=False, pace=None, breaker=None, stop_event=None):
+    """Scrape one row, then pause as the pace controller says
+    
+    While the circuit breaker is open this waits (one caller probes the website). A timeout
+    that comes back during a timeout storm is not returned - the row is tried again once the
+    website answers, so it never gets "Timeout error" because of the storm.
+    
+    Returns:
+        The result, or None if stop_event was set while the circuit was open (row left untouched)
+    """
+    if slot is None:
+        slot = main_slot
+    probe = lambda probe_link, probe_unit: probe_website(slot, probe_link, probe_unit)
+    while True:
+        if breaker is not None and not breaker.wait_until_closed(probe, stop_event, (link, expected_unit)):
+            return None
+        started = time.time()
+        result = scrape_with_retries(link, expected_unit, slot, capture_only)
+        seconds = time.time() - started
+        if slot.cancel.is_set():
+            return result  # Another worker got this item first - a cut-off attempt says nothing about the website
+        record_history(link, seconds, result)
+        held = breaker is not None and breaker.record(is_timeout_result(result), link, expected_unit)
+        pace_after_product(pace, seconds, result, stop_event)
+        if not held:
+            return result
+        print(f"    Circuit open - the row is left as it is and tried again once the website answers")
+
+def pace_after_product(pace, seconds, result, stop_event=None):
+    """Tell the pace controller how a product went, then pause before the next one"""
+    if pace is None:
+        delay = 0.2
+    else:
+        message = pace.record(seconds, is_failed_result(result))
+        if message:
+            print(f"\n⚙️  Pace: {message}")
+        delay = pace.delay
+    # Small delay to avoid overwhelming the server
+    if stop_event is not None:
+        stop_event.wait(delay)
+    else:
+        time.sleep(delay)
+
+def ignore_keyboard_interrupt():
+    """Parser processes ignore Ctrl+C so the main process can finish their pages before saving"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+class ScrapeWorker(threading.Thread):
+    """Worker thread that owns one Chrome instance and scrapes rows from a shared task queue
+    
+    Workers never touch the DataFrame: every result is put on the results queue and
+    written by the main thread. In pipeline mode (capture_only) workers only fetch pages
+    and the main thread hands them to the parser processes.
+    """
+    def __init__(self, worker_id, tasks, results, stop_event, capture_only=False, pace=None, breaker=None, hedger=None):
+        super().__init__(name=f"scrape-worker-{worker_id}", daemon=True)
+        self.worker_id = worker_id
+        self.slot = DriverSlot(worker_id)
+        self.tasks = tasks
+        self.results = results
+        self.stop_event = stop_event
+        self.capture_only = capture_only
+        self.pace = pace  # PaceController shared by all workers (None = fixed pause)
+        self.breaker = breaker  # CircuitBreaker shared by all workers (None = off)
+        self.hedger = hedger  # Hedger shared by all workers (None = no hedging)
+    
+    def run(self):
+        try:
+            if FETCH_BACKEND != "http":
+                try:
+                    setup_driver(self.slot)
+                except Exception as e:
+                    print(f"\n[Worker {self.worker_id}] ERROR: Could not start Chrome: {e}")
+                    return
             
-            # METHOD 2: Fallback to page source pattern (using cached page_source)
-            if not description:
-                desc_heading_patterns = ['Description :', 'Description:', 'Description']
-                desc_index = -1
-                for pattern in desc_heading_patterns:
-                    desc_index = page_source.find(pattern)
-                    if desc_index != -1:
+            while not self.stop_event.is_set():
+                # Paused while the pace controller runs fewer workers than there are
+                if self.pace is not None and not self.pace.wait_turn(self.worker_id, self.stop_event):
+                    break
+                try:
+                    # With hedging, a worker that finds nothing queued looks for slow items meanwhile
+                    task = self.tasks.get(timeout=0.25 if self.hedger is not None else None)
+                except queue.Empty:
+                    if not self.hedge_slow_item():
                         break
-                
-                if desc_index != -1:
-                    # Get text chunk after the description heading
-                    text_chunk = page_source[desc_index:desc_index + 10000]
-                    
-                    # Remove HTML tags and decode HTML entities
-                    text_only = html_tag_pattern.sub(' ', text_chunk)
-                    text_only = html.unescape(text_only)
-                    text_only = ' '.join(text_only.split())
-                    
-                    # Remove the "Description :" prefix
-                    text_only = desc_pattern.sub('', text_only, count=1)
-                    text_only = text_only.strip()
-                    
-                    # Find stop markers and truncate if in last 30% of text
-                    text_length = len(text_only)
-                    stop_match = stop_markers_pattern.search(text_only)
-                    if stop_match and stop_match.start() > text_length * 0.7:
-                        text_only = text_only[:stop_match.start()].strip()
-                    
-                    # Clean the description text
-                    text_only = clean_description_text(text_only)
-                    
-                    # Final validation
-                    if text_only and 20 <= len(text_only) <= 10000:
-                        description = text_only
-                        print(f"    Found description (page source): {len(description)} chars")
-        
+                    continue
+                if task is None:  # No more rows to scrape
+                    if self.pace is not None:
+                        self.pace.release_all()  # Paused workers only have their stop marker left to pick up
+                    break
+                self.slot.cancel.clear()
+                if self.hedger is not None:
+                    self.hedger.start(task[0], task, self.worker_id, self.slot.cancel)
+                if not self.scrape_task(task):
+                    break
+        finally:
+            self.slot.quit()
+    
+    def scrape_task(self, task):
+        """Scrape one row and put its result on the results queue, returns False if stopped meanwhile"""
+        idx, link, expected_unit, current_values = task
+        started = time.time()
+        try:
+            result = scrape_row(link, expected_unit, self.slot, self.capture_only, self.pace, self.breaker, self.stop_event)
         except Exception as e:
-            pass  # Silently continue
-        return product_name, description, image_url, website_unit
+            print(f"    [Worker {self.worker_id}] Error scraping: {e}")
+            result = (None, None, None, None)
+        if result is None:
+            return False  # Stopped while the circuit was open - the row stays as it is
+        if self.hedger is not None:
+            # Only the first good answer of a hedged item is written
+            result = self.hedger.finish(idx, self.worker_id, result, time.time() - started, is_failed_result(result))
+        if result is not None:
+            # Blocks while the results queue is full (pipeline backpressure)
+            self.results.put((idx, current_values, result, self.worker_id, expected_unit))
         
-    except TimeoutException:
-        print(f"    Page load timeout (30s) - stopping page load")
-        try:
-            # Stop the page from loading to prevent browser from getting stuck
-            driver.execute_script("window.stop();")
-        except:
-            pass  # Ignore if we can't execute script
-        try:
-            # Navigate to about:blank to reset browser state
-            driver.get("about:blank")
-        except:
-            pass  # Ignore if navigation fails
-        time.sleep(0.2)  # Brief pause to let browser recover (optimized)
-        return "Timeout error", "Timeout error", "Timeout error", None
-    except (ReadTimeoutError, Urllib3ConnectionError, socket.timeout, ConnectionResetError) as e:
-        error_msg = str(e).lower()
-        if 'read timeout' in error_msg or 'connection' in error_msg or 'timeout' in error_msg:
-            print(f"    Connection timeout/error - marking as timeout")
-            return "Timeout error", "Timeout error", "Timeout error", None
-        else:
-            print(f"    Connection error: {e}")
-            return "Timeout error", "Timeout error", "Timeout error", None
-    except (InvalidSessionIdException, WebDriverException) as e:
-        error_msg = str(e).lower()
-        if 'invalid session id' in error_msg or 'session id' in error_msg:
-            if retry_count < 1:  # Only retry once
-                print(f"    Browser session lost. Recreating driver and retrying...")
-                try:
-                    recreate_driver()
-                    # Retry the entire scraping operation
-                    print(f"    Retrying: {link}")
-                    return scrape_product_data(link, expected_unit, retry_count + 1)  # Recursive retry
-                except Exception as retry_error:
-                    print(f"    Failed to recreate driver or retry failed: {retry_error}")
-                    return None, None, None, None
-            else:
-                print(f"    Browser session lost (max retries reached)")
-                return None, None, None, None
-        else:
-            print(f"    WebDriver error: {e}")
-            return None, None, None, None
-    except Exception as e:
-        error_msg = str(e).lower()
-        # Check for invalid session id in error message (sometimes it's wrapped in a generic exception)
-        if 'invalid session id' in error_msg or 'session id' in error_msg:
-            if retry_count < 1:  # Only retry once
-                print(f"    Browser session lost. Recreating driver and retrying...")
-                try:
-                    recreate_driver()
-                    # Retry the entire scraping operation
-                    print(f"    Retrying: {link}")
-                    return scrape_product_data(link, expected_unit, retry_count + 1)  # Recursive retry
-                except Exception as retry_error:
-                    print(f"    Failed to recreate driver or retry failed: {retry_error}")
-                    return None, None, None, None
-            else:
-                print(f"    Browser session lost (max retries reached)")
-                return None, None, None, None
-        # Check for timeout/connection errors in generic exceptions
-        elif 'timeout' in error_msg or 'read timeout' in error_msg or 'connection' in error_msg:
-            print(f"    Timeout/connection error detected")
-            return "Timeout error", "Timeout error", "Timeout error", None
-        else:
-            print(f"    Error scraping: {e}")
-            return None, None, None, None
+        # Check if browser is still responsive (quick check to prevent getting stuck)
+        if self.slot.driver is not None:
+            ensure_driver_responsive(self.slot)
+            driver_manager.check(self.slot)
+        return True
+    
+    def hedge_slow_item(self):
+        """Nothing queued: open an item another worker is slow on, returns False if stopped meanwhile"""
+        # Workers the pace controller paused don't add load to a struggling website
+        if self.pace is not None and self.worker_id > self.pace.active:
+            return True
+        self.slot.cancel.clear()
+        task = self.hedger.pick(self.worker_id, self.slot.cancel)
+        if task is None:
+            return True
+        return self.scrape_task(task)
 
-def process_products(start_idx=0, end_idx=None, test_mode=False, recheck_not_found=False, specific_indices=None):
+def process_products(start_idx=0, end_idx=None, test_mode=False, recheck_not_found=False, specific_indices=None, workers=None, resume=False):
     """Process products from start_idx to end_idx (inclusive)
     
     Args:
@@ -845,15 +1943,39 @@ def process_products(start_idx=0, end_idx=None, test_mode=False, recheck_not_fou
         test_mode: If True, indicates test mode (currently no special behavior)
         recheck_not_found: If True, will recheck products marked "Product not found" instead of skipping them
         specific_indices: Optional list of specific indices to process (only processes these indices if provided)
+        workers: Number of Chrome instances to scrape with in parallel (None uses PARALLEL_WORKERS)
+        resume: If True, continue the last interrupted run from its run manifest (the other
+                arguments are taken from the manifest)
     """
     global df
     
+    run = None
+    if resume:
+        run, specific_indices = load_resumed_run()
+        if run is None:
+            return
+        start_idx, end_idx = 0, None
+        recheck_not_found = run.options.get("recheck_not_found", False)
+        if workers is None:
+            workers = run.options.get("workers")
+    
+    if workers is None:
+        workers = PARALLEL_WORKERS
+    workers = max(1, int(workers))
+    # Worker threads are used for parallel browsers and for the fetch/parse pipeline
+    threaded = workers > 1 or PARSE_PROCESSES > 0 or FETCH_BACKEND == "playwright"
+    
     # Create backup before starting
     print("\nCreating backup before starting...")
     create_backup()
     
-    # Setup driver if not already done
-    setup_driver()
+    # Chrome processes of an earlier crashed run would only hold memory
+    driver_manager.reap()
+    
+    # Setup driver if not already done (workers start their own browsers)
+    # With the HTTP backend the browser is only started when a product needs the fallback
+    if not threaded and FETCH_BACKEND != "http":
+        setup_driver()
     
     if end_idx is None:
         end_idx = len(df) - 1
@@ -890,13 +2012,15 @@ def process_products(start_idx=0, end_idx=None, test_mode=False, recheck_not_fou
     processed_count = 0
     skipped_count = 0
     error_count = 0
+    main_slot.pages_loaded = 0
+    main_slot.load_seconds = 0.0
     
     # Function to safely save progress
     def save_progress_safely():
         """Safely save the Excel file"""
         try:
             print(f"\nSaving progress before exit...")
-            df.to_excel(excel_path, index=False)
+            export_workbook()
             print(f"Progress saved successfully! (Processed: {processed_count}, Skipped: {skipped_count}, Errors: {error_count})")
             return True
         except Exception as e:
@@ -904,7 +2028,7 @@ def process_products(start_idx=0, end_idx=None, test_mode=False, recheck_not_fou
             # Try to save to a backup location
             try:
                 backup_path = excel_path.replace('.xlsx', '_emergency_backup.xlsx')
-                df.to_excel(backup_path, index=False)
+                export_workbook(backup_path)
                 print(f"Emergency backup saved to: {backup_path}")
                 return True
             except Exception as backup_error:
@@ -912,16 +2036,242 @@ def process_products(start_idx=0, end_idx=None, test_mode=False, recheck_not_fou
                 return False
     
     # Find Item Number column for display
-    item_number_col = None
-    for col in df.columns:
-        col_lower = col.lower()
-        if col_lower == 'item number':
-            item_number_col = col
-            break
-        elif 'item' in col_lower and 'number' in col_lower:
-            if 'stock' not in col_lower and 'butted' not in col_lower:
-                item_number_col = col
-                break
+    item_number_col = find_item_number_col()
+    
+    def get_item_label(idx):
+        """Item number of a row for display"""
+        row = df.iloc[idx]
+        return str(row[item_number_col]).strip() if item_number_col and pd.notna(row[item_number_col]) else f"Row {idx + 1}"
+    
+    def record_result(idx, current_values, result):
+        """Apply a scrape result to the DataFrame and save progress periodically
+        
+        A timeout or lost session is not written while the row has attempts left - the row
+        waits in the retry schedule and is scraped again after the main pass.
+        """
+        nonlocal processed_count, error_count
+        if estimate is not None:
+            estimate.done(idx)
+        if retries is not None:
+            if is_failed_result(result):
+                attempt = retries.attempt(idx)
+                delay = retries.defer(idx, row_tasks[idx])
+                if delay is not None:
+                    print(f"\n   ⏳ Attempt {attempt}/{RETRY_MAX_ATTEMPTS} failed - trying this row again in {delay:.0f}s (after the main pass)")
+                    return
+                print(f"\n   ⏳ Attempt {attempt}/{RETRY_MAX_ATTEMPTS} failed - no attempts left")
+            else:
+                retries.finish(idx, result[0] if result[0] in ("Product not found", "Unit not matched") else "scraped")
+        if apply_scrape_result(idx, result, current_values):
+            processed_count += 1
+        else:
+            error_count += 1
+        store_result(idx, result, current_values)
+        journal_result(idx, result)
+        if run is not None:
+            run.done(idx)
+        
+        # Save progress (every 20 products)
+        if processed_count % 20 == 0 and processed_count > 0:
+            print(f"\nSaving progress...")
+            save_checkpoint()
+            print(f"Progress saved! (Processed: {processed_count}, Skipped: {skipped_count}, Errors: {error_count})")
+            if pace is not None:
+                print(f"Pace: {pace.status()}")
+            if estimate is not None:
+                print(f"Time left: {estimate.describe()}")
+            print()
+    
+    pool_workers = []
+    pool_stop = threading.Event()
+    # Playwright runs its browser contexts as the workers the pace controller lets in
+    pace = create_pace_controller(PLAYWRIGHT_CONCURRENCY if FETCH_BACKEND == "playwright" else workers if threaded else 1)
+    breaker = create_circuit_breaker()
+    retries = create_retry_scheduler()
+    hedger = create_hedger(workers) if FETCH_BACKEND != "playwright" else None
+    row_tasks = {}  # idx -> (idx, link, expected_unit, current_values) of every row sent to the scraper
+    estimate = None  # RunEstimate from the crawl history (set once the rows are planned)
+    received_count = 0  # Results the workers sent back (written or waiting for a retry)
+    parse_pool = None
+    parsing = {}  # Future -> (idx, current_values, worker_id) of pages being parsed
+    if PARSE_PROCESSES > 0:
+        # Pipeline mode: a bounded queue so the browsers can't run ahead of the parsers
+        results = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        parse_pool = concurrent.futures.ProcessPoolExecutor(max_workers=PARSE_PROCESSES, initializer=ignore_keyboard_interrupt)
+    else:
+        results = queue.Queue()
+    
+    def write_result(idx, current_values, result, worker_id):
+        """Print the product header and write one finished result"""
+        nonlocal received_count
+        received_count += 1
+        attempt = retries.attempt(idx) if retries is not None else 1
+        print(f"\n{'='*70}")
+        print(f"📦 Product: {get_item_label(idx)} | Row {idx + 1}/{len(df)} | Worker {worker_id} | Done: {processed_count + error_count + 1}/{total_to_process}"
+              f"{f' | Attempt {attempt}/{RETRY_MAX_ATTEMPTS}' if attempt > 1 else ''}{f' | {pace.describe()}' if pace is not None else ''}"
+              f"{f' | {estimate.describe()}' if estimate is not None else ''}")
+        print(f"{'='*70}")
+        record_result(idx, current_values, result)
+    
+    def collect_parsed(wait_for_one=False):
+        """Write the results of pages the parser processes have finished"""
+        if not parsing:
+            return
+        done, _ = concurrent.futures.wait(list(parsing), timeout=None if wait_for_one else 0,
+                                          return_when=concurrent.futures.FIRST_COMPLETED)
+        for future in done:
+            idx, current_values, worker_id = parsing.pop(future)
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"    Error parsing page: {e}")
+                result = (None, None, None, None)
+            write_result(idx, current_values, result, worker_id)
+    
+    def drain_results(block=False):
+        """Write every result the workers have finished (results are applied on this thread only)"""
+        while True:
+            collect_parsed()
+            try:
+                if block:
+                    item = results.get(timeout=0.5)
+                else:
+                    item = results.get_nowait()
+            except queue.Empty:
+                return
+            idx, current_values, result, worker_id, expected_unit = item
+            if isinstance(result, dict):
+                # Captured page: parse it in the process pool. While every parser is busy we stop
+                # reading the queue, so it fills up and the browsers wait (backpressure).
+                while len(parsing) >= PARSE_PROCESSES * 2:
+                    collect_parsed(wait_for_one=True)
+                parsing[parse_pool.submit(parse_captured_page, result, expected_unit)] = (idx, current_values, worker_id)
+            else:
+                write_result(idx, current_values, result, worker_id)
+    
+    def finish_parsing():
+        """Wait for every page still being parsed and write its result"""
+        while parsing:
+            collect_parsed(wait_for_one=True)
+    
+    def run_workers(row_list, description):
+        """Scrape rows with the worker threads until every one of them is done
+        
+        Rows waiting for a retry are queued for the same workers as they come due, so the
+        browsers stay open until the last retry has its answer.
+        """
+        nonlocal received_count
+        tasks = queue.Queue()
+        queued = 0
+        
+        def queue_rows(task_list):
+            nonlocal queued
+            for task in task_list:
+                row_tasks[task[0]] = task
+            if run is not None:
+                run.start([task[0] for task in task_list])
+            for task in task_list:
+                tasks.put(task)
+            queued += len(task_list)
+        
+        queue_rows(row_list)
+        round_workers = []
+        received_count = 0
+        if pace is not None:
+            pace.hold()
+        if FETCH_BACKEND == "playwright":
+            # One thread runs every browser context; it reads tasks until the stop marker
+            from playwright_backend import PlaywrightWorker
+            print(f"Starting Playwright with up to {PLAYWRIGHT_CONCURRENCY} browser contexts for {description}...")
+            stop_markers = 1
+            round_workers.append(PlaywrightWorker(tasks, results, pool_stop, capture_only=parse_pool is not None,
+                                                  concurrency=PLAYWRIGHT_CONCURRENCY, headless=HEADLESS_MODE,
+                                                  blocked_url_patterns=BLOCKED_URL_PATTERNS, blocked_resource_types=BLOCKED_RESOURCE_TYPES,
+                                                  page_ready_timeout=PAGE_READY_TIMEOUT, hash_navigation=NAVIGATION_MODE == "hash",
+                                                  ready_quiet_ms=READY_QUIET_MS, history=get_crawl_history(),
+                                                  pace=pace, breaker=breaker))
+        else:
+            round_count = min(workers, len(row_list)) or 1
+            print(f"Starting {round_count} browser workers for {description}...")
+            stop_markers = round_count  # One per worker
+            for worker_id in range(1, round_count + 1):
+                round_workers.append(ScrapeWorker(worker_id, tasks, results, pool_stop, capture_only=parse_pool is not None,
+                                                  pace=pace, breaker=breaker, hedger=hedger))
+        for worker in round_workers:
+            pool_workers.append(worker)
+            worker.start()
+        
+        stopping = False
+        announced = None  # Results received when the last retry wait was announced
+        while any(worker.is_alive() for worker in round_workers):
+            drain_results(block=True)
+            if stopping or not tasks.empty():
+                continue
+            # Every queued row was handed out: queue the retries that are due
+            due = retries.pop_due() if retries is not None else []
+            if due:
+                print(f"\n🔁 Retrying {len(due)} rows ({len(retries)} more waiting)")
+                queue_rows(due)
+            elif received_count >= queued:
+                if retries is not None and len(retries):
+                    if announced != received_count:
+                        announced = received_count
+                        print(f"\n⏳ {len(retries)} rows waiting for a retry, next one in {retries.seconds_until_due():.0f}s...")
+                else:
+                    for _ in range(stop_markers):
+                        tasks.put(None)
+                    stopping = True
+        drain_results()
+        finish_parsing()
+        
+        if received_count < queued:
+            print(f"\nWarning: All workers stopped before finishing ({queued - received_count} products not scraped)")
+    
+    def print_product_header(idx, progress):
+        """Product header of the single browser loop"""
+        print(f"\n{'='*70}")
+        print(f"📦 Product: {get_item_label(idx)} | Row {idx + 1}/{len(df)} | {progress}"
+              f"{f' | {pace.describe()}' if pace is not None else ''}{f' | {estimate.describe()}' if estimate is not None else ''}")
+        print(f"{'='*70}")
+    
+    def scrape_task(task):
+        """Scrape one row with the main browser and write the result"""
+        idx, link, expected_unit, current_values = task
+        row_tasks[idx] = task
+        if run is not None:
+            run.start([idx])
+        
+        # Scrape data (with retry on session loss, but not for timeout errors)
+        print(f"\n  🌐 Accessing: {link}")
+        print(f"  🔍 Expected Unit: {expected_unit}")
+        
+        result = scrape_row(link, expected_unit, pace=pace, breaker=breaker)
+        record_result(idx, current_values, result)
+        
+        # Check if browser is still responsive (quick check to prevent getting stuck)
+        if main_slot.driver is not None:
+            ensure_driver_responsive()
+            driver_manager.check(main_slot)
+    
+    def print_retry_summary():
+        """Attempts of every row that needed more than one"""
+        if retries is None or not retries.failures:
+            return
+        retried, answered, gave_up, waiting = retries.summary()
+        print(f"Retries: {retried} rows retried, {answered} answered, {gave_up} gave up"
+              f"{f', {waiting} left as they were (still waiting)' if waiting else ''}")
+        for idx, (attempts, outcome) in sorted(retries.finished.items()):
+            print(f"   {get_item_label(idx)} (row {idx + 1}): {attempts} attempts - {outcome}")
+    
+    def stop_workers():
+        """Let every worker finish its current product, then write all remaining results"""
+        pool_stop.set()
+        for worker in pool_workers:
+            while worker.is_alive():
+                worker.join(timeout=0.5)
+                drain_results()
+        drain_results()
+        finish_parsing()
     
     try:
         # If specific_indices is provided, only process those indices
@@ -930,259 +2280,111 @@ def process_products(start_idx=0, end_idx=None, test_mode=False, recheck_not_fou
         else:
             indices_to_process = list(range(start_idx, end_idx + 1))
         
-        for idx in indices_to_process:
-            row = df.iloc[idx]
-            
-            # Get item number for display
-            item_number = str(row[item_number_col]).strip() if item_number_col and pd.notna(row[item_number_col]) else f"Row {idx + 1}"
-            
-            print(f"\n{'='*70}")
-            print(f"📦 Product: {item_number} | Row {idx + 1}/{len(df)} | Progress: {processed_count + 1}/{total_to_process}")
-            print(f"{'='*70}")
-            
-            # Get link
-            link = row[link_col]
-            if pd.isna(link) or str(link).strip() == '':
-                print("  ❌ No link found, skipping...")
-                skipped_count += 1
-                continue
-            
-            # Get expected unit
-            expected_unit = row[unit_col]
-            if pd.isna(expected_unit):
-                print("  ❌ No unit of measure found, skipping...")
-                skipped_count += 1
-                continue
-            
-            # Check current status of the three columns
-            current_product_name = str(row[product_name_col]).strip() if pd.notna(row[product_name_col]) else ''
-            current_description = str(row[description_col]).strip() if pd.notna(row[description_col]) else ''
-            current_image_url = str(row[image_url_col]).strip() if pd.notna(row[image_url_col]) else ''
-            
-            # Helper function to get status emoji
-            def get_status_emoji(value, error_messages):
-                if not value or value == '':
-                    return '⚪', 'Empty'
-                elif value in error_messages:
-                    if value == 'Product not found':
-                        return '❌', 'Product not found'
-                    elif value == 'Unit not matched':
-                        return '⚠️', 'Unit not matched'
-                    elif value == 'Timeout error':
-                        return '⏱️', 'Timeout error'
-                    else:
-                        return '⚠️', value
-                else:
-                    return '✅', 'Found'
-            
-            error_messages = ['Unit not matched', 'Product not found', 'Timeout error', '']
-            
-            # Display current status
-            pn_emoji, pn_status = get_status_emoji(current_product_name, error_messages)
-            desc_emoji, desc_status = get_status_emoji(current_description, error_messages)
-            img_emoji, img_status = get_status_emoji(current_image_url, error_messages)
-            
-            print(f"\n📊 Current Status:")
-            print(f"   {pn_emoji} Product Name: {pn_status}")
-            print(f"   {desc_emoji} Description: {desc_status}")
-            print(f"   {img_emoji} Image URL: {img_status}")
-            
-            # Skip if any column has "Product not found" (product wasn't found on website)
-            # Unless we're in recheck mode
-            if not recheck_not_found:
-                if (current_product_name == 'Product not found' or 
-                    current_description == 'Product not found' or 
-                    current_image_url == 'Product not found'):
-                    print(f"\n  ⏭️  Already marked as 'Product not found', skipping...")
+        # Cheap items that worked before first, slow or failing item groups last
+        parallel = PLAYWRIGHT_CONCURRENCY if FETCH_BACKEND == "playwright" else workers if threaded else 1
+        indices_to_process, estimate = plan_rows(indices_to_process, recheck_not_found, parallel)
+        if run is not None:
+            # Rows that were in flight when the run stopped go first
+            in_flight = run.in_flight()
+            indices_to_process.sort(key=lambda idx: idx not in in_flight)
+            run.resumed()
+        elif RUN_MANIFEST:
+            from run_manifest import RunManifest
+            run = RunManifest.create(run_manifest_path, indices_to_process, result_keys(indices_to_process),
+                                     {"recheck_not_found": recheck_not_found, "workers": workers})
+        
+        if threaded:
+            # Parallel/pipeline mode: browsers pull rows from a shared queue, this thread is the only writer
+            row_list = []
+            for idx in indices_to_process:
+                prepared = prepare_row(idx, recheck_not_found, verbose=False)
+                if prepared is None:
                     skipped_count += 1
+                    if run is not None:
+                        run.done(idx)
                     continue
-            else:
-                # In recheck mode, show that we're rechecking
-                if (current_product_name == 'Product not found' or 
-                    current_description == 'Product not found' or 
-                    current_image_url == 'Product not found'):
-                    print(f"\n  🔄 Rechecking product previously marked as 'Product not found'...")
+                link, expected_unit, current_values = prepared
+                row_list.append((idx, link, expected_unit, current_values))
             
-            # Count how many columns have valid data (not empty, not error messages)
-            filled_count = 0
-            if current_product_name and current_product_name not in error_messages:
-                filled_count += 1
-            if current_description and current_description not in error_messages:
-                filled_count += 1
-            if current_image_url and current_image_url not in error_messages:
-                filled_count += 1
-            
-            # Skip if all 3 columns are already filled
-            if filled_count == 3:
-                print(f"\n  ✅ All columns already filled, skipping...")
-                skipped_count += 1
-                continue
-            
-            # If 1 or 2 columns are filled, we'll re-scrape to fill the empty ones
-            if filled_count > 0:
-                print(f"\n  🔄 Partial data found ({filled_count}/3 columns filled), re-scraping to fill empty columns...")
-            else:
-                print(f"\n  🆕 New product, scraping all columns...")
-            
-            # Scrape data (with retry on session loss, but not for timeout errors)
-            print(f"\n  🌐 Accessing: {link}")
-            print(f"  🔍 Expected Unit: {expected_unit}")
-            
-            max_retries = 1  # Reduced retries to avoid getting stuck
-            retry_count = 0
-            product_name, description, image_url, website_unit = None, None, None, None
-            
-            while retry_count <= max_retries:
-                product_name, description, image_url, website_unit = scrape_product_data(str(link).strip(), expected_unit)
-                
-                # If we got results (even if error like "Timeout error"), break immediately
-                if product_name is not None:
-                    break
-                
-                # If we got None, None, None, None and it might be a session issue, retry once
-                retry_count += 1
-                if retry_count <= max_retries:
-                    print(f"    🔄 Retrying ({retry_count}/{max_retries})...")
-                    time.sleep(1)  # Pause before retry (reduced from 2s)
-            
-            # Display scraping results
-            print(f"\n📥 Scraping Results:")
-            
-            # Update Excel row - only fill empty columns, don't overwrite existing data
-            if product_name == "Unit not matched":
-                print(f"   ⚠️  Unit not matched! Website unit doesn't match expected unit.")
-                # Only update if column is empty or has error message
-                updated_pn = not current_product_name or current_product_name in ['Unit not matched', 'Timeout error', '']
-                updated_desc = not current_description or current_description in ['Unit not matched', 'Timeout error', '']
-                updated_img = not current_image_url or current_image_url in ['Unit not matched', 'Timeout error', '']
-                
-                if updated_pn:
-                    df.at[idx, product_name_col] = "Unit not matched"
-                if updated_desc:
-                    df.at[idx, description_col] = "Unit not matched"
-                if updated_img:
-                    df.at[idx, image_url_col] = "Unit not matched"
-                
-                print(f"   📝 Updated: Product Name: {'✅' if updated_pn else '⏭️'}, Description: {'✅' if updated_desc else '⏭️'}, Image URL: {'✅' if updated_img else '⏭️'}")
-                processed_count += 1
-            elif product_name == "Product not found":
-                print(f"   ❌ Product not found on website!")
-                # Only update if column is empty or has error message
-                updated_pn = not current_product_name or current_product_name in ['Product not found', 'Timeout error', '']
-                updated_desc = not current_description or current_description in ['Product not found', 'Timeout error', '']
-                updated_img = not current_image_url or current_image_url in ['Product not found', 'Timeout error', '']
-                
-                if updated_pn:
-                    df.at[idx, product_name_col] = "Product not found"
-                if updated_desc:
-                    df.at[idx, description_col] = "Product not found"
-                if updated_img:
-                    df.at[idx, image_url_col] = "Product not found"
-                
-                print(f"   📝 Updated: Product Name: {'✅' if updated_pn else '⏭️'}, Description: {'✅' if updated_desc else '⏭️'}, Image URL: {'✅' if updated_img else '⏭️'}")
-                processed_count += 1
-            elif product_name == "Timeout error":
-                print(f"   ⏱️  Timeout error occurred!")
-                # Only update if column is empty (don't overwrite valid data with timeout error)
-                updated_pn = not current_product_name or current_product_name in ['Timeout error', '']
-                updated_desc = not current_description or current_description in ['Timeout error', '']
-                updated_img = not current_image_url or current_image_url in ['Timeout error', '']
-                
-                if updated_pn:
-                    df.at[idx, product_name_col] = "Timeout error"
-                if updated_desc:
-                    df.at[idx, description_col] = "Timeout error"
-                if updated_img:
-                    df.at[idx, image_url_col] = "Timeout error"
-                
-                print(f"   📝 Updated: Product Name: {'✅' if updated_pn else '⏭️'}, Description: {'✅' if updated_desc else '⏭️'}, Image URL: {'✅' if updated_img else '⏭️'}")
-                processed_count += 1
-            elif product_name:
-                # Display what was found
-                pn_found = '✅' if product_name else '❌'
-                desc_found = '✅' if description else '❌'
-                img_found = '✅' if image_url else '❌'
-                
-                print(f"   {pn_found} Product Name: {'Found' if product_name else 'Not found'}")
-                if product_name:
-                    print(f"      └─ {product_name[:60]}{'...' if len(product_name) > 60 else ''}")
-                
-                print(f"   {desc_found} Description: {'Found' if description else 'Not found'}")
-                if description:
-                    print(f"      └─ {description[:60]}{'...' if len(description) > 60 else ''} ({len(description)} chars)")
-                
-                print(f"   {img_found} Image URL: {'Found' if image_url else 'Not found'}")
-                if image_url:
-                    print(f"      └─ {image_url[:60]}{'...' if len(image_url) > 60 else ''}")
-                
-                # Only fill empty columns, preserve existing valid data
-                updated_pn = not current_product_name or current_product_name in ['Unit not matched', 'Timeout error', '']
-                updated_desc = description and (not current_description or current_description in ['Unit not matched', 'Timeout error', ''])
-                updated_img = image_url and (not current_image_url or current_image_url in ['Unit not matched', 'Timeout error', ''])
-                
-                # Update Product Name if empty or has error message
-                if updated_pn:
-                    df.at[idx, product_name_col] = product_name
-                # Update Description if empty or has error message
-                if updated_desc:
-                    df.at[idx, description_col] = description
-                # Update Image URL if empty or has error message
-                if updated_img:
-                    df.at[idx, image_url_col] = image_url
-                
-                print(f"\n   📝 Excel Update:")
-                print(f"      Product Name: {'✅ Updated' if updated_pn else '⏭️  Preserved (already has data)'}")
-                print(f"      Description: {'✅ Updated' if updated_desc else '⏭️  Preserved (already has data)' if current_description and current_description not in error_messages else '❌ Not found'}")
-                print(f"      Image URL: {'✅ Updated' if updated_img else '⏭️  Preserved (already has data)' if current_image_url and current_image_url not in error_messages else '❌ Not found'}")
+            if parse_pool is not None:
+                print(f"Pipeline mode: pages are parsed by {PARSE_PROCESSES} processes")
+            run_workers(row_list, f"{len(row_list)} products ({skipped_count} skipped)")
+        else:
+            for idx in indices_to_process:
+                print_product_header(idx, f"Progress: {processed_count + 1}/{total_to_process}")
                 
-                processed_count += 1
-            else:
-                print(f"   ❌ Error: No data returned from scraper")
-                error_count += 1
-            
-            # Save progress (every 20 products)
-            if processed_count % 20 == 0 and processed_count > 0:
-                print(f"\nSaving progress...")
-                df.to_excel(excel_path, index=False)
-                print(f"Progress saved! (Processed: {processed_count}, Skipped: {skipped_count}, Errors: {error_count})\n")
-            
-            # Small delay to avoid overwhelming the server (optimized)
-            time.sleep(0.2)
-            
-            # Check if browser is still responsive (quick check to prevent getting stuck)
-            try:
-                driver.current_url  # Simple check to see if browser is responsive
-            except (InvalidSessionIdException, WebDriverException, Exception) as e:
-                # Browser became unresponsive, recreate driver
-                error_msg = str(e).lower()
-                if 'timeout' in error_msg or 'session' in error_msg or 'connection' in error_msg:
-                    print(f"    Browser unresponsive, recreating driver...")
-                    try:
-                        recreate_driver()
-                    except:
-                        print(f"    Failed to recreate driver, will try on next product")
+                prepared = prepare_row(idx, recheck_not_found)
+                if prepared is None:
+                    skipped_count += 1
+                    if run is not None:
+                        run.done(idx)
+                    continue
+                link, expected_unit, current_values = prepared
+                scrape_task((idx, link, expected_unit, current_values))
+        
+        # Rows that timed out or lost their session get their next attempts now (the workers
+        # of parallel mode already took them as they came due)
+        while not threaded and retries is not None and len(retries):
+            wait_seconds = retries.seconds_until_due()
+            if wait_seconds > 0:
+                print(f"\n⏳ {len(retries)} rows waiting for a retry, next one in {wait_seconds:.0f}s...")
+                time.sleep(wait_seconds)
+            due = retries.pop_due()
+            print(f"\n🔁 Retrying {len(due)} rows ({len(retries)} more waiting)")
+            for task in due:
+                idx = task[0]
+                print_product_header(idx, f"Attempt {retries.attempt(idx)}/{RETRY_MAX_ATTEMPTS}")
+                scrape_task(task)
         
         # Final save (normal completion)
         print(f"\nSaving final results...")
-        df.to_excel(excel_path, index=False)
+        export_workbook()
+        if run is not None:
+            rows_left = len(run.remaining())
+            if rows_left:
+                print(f"⚠️  {rows_left} rows of this run did not finish - continue them with: python scrape_products.py --resume")
+            else:
+                run.finish()
         
         # Create backup after completion
         print("Creating backup after completion...")
         create_backup()
         
         print(f"\nDone! Processed: {processed_count}, Skipped: {skipped_count}, Errors: {error_count}")
+        pages_loaded = main_slot.pages_loaded + sum(worker.slot.pages_loaded for worker in pool_workers)
+        if pages_loaded:
+            load_seconds = main_slot.load_seconds + sum(worker.slot.load_seconds for worker in pool_workers)
+            print(f"Average page load: {load_seconds / pages_loaded:.2f}s over {pages_loaded} pages ({PAGE_LOAD_STRATEGY} load strategy)")
+        print_asset_proxy_stats()
+        if pace is not None:
+            print(f"Pace at the end: {pace.status()}")
+        if breaker is not None and breaker.summary():
+            print(breaker.summary())
+        print_retry_summary()
+        if hedger is not None and hedger.summary():
+            print(hedger.summary())
     
     except KeyboardInterrupt:
         # User pressed Ctrl+C - save progress before exiting
         print("\n\n" + "="*60)
         print("INTERRUPTED BY USER (Ctrl+C)")
         print("="*60)
+        if pool_workers:
+            print(f"\nWaiting for {len(pool_workers)} workers to finish their current product...")
+            stop_workers()
         print(f"\nSaving progress before exit...")
         save_progress_safely()
-        print(f"\nProgress saved! You can resume from where you left off.")
+        print(f"\nProgress saved! You can resume from where you left off"
+              f"{' with: python scrape_products.py --resume' if run is not None else '.'}")
         print(f"Processed: {processed_count}, Skipped: {skipped_count}, Errors: {error_count}")
+        print_retry_summary()
         print("\nExiting gracefully...")
         raise  # Re-raise to exit the function
+    finally:
+        if parse_pool is not None:
+            parse_pool.shutdown(wait=False, cancel_futures=True)
+        if run is not None:
+            run.close()
 
 def find_products_not_found():
     """Find all row indices where any column has 'Product not found'"""
@@ -1203,6 +2405,173 @@ def find_products_not_found():
     
     return not_found_indices
 
+def reextract_from_snapshots(overwrite=False):
+    """Run the current extractors over the saved page snapshots - no browser needed
+    
+    Every row whose item has a snapshot is parsed again from its latest saved page
+    (in a process pool) and written with the normal update rules.
+    
+    Args:
+        overwrite: If True, re-extracted values replace existing cell values
+                   (use after fixing an extractor that produced wrong data)
+    """
+    global df
+    from snapshot_store import reextract_snapshot
+    
+    store = get_snapshot_store()
+    stats = store.stats()
+    print(f"\nSnapshot store: {stats['items']} items, {stats['snapshots']} snapshots, {stats['pack_mb']:.1f} MB")
+    
+    tasks = []
+    for idx in range(len(df)):
+        row = df.iloc[idx]
+        item_id = get_item_id(row[link_col]) if pd.notna(row[link_col]) else None
+        if not item_id or pd.isna(row[unit_col]) or not store.history(item_id):
+            continue
+        tasks.append((store.root, idx, item_id, str(row[unit_col]).strip()))
+    if not tasks:
+        print("\nNo rows have a saved snapshot. Set SNAPSHOT_PAGES = True and scrape to collect them.")
+        return
+    print(f"Re-extracting {len(tasks)} rows from snapshots...")
+    
+    create_backup()
+    for col in [product_name_col, description_col, image_url_col]:
+        df[col] = df[col].astype(str).replace('nan', '')
+    
+    start_time = time.time()
+    done_count = 0
+    changed_count = 0
+    try:
+        with concurrent.futures.ProcessPoolExecutor(initializer=ignore_keyboard_interrupt) as pool:
+            for idx, result in pool.map(reextract_snapshot, tasks, chunksize=32):
+                done_count += 1
+                if result is None:
+                    continue
+                before = tuple(df.at[idx, col] for col in [product_name_col, description_col, image_url_col])
+                current_values = ('', '', '') if overwrite else before
+                # The per-row report is meant for live scraping - too much output for thousands of rows
+                with redirect_stdout(io.StringIO()):
+                    apply_scrape_result(idx, result, current_values)
+                if tuple(df.at[idx, col] for col in [product_name_col, description_col, image_url_col]) != before:
+                    changed_count += 1
+                if done_count % 500 == 0:
+                    print(f"  {done_count}/{len(tasks)} rows ({done_count / (time.time() - start_time):.0f} rows/s), {changed_count} changed")
+    except KeyboardInterrupt:
+        print("\n\nINTERRUPTED BY USER (Ctrl+C) - saving what was re-extracted so far...")
+    
+    print(f"\nSaving results...")
+    export_workbook()
+    print(f"Done! Re-extracted: {done_count}/{len(tasks)} rows in {time.time() - start_time:.1f}s, changed: {changed_count}")
+
+def apply_listing_image(idx, image_url, current_values):
+    """Write an image URL found on a listing page (same rule as apply_scrape_result: only empty or error cells)"""
+    current_image_url = current_values[2]
+    if not current_image_url or current_image_url in ['Unit not matched', 'Timeout error', '']:
+        df.at[idx, image_url_col] = image_url
+
+def harvest_from_listings(source="prefix"):
+    """Fill rows in bulk from search/listing pages, then scrape rows still missing a description
+    
+    Every row that still needs scraping is grouped into searches (see listing_harvest.py).
+    Listing tiles are matched to rows by Item Number; the unit is checked and the image URL
+    is written with the normal update rules. The tile title is not the Global Product Type,
+    so Product Name is left empty. Rows that still need a name or description (and didn't
+    turn out to be "Unit not matched") are then opened one by one.
+    
+    Args:
+        source: "prefix" = search by Item Number prefix, "manufacturer" = by Manufacturer Long Name
+    """
+    global df
+    from listing_harvest import build_listing_queries, walk_listing
+    
+    item_number_col = None
+    manufacturer_col = None
+    for col in df.columns:
+        col_lower = col.lower()
+        if item_number_col is None and 'item' in col_lower and 'number' in col_lower and 'stock' not in col_lower and 'butted' not in col_lower:
+            item_number_col = col
+        elif 'manufacturer' in col_lower and 'name' in col_lower:
+            manufacturer_col = col
+    if item_number_col is None or (source == "manufacturer" and manufacturer_col is None):
+        print("Error: Could not find the 'Item Number' / 'Manufacturer Long Name' column")
+        return
+    
+    for col in [product_name_col, description_col, image_url_col]:
+        df[col] = df[col].astype(str).replace('nan', '')
+    
+    # Rows that still need scraping, by Item Number
+    pending = {}
+    query_items = []
+    for idx in range(len(df)):
+        prepared = prepare_row(idx, verbose=False)
+        if prepared is None or pd.isna(df.iloc[idx][item_number_col]):
+            continue
+        item_number = str(df.iloc[idx][item_number_col]).strip()
+        manufacturer = df.iloc[idx][manufacturer_col] if manufacturer_col and pd.notna(df.iloc[idx][manufacturer_col]) else None
+        pending.setdefault(item_number.upper(), []).append(idx)
+        query_items.append((idx, item_number, manufacturer))
+    queries = build_listing_queries(query_items, source)
+    print(f"\n{len(query_items)} rows need data, grouped into {len(queries)} searches")
+    if not queries:
+        return
+    
+    create_backup()
+    driver = setup_driver()
+    main_slot.app_loaded = False  # The browser will be showing listing pages, not an item
+    filled = set()
+    unit_mismatch = set()
+    try:
+        for query_number, (query, rows_in_query) in enumerate(queries, 1):
+            print(f"\n🔎 Search {query_number}/{len(queries)}: '{query}' ({len(rows_in_query)} rows)")
+            query_filled = 0
+            for page, items in walk_listing(driver, query):
+                for item in items:
+                    for idx in pending.get(str(item['itemId']).upper(), []):
+                        if idx in filled:
+                            continue
+                        website_unit = normalize_unit(item.get('unitText'))
+                        if not website_unit:
+                            continue  # Can't check the unit - leave the row for the item page
+                        prepared = prepare_row(idx, verbose=False)
+                        if prepared is None:
+                            continue
+                        link, expected_unit, current_values = prepared
+                        # Product Name holds the Global Product Type from the item page - the tile title
+                        # is something else, so the name is left for the item page pass
+                        with redirect_stdout(io.StringIO()):
+                            result = build_scrape_result(website_unit, str(expected_unit).strip(), '', None,
+                                                         choose_product_image(item.get('images')))
+                        if result[0] == "Unit not matched":
+                            with redirect_stdout(io.StringIO()):
+                                apply_scrape_result(idx, result, current_values)
+                        elif result[2]:
+                            apply_listing_image(idx, result[2], current_values)
+                        else:
+                            continue  # Nothing to write - the item page pass does the row
+                        store_result(idx, result, current_values)
+                        journal_result(idx, result)
+                        filled.add(idx)
+                        query_filled += 1
+                        if result[0] == "Unit not matched":
+                            unit_mismatch.add(idx)
+                print(f"   Page {page}: {len(items)} items, {query_filled} rows filled so far")
+            if query_filled:
+                save_checkpoint()
+    except KeyboardInterrupt:
+        print("\n\nINTERRUPTED BY USER (Ctrl+C) - saving what was harvested so far...")
+        export_workbook()
+        raise
+    
+    export_workbook()
+    print(f"\n✅ Listing harvest filled {len(filled)} rows ({len(unit_mismatch)} unit not matched)")
+    
+    # Descriptions are only on the item pages
+    remaining = sorted(idx for indices in pending.values() for idx in indices
+                       if idx not in unit_mismatch and prepare_row(idx, verbose=False) is not None)
+    if remaining:
+        print(f"\n{len(remaining)} rows still need their item page (description or unmatched items)")
+        process_products(remaining[0], remaining[-1], specific_indices=remaining)
+
 def display_menu():
     """Display the main menu"""
     print("\n" + "="*60)
@@ -1214,21 +2583,24 @@ def display_menu():
     print("4. Scrape from a specific product to end")
     print("5. Scrape a single product by Item Number")
     print("6. Recheck products marked 'Product not found'")
-    print("7. Exit")
+    print("7. Re-extract data from saved page snapshots (no browser)")
+    print("8. Harvest from search/listing pages, then scrape rows still missing a description")
+    print("9. Write the Excel file now (from the results store)")
+    print("10. Exit")
     print("\n" + "="*60)
 
 def get_user_choice():
     """Get user's menu choice"""
     while True:
         try:
-            choice = input("\nEnter your choice (1-7): ").strip()
-            if choice in ['1', '2', '3', '4', '5', '6', '7']:
+            choice = input("\nEnter your choice (1-10): ").strip()
+            if choice in ['1', '2', '3', '4', '5', '6', '7', '8', '9', '10']:
                 return choice
             else:
-                print("Invalid choice. Please enter a number between 1 and 7.")
+                print("Invalid choice. Please enter a number between 1 and 10.")
         except KeyboardInterrupt:
             print("\n\nExiting...")
-            return '7'
+            return '10'
 
 def get_range_input(total_rows):
     """Get range input from user - asks for start first, then end"""
@@ -1355,110 +2727,166 @@ def get_item_number():
             print(f"Error: {e}")
             return None
 
-# Main menu loop
-total_rows = len(df)
-print(f"\nTotal products in Excel: {total_rows}")
+def run_menu(total_rows):
+    """Main menu loop"""
+    print(f"\nTotal products in Excel: {total_rows}")
+    if RUN_MANIFEST and os.path.exists(run_manifest_path):
+        from run_manifest import RunManifest
+        run = RunManifest.load(run_manifest_path)
+        if run is not None and not run.finished:
+            print(f"The last run stopped with {len(run.planned) - len(run.done_rows)} rows left - "
+                  f"continue it with: python scrape_products.py --resume")
 
-while True:
-    display_menu()
-    choice = get_user_choice()
-    
-    if choice == '1':
-        # Scrape all products
-        confirm = input(f"\nThis will scrape all {total_rows} products. Continue? (y/n): ").strip().lower()
-        if confirm == 'y':
-            process_products(0, total_rows - 1)
-        else:
-            print("Cancelled.")
-    
-    elif choice == '2':
-        # Scrape first 10 products (test)
-        print("\nScraping first 10 products for testing...")
-        process_products(0, min(9, total_rows - 1), test_mode=True)
-    
-    elif choice == '3':
-        # Scrape products in a range
-        start, end = get_range_input(total_rows)
-        if start is not None and end is not None:
-            process_products(start, end)
-    
-    elif choice == '4':
-        # Scrape from specific product to end
-        start = get_start_index()
-        if start is not None:
-            if start >= total_rows:
-                print(f"Error: Start index ({start + 1}) exceeds total rows ({total_rows})")
+    while True:
+        display_menu()
+        choice = get_user_choice()
+        
+        if choice == '1':
+            # Scrape all products
+            confirm = input(f"\nThis will scrape all {total_rows} products. Continue? (y/n): ").strip().lower()
+            if confirm == 'y':
+                process_products(0, total_rows - 1)
             else:
-                process_products(start, total_rows - 1)
-    
-    elif choice == '5':
-        # Scrape a single product by Item Number
-        row_idx = get_item_number()
-        if row_idx is not None:
-            print(f"\nScraping product at row {row_idx + 1}...")
-            process_products(row_idx, row_idx, test_mode=True)
-    
-    elif choice == '6':
-        # Recheck products marked 'Product not found'
-        print("\nFinding products marked 'Product not found'...")
-        not_found_indices = find_products_not_found()
-        
-        if len(not_found_indices) == 0:
-            print("\n✅ No products found with 'Product not found' status.")
-            print("All products have been successfully scraped or are in a different error state.")
-        else:
-            print(f"\nFound {len(not_found_indices)} products marked 'Product not found'.")
-            print("These products will be rechecked.")
-            
-            # Display some info about which columns have "Product not found"
-            product_name_count = 0
-            description_count = 0
-            image_url_count = 0
-            
-            for idx in not_found_indices:
-                row = df.iloc[idx]
-                if str(row[product_name_col]).strip() == 'Product not found':
-                    product_name_count += 1
-                if str(row[description_col]).strip() == 'Product not found':
-                    description_count += 1
-                if str(row[image_url_col]).strip() == 'Product not found':
-                    image_url_count += 1
-            
-            print(f"\nBreakdown:")
-            print(f"  - Product Name: {product_name_count} products")
-            print(f"  - Description: {description_count} products")
-            print(f"  - Image URL: {image_url_count} products")
+                print("Cancelled.")
+        
+        elif choice == '2':
+            # Scrape first 10 products (test)
+            print("\nScraping first 10 products for testing...")
+            process_products(0, min(9, total_rows - 1), test_mode=True)
+        
+        elif choice == '3':
+            # Scrape products in a range
+            start, end = get_range_input(total_rows)
+            if start is not None and end is not None:
+                process_products(start, end)
+        
+        elif choice == '4':
+            # Scrape from specific product to end
+            start = get_start_index()
+            if start is not None:
+                if start >= total_rows:
+                    print(f"Error: Start index ({start + 1}) exceeds total rows ({total_rows})")
+                else:
+                    process_products(start, total_rows - 1)
+        
+        elif choice == '5':
+            # Scrape a single product by Item Number
+            row_idx = get_item_number()
+            if row_idx is not None:
+                print(f"\nScraping product at row {row_idx + 1}...")
+                process_products(row_idx, row_idx, test_mode=True)
+        
+        elif choice == '6':
+            # Recheck products marked 'Product not found'
+            print("\nFinding products marked 'Product not found'...")
+            not_found_indices = find_products_not_found()
             
-            confirm = input(f"\nRecheck these {len(not_found_indices)} products? (y/n): ").strip().lower()
-            if confirm == 'y':
-                # Sort indices to process in order
-                not_found_indices.sort()
+            if len(not_found_indices) == 0:
+                print("\n✅ No products found with 'Product not found' status.")
+                print("All products have been successfully scraped or are in a different error state.")
+            else:
+                print(f"\nFound {len(not_found_indices)} products marked 'Product not found'.")
+                print("These products will be rechecked.")
+                
+                # Display some info about which columns have "Product not found"
+                product_name_count = 0
+                description_count = 0
+                image_url_count = 0
                 
-                # Process all products with "Product not found" in one batch
-                if len(not_found_indices) > 0:
-                    first_idx = not_found_indices[0]
-                    last_idx = not_found_indices[-1]
+                for idx in not_found_indices:
+                    row = df.iloc[idx]
+                    if str(row[product_name_col]).strip() == 'Product not found':
+                        product_name_count += 1
+                    if str(row[description_col]).strip() == 'Product not found':
+                        description_count += 1
+                    if str(row[image_url_col]).strip() == 'Product not found':
+                        image_url_count += 1
+                
+                print(f"\nBreakdown:")
+                print(f"  - Product Name: {product_name_count} products")
+                print(f"  - Description: {description_count} products")
+                print(f"  - Image URL: {image_url_count} products")
+                
+                confirm = input(f"\nRecheck these {len(not_found_indices)} products? (y/n): ").strip().lower()
+                if confirm == 'y':
+                    # Sort indices to process in order
+                    not_found_indices.sort()
                     
-                    # Process all products in one batch call with specific_indices
-                    print(f"\nStarting recheck of {len(not_found_indices)} products...")
-                    process_products(first_idx, last_idx, test_mode=False, recheck_not_found=True, specific_indices=not_found_indices)
+                    # Process all products with "Product not found" in one batch
+                    if len(not_found_indices) > 0:
+                        first_idx = not_found_indices[0]
+                        last_idx = not_found_indices[-1]
+                        
+                        # Process all products in one batch call with specific_indices
+                        print(f"\nStarting recheck of {len(not_found_indices)} products...")
+                        process_products(first_idx, last_idx, test_mode=False, recheck_not_found=True, specific_indices=not_found_indices)
+                else:
+                    print("Cancelled.")
+        
+        elif choice == '7':
+            # Re-extract from saved page snapshots
+            overwrite = input("\nOverwrite values already in Excel with the re-extracted ones? (y/n): ").strip().lower() == 'y'
+            reextract_from_snapshots(overwrite=overwrite)
+        
+        elif choice == '8':
+            # Harvest from search/listing pages
+            source_input = input("\nSearch by (1) Item Number prefix or (2) Manufacturer Long Name? [1]: ").strip()
+            harvest_from_listings("manufacturer" if source_input == '2' else "prefix")
+        
+        elif choice == '9':
+            # Write the workbook from the working state
+            print("\nWriting the Excel file...")
+            export_workbook()
+            if results_store is not None:
+                stored, _ = results_store.stats()
+                print(f"Excel file written ({stored} rows in the results store)")
             else:
-                print("Cancelled.")
-    
-    elif choice == '7':
-        # Exit
-        print("\nExiting...")
-        break
-    
-    # Ask if user wants to continue
-    if choice != '7':
-        continue_choice = input("\nDo you want to perform another operation? (y/n): ").strip().lower()
-        if continue_choice != 'y':
+                print("Excel file written")
+        
+        elif choice == '10':
+            # Exit
+            print("\nExiting...")
             break
+        
+        # Ask if user wants to continue
+        if choice != '10':
+            continue_choice = input("\nDo you want to perform another operation? (y/n): ").strip().lower()
+            if continue_choice != 'y':
+                break
 
-# Close driver if it was opened
-if driver is not None:
-    print("\nClosing browser...")
-    driver.quit()
-print("Goodbye!")
+def main():
+    """Load the Excel file and run the main menu loop (or continue the last run with --resume)"""
+    load_workbook()
+    
+    if "--resume" in sys.argv[1:]:
+        process_products(resume=True)
+    else:
+        run_menu(len(df))
+    
+    # Close driver if it was opened
+    if main_slot.driver is not None:
+        print("\nClosing browser...")
+        main_slot.quit()
+    driver_manager.close()
+    if item_api_client is not None:
+        item_api_client.close()
+    if snapshot_store is not None:
+        snapshot_store.close()
+    if results_store is not None:
+        results_store.close()
+    from backup_store import wait_for_backups
+    wait_for_backups()
+    if workbook_writer is not None:
+        print(f"Workbook saves: {workbook_writer.summary()}")
+        workbook_writer.close()
+    if result_journal is not None:
+        try:
+            result_journal.close()
+        except OSError as e:
+            print(f"Could not write the result journal: {e}")
+    if asset_proxy is not None:
+        asset_proxy.stop()
+    print("Goodbye!")
 
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""Compressed, content-addressed store of rendered item pages
+
+Every saved page is compressed and stored once, keyed by the SHA-256 of its content, in
+append-only pack files. A snapshot index records which content an item had at which time,
+so identical pages (re-scrapes of unchanged items) cost one index line.
+
+Layout of the store folder:
+    pack-000001.pack   zlib-compressed page records, appended one after another
+    objects.idx        one JSON line per stored object: digest, pack, offset, length
+    snapshots.idx      one JSON line per capture: item_id, captured_at, digest
+
+Pack files are read through mmap, so re-extracting thousands of pages only touches the
+parts of the packs that are needed.
+"""
+import hashlib
+import io
+import json
+import mmap
+import os
+import threading
+import time
+import zlib
+from contextlib import redirect_stdout
+
+PACK_SIZE_LIMIT = 256 * 1024 * 1024  # Start a new pack file after 256 MB
+COMPRESSION_LEVEL = 6
+
+class SnapshotStore:
+    """Append-only store of captured pages (thread-safe)"""
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self.lock = threading.Lock()
+        self.objects = {}  # digest -> (pack name, offset, length)
+        self.snapshots = {}  # item_id -> list of (captured_at, digest), oldest first
+        self.maps = {}  # pack name -> (file, mmap) opened for reading
+        self._load_indexes()
+        self.active_pack = self._latest_pack_name()
+
+    def _index_lines(self, name):
+        path = os.path.join(self.root, name)
+        if not os.path.exists(path):
+            return
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue  # Half-written line from a crash
+
+    def _load_indexes(self):
+        for entry in self._index_lines("objects.idx"):
+            self.objects[entry["digest"]] = (entry["pack"], entry["offset"], entry["length"])
+        for entry in self._index_lines("snapshots.idx"):
+            if entry["digest"] in self.objects:
+                self.snapshots.setdefault(entry["item_id"], []).append((entry["captured_at"], entry["digest"]))
+        for history in self.snapshots.values():
+            history.sort()
+
+    def _latest_pack_name(self):
+        packs = sorted(name for name in os.listdir(self.root) if name.startswith("pack-") and name.endswith(".pack"))
+        return packs[-1] if packs else "pack-000001.pack"
+
+    def _append_index(self, name, entry):
+        with open(os.path.join(self.root, name), "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+
+    def save(self, item_id, page, captured_at=None):
+        """Store a captured page for an item, returns its content digest
+
+        Args:
+            item_id: Item Number the page belongs to
+            page: captured page dict ('link', 'page_data', 'page_source')
+            captured_at: Unix time of the capture (default: now)
+        """
+        if captured_at is None:
+            captured_at = time.time()
+        data = json.dumps(page, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        with self.lock:
+            if digest not in self.objects:
+                compressed = zlib.compress(data, COMPRESSION_LEVEL)
+                pack_path = os.path.join(self.root, self.active_pack)
+                if os.path.exists(pack_path) and os.path.getsize(pack_path) + len(compressed) > PACK_SIZE_LIMIT:
+                    number = int(self.active_pack[5:11]) + 1
+                    self.active_pack = f"pack-{number:06d}.pack"
+                    pack_path = os.path.join(self.root, self.active_pack)
+                with open(pack_path, "ab") as f:
+                    offset = f.tell()
+                    f.write(compressed)
+                    f.flush()
+                    os.fsync(f.fileno())
+                # The pack grew, so an existing read map of it is too short now
+                self._close_map(self.active_pack)
+                self.objects[digest] = (self.active_pack, offset, len(compressed))
+                self._append_index("objects.idx", {"digest": digest, "pack": self.active_pack, "offset": offset, "length": len(compressed)})
+            self.snapshots.setdefault(item_id, []).append((captured_at, digest))
+            self._append_index("snapshots.idx", {"item_id": item_id, "captured_at": captured_at, "digest": digest})
+        return digest
+
+    def _close_map(self, pack):
+        opened = self.maps.pop(pack, None)
+        if opened:
+            opened[1].close()
+            opened[0].close()
+
+    def _map(self, pack):
+        if pack not in self.maps:
+            f = open(os.path.join(self.root, pack), "rb")
+            self.maps[pack] = (f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+        return self.maps[pack][1]
+
+    def load(self, digest):
+        """Return the page stored under a digest"""
+        with self.lock:
+            pack, offset, length = self.objects[digest]
+            data = zlib.decompress(self._map(pack)[offset:offset + length])
+        return json.loads(data)
+
+    def history(self, item_id):
+        """List of (captured_at, digest) for an item, oldest first"""
+        return list(self.snapshots.get(item_id, []))
+
+    def latest(self, item_id):
+        """Return the most recent page saved for an item (None if there is none)"""
+        history = self.snapshots.get(item_id)
+        if not history:
+            return None
+        return self.load(history[-1][1])
+
+    def item_ids(self):
+        return list(self.snapshots)
+
+    def stats(self):
+        """Counts and sizes for display"""
+        pack_bytes = 0
+        for name in os.listdir(self.root):
+            if name.endswith(".pack"):
+                pack_bytes += os.path.getsize(os.path.join(self.root, name))
+        return {
+            "items": len(self.snapshots),
+            "snapshots": sum(len(history) for history in self.snapshots.values()),
+            "objects": len(self.objects),
+            "pack_mb": pack_bytes / (1024 * 1024),
+        }
+
+    def close(self):
+        with self.lock:
+            for pack in list(self.maps):
+                self._close_map(pack)
+
+# Stores opened by re-extraction worker processes (one per process and folder)
+_worker_stores = {}
+
+def reextract_snapshot(task):
+    """Re-run the current extractors over an item's latest snapshot (process pool worker)
+
+    Args:
+        task: (store folder, row index, item_id, expected_unit)
+
+    Returns:
+        (row index, result tuple), result is None when the item has no snapshot
+    """
+    from page_extraction import parse_captured_page
+    root, idx, item_id, expected_unit = task
+    store = _worker_stores.get(root)
+    if store is None:
+        store = _worker_stores[root] = SnapshotStore(root)
+    page = store.latest(item_id)
+    if page is None:
+        return idx, None
+    # The extractors print progress for live scraping - keep the console quiet here
+    with redirect_stdout(io.StringIO()):
+        result = parse_captured_page(page, expected_unit, prefer_source=True)
+    return idx, result
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The scraper's modules live in the folder above, next to scrape_products.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,140 @@
+"""Asset proxy against a local origin server: cache miss, hit, revalidation and pass-through"""
+import base64
+import hashlib
+import http.client
+import shutil
+import subprocess
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+
+from asset_proxy import AssetProxy, ensure_certificate, ensure_spki_hash
+
+class OriginHandler(BaseHTTPRequestHandler):
+    requests = []
+    conditional = []  # If-None-Match of each request
+    cache_headers = {}  # path -> extra response headers
+
+    def do_GET(self):
+        self.requests.append(self.path)
+        self.conditional.append(self.headers.get('If-None-Match'))
+        extra = self.cache_headers.get(self.path, {})
+        if 'ETag' in extra and self.headers.get('If-None-Match') == extra['ETag']:
+            self.send_response(304)
+            for name, value in extra.items():
+                self.send_header(name, value)
+            self.end_headers()
+            return
+        body = f"served {self.path}".encode('utf-8')
+        self.send_response(200)
+        for name, value in extra.items():
+            self.send_header(name, value)
+        self.send_header('Content-Type', 'application/javascript' if self.path.endswith('.js') else 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def origin():
+    handler = type("Handler", (OriginHandler,), {"requests": [], "conditional": [], "cache_headers": {}})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.handler = handler
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server, handler.requests
+    server.shutdown()
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+@pytest.fixture
+def proxy(tmp_path, clock):
+    proxy = AssetProxy(str(tmp_path / "cache"), port=0, cache_hosts=[], clock=clock).start()
+    yield proxy
+    proxy.stop()
+
+def get_through(proxy, url):
+    connection = http.client.HTTPConnection("127.0.0.1", proxy.port, timeout=5)
+    connection.request("GET", url)
+    response = connection.getresponse()
+    body = response.read()
+    connection.close()
+    return response.status, body
+
+def test_hashed_file_is_fetched_once_then_served_from_cache(origin, proxy, clock):
+    server, requests = origin
+    url = f"http://127.0.0.1:{server.server_address[1]}/static/app.3f9a2b7c.js"
+    assert get_through(proxy, url) == (200, b"served /static/app.3f9a2b7c.js")
+    clock.now += 365 * 24 * 3600
+    assert get_through(proxy, url) == (200, b"served /static/app.3f9a2b7c.js")
+    stats = proxy.stats()
+    assert stats['misses'] == 1
+    assert stats['memory_hits'] == 1
+    assert requests == ["/static/app.3f9a2b7c.js"]
+
+def test_file_is_served_from_cache_for_its_max_age_then_revalidated(origin, proxy, clock):
+    server, requests = origin
+    server.handler.cache_headers["/static/app.js"] = {'Cache-Control': 'max-age=600', 'ETag': '"v1"'}
+    url = f"http://127.0.0.1:{server.server_address[1]}/static/app.js"
+    get_through(proxy, url)
+    clock.now += 599
+    assert get_through(proxy, url) == (200, b"served /static/app.js")
+    assert requests == ["/static/app.js"]
+    clock.now += 2
+    assert get_through(proxy, url) == (200, b"served /static/app.js")
+    assert server.handler.conditional == [None, '"v1"']
+    get_through(proxy, url)  # Fresh again after the 304
+    stats = proxy.stats()
+    assert (stats['misses'], stats['memory_hits'], stats['revalidated']) == (1, 2, 1)
+    assert len(requests) == 2
+
+def test_changed_file_replaces_the_cached_one(origin, proxy, clock):
+    server, requests = origin
+    server.handler.cache_headers["/static/app.css"] = {'Cache-Control': 'no-cache', 'ETag': '"v1"'}
+    url = f"http://127.0.0.1:{server.server_address[1]}/static/app.css"
+    get_through(proxy, url)
+    server.handler.cache_headers["/static/app.css"] = {'Cache-Control': 'no-cache', 'ETag': '"v2"'}
+    get_through(proxy, url)
+    get_through(proxy, url)
+    assert server.handler.conditional == [None, '"v1"', '"v2"']
+    stats = proxy.stats()
+    assert (stats['misses'], stats['revalidated'], stats['stored']) == (2, 1, 2)
+
+def test_file_without_freshness_or_validator_is_not_cached(origin, proxy):
+    server, requests = origin
+    url = f"http://127.0.0.1:{server.server_address[1]}/static/app.js"
+    get_through(proxy, url)
+    get_through(proxy, url)
+    assert proxy.stats()['stored'] == 0
+    assert len(requests) == 2
+
+def test_item_data_is_passed_through(origin, proxy):
+    server, requests = origin
+    url = f"http://127.0.0.1:{server.server_address[1]}/api/itemDetail?itemId=ABC100"
+    get_through(proxy, url)
+    get_through(proxy, url)
+    stats = proxy.stats()
+    assert stats['passed_through'] == 2
+    assert stats['misses'] == 0 and stats['memory_hits'] == 0
+    assert len(requests) == 2
+
+@pytest.mark.skipif(shutil.which("openssl") is None, reason="needs the openssl command")
+def test_spki_hash_matches_openssl(tmp_path):
+    certificate = ensure_certificate(str(tmp_path))
+    assert certificate is not None
+    public_key = subprocess.run(["openssl", "x509", "-in", certificate[0], "-pubkey", "-noout"],
+                                check=True, capture_output=True).stdout
+    der = subprocess.run(["openssl", "pkey", "-pubin", "-outform", "der"], input=public_key,
+                         check=True, capture_output=True).stdout
+    assert ensure_spki_hash(certificate[0]) == base64.b64encode(hashlib.sha256(der).digest()).decode('ascii')
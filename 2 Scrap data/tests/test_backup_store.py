@@ -0,0 +1,35 @@
+"""Backup store: restores are byte-identical, unchanged parts of a workbook are stored once"""
+import pandas as pd
+
+from backup_store import BackupStore
+
+def write_workbook(path, names):
+    df = pd.DataFrame({"Item Number": [f"ABC{i}" for i in range(len(names))], "Product Name": names,
+                       "Price": [i * 1.25 for i in range(len(names))]})
+    df.to_excel(path, index=False)
+    with open(path, "rb") as f:
+        return f.read()
+
+def test_restore_is_byte_identical(tmp_path):
+    store = BackupStore(str(tmp_path / "Backups"))
+    data = write_workbook(tmp_path / "book.xlsx", [f"Widget {i}" for i in range(3000)])
+    manifest = store.backup(data, "test")
+    output = tmp_path / "restored.xlsx"
+    store.restore(manifest, str(output))
+    assert output.read_bytes() == data
+
+def test_changed_cell_adds_only_its_chunk(tmp_path):
+    store = BackupStore(str(tmp_path / "Backups"))
+    names = [f"Widget {i}" for i in range(20000)]
+    first = store.backup(write_workbook(tmp_path / "book.xlsx", names), "test")
+    names[15000] = "Scraped product name"
+    changed = write_workbook(tmp_path / "book.xlsx", names)
+    second = store.backup(changed, "test")
+    assert second["new_bytes"] < first["new_bytes"] / 10
+    assert store.load(second) == changed
+    assert store.backup(changed, "test")["new_bytes"] == 0
+
+def test_file_that_is_not_a_zip(tmp_path):
+    store = BackupStore(str(tmp_path / "Backups"), block_bytes=1024)
+    data = bytes(range(256)) * 40
+    assert store.load(store.backup(data, "test")) == data
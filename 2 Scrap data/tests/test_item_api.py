@@ -0,0 +1,42 @@
+"""Item API client against the recorded-response stand-in server"""
+import json
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from item_api import ItemApiClient, serve_recorded_responses
+
+RECORDED_ITEM = {
+    "item": {
+        "uom": "EA",
+        "attributes": [{"name": "Global Product Type", "value": "Copy Paper"}],
+        "description": "Bright white multipurpose paper for copiers and printers.",
+        "images": ["https://content.oppictures.com/Master_Images/Master_Variants/Variant_500/ABC100.JPG"],
+    }
+}
+
+@pytest.fixture
+def client(tmp_path):
+    (tmp_path / "ABC100.json").write_text(json.dumps(RECORDED_ITEM), encoding="utf-8")
+    server = serve_recorded_responses(str(tmp_path), port=0)
+    port = server.server_address[1]
+    client = ItemApiClient(f"http://127.0.0.1:{port}/itemDetail?itemId={{item_id}}", timeout=5)
+    yield client
+    client.close()
+    server.shutdown()
+
+def test_unit_match_returns_product_data(client):
+    name, description, image_url, unit = client.fetch("https://www.biggestbook.com/ui#/itemDetail?itemId=ABC100", "EA")
+    assert name == "Copy Paper"
+    assert description.startswith("Bright white")
+    assert image_url.endswith("ABC100.JPG")
+    assert unit == "EA"
+
+def test_unit_mismatch_returns_unit_not_matched(client):
+    result = client.fetch("https://www.biggestbook.com/ui#/itemDetail?itemId=ABC100", "BX")
+    assert result[:3] == ("Unit not matched",) * 3
+
+def test_404_falls_back_to_the_browser(client):
+    # An unknown item (or a wrong endpoint URL) must not be recorded as "Product not found"
+    assert client.fetch("https://www.biggestbook.com/ui#/itemDetail?itemId=NOPE999", "EA") is None
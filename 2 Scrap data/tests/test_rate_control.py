@@ -0,0 +1,161 @@
+"""Rate control on a test clock: AIMD pace, circuit breaker, retry backoff and hedging"""
+import threading
+import time
+
+from rate_control import PaceController, CircuitBreaker, RetryScheduler, Hedger
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def wait_for(condition, timeout=5):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, "timed out"
+        time.sleep(0.01)
+
+def test_pace_cuts_once_per_round_and_recovers_step_by_step():
+    pace = PaceController(max_workers=4, min_delay=0.0, delay_step=0.1, start_delay=0.1)
+    for _ in range(4):
+        assert pace.record(1.0, failed=False) is None
+    assert (pace.delay, pace.active) == (0.0, 4)
+
+    assert pace.record(1.0, failed=True).startswith("slowing down")
+    assert (pace.delay, pace.active) == (0.1, 2)
+    assert pace.record(1.0, failed=True) is None  # Same burst: already cut for this round
+    assert (pace.delay, pace.active) == (0.1, 2)
+
+    pace.record(1.0, failed=False)
+    pace.record(1.0, failed=False)
+    assert (pace.delay, pace.active) == (0.0, 2)
+    pace.record(1.0, failed=False)
+    assert pace.record(1.0, failed=False).startswith("speeding up")
+    assert pace.active == 3
+    for _ in range(3):
+        pace.record(1.0, failed=False)
+    assert pace.active == 4
+
+def test_pace_slows_down_when_products_get_slow():
+    pace = PaceController(max_workers=2, min_delay=0.2, slow_seconds=20.0, start_delay=0.2)
+    for _ in range(4):
+        assert pace.record(30.0, failed=False) is None  # Too few samples yet
+    assert "30.0s per product" in pace.record(30.0, failed=False)
+    assert (pace.delay, pace.active) == (0.4, 1)
+
+def test_breaker_opens_probes_at_doubling_intervals_and_closes():
+    clock = Clock()
+    breaker = CircuitBreaker(consecutive_limit=3, first_probe_seconds=15, max_probe_seconds=40, clock=clock)
+    assert breaker.record(False, "https://example.com/good", "EA") is False
+    assert breaker.record(True) is False
+    assert breaker.record(True) is False
+    assert breaker.record(True) is True
+    assert breaker.is_open
+    assert breaker.record(True) is True  # Held back while open, retried later
+
+    answers = [False, False, True]
+    probes = []
+    def probe(link, unit):
+        probes.append((clock.now, link, unit))
+        return answers.pop(0)
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(breaker.wait_until_closed(probe)))
+    waiter.start()
+
+    def advance(seconds):
+        with breaker.condition:
+            clock.now += seconds
+            breaker.condition.notify_all()
+
+    time.sleep(0.1)
+    assert probes == []  # Not due yet
+    advance(15)
+    wait_for(lambda: breaker.probe_interval == 30)
+    advance(30)
+    wait_for(lambda: breaker.probe_interval == 40)  # Doubling capped at max_probe_seconds
+    advance(40)
+    waiter.join(5)
+    assert results == [True]
+    assert [seconds for seconds, _, _ in probes] == [1015, 1045, 1085]
+    assert {(link, unit) for _, link, unit in probes} == {("https://example.com/good", "EA")}
+    assert not breaker.is_open
+    assert breaker.summary() == "Circuit breaker opened 1 times, scraping paused for 85s"
+
+def test_breaker_closes_when_a_product_in_flight_answers():
+    clock = Clock()
+    breaker = CircuitBreaker(consecutive_limit=10, window=5, window_limit=3, clock=clock)
+    for timed_out in (True, False, True, False):
+        assert breaker.record(timed_out) is False
+    assert breaker.record(True) is True  # 3 of the last 5
+    clock.now += 7
+    assert breaker.record(False) is False
+    assert not breaker.is_open
+    assert breaker.open_seconds == 7
+
+def test_retry_backoff_doubles_within_the_jitter_bounds():
+    clock = Clock()
+    retries = RetryScheduler(max_attempts=4, base_delay=30, max_delay=100, jitter=0.5, clock=clock)
+    delays = {1: [], 2: [], 3: []}
+    for row in range(200):
+        for attempt in (1, 2, 3):
+            assert retries.attempt(row) == attempt
+            delays[attempt].append(retries.defer(row, ("task", row)))
+        assert retries.defer(row, ("task", row)) is None  # Fourth failure: gives up
+    for attempt, (low, high) in {1: (15, 45), 2: (30, 90), 3: (50, 150)}.items():
+        assert all(low <= delay <= high for delay in delays[attempt])
+        assert len(set(delays[attempt])) > 1  # Jittered, not all at the same moment
+    assert retries.summary() == (200, 0, 200, 600)
+
+def test_retries_come_back_when_due_in_due_order():
+    clock = Clock()
+    retries = RetryScheduler(base_delay=10, jitter=0.0, clock=clock)
+    retries.defer("A", "task A")
+    clock.now += 3
+    retries.defer("B", "task B")
+    retries.defer("B", "task B again")  # Second failure: twice the delay
+    clock.now += 2
+    assert retries.pop_due() == []
+    assert retries.seconds_until_due() == 5
+    clock.now += 8
+    assert retries.pop_due() == ["task A", "task B"]
+    clock.now += 9
+    assert retries.pop_due() == []
+    clock.now += 1
+    assert retries.pop_due() == ["task B again"]
+    assert retries.seconds_until_due() is None
+    retries.finish("B", "scraped")
+    assert retries.finished == {"B": (3, "scraped")}
+
+def test_hedge_triggers_after_the_percentile_and_first_answer_wins():
+    clock = Clock()
+    hedger = Hedger(percentile=90, min_seconds=4.0, max_rate=0.05, min_samples=20, clock=clock)
+    for seconds in range(1, 21):
+        assert hedger.finish(f"old{seconds}", 1, "result", seconds, False) == "result"
+    assert hedger.threshold() == 19
+
+    first, second = threading.Event(), threading.Event()
+    hedger.start("ABC1", "task ABC1", 1, first)
+    clock.now += 18
+    assert hedger.pick(2, second) is None
+    clock.now += 1
+    assert hedger.pick(2, second) == "task ABC1"
+    assert hedger.pick(3, threading.Event()) is None  # Already hedged (and the hedge budget is used up)
+
+    assert hedger.finish("ABC1", 2, "hedged result", 1.0, False) == "hedged result"
+    assert first.is_set() and not second.is_set()
+    assert hedger.finish("ABC1", 1, "late result", 20.0, False) is None
+    assert hedger.hedge_wins == 1
+    assert hedger.running == {}
+
+def test_failed_attempt_waits_for_the_other_one():
+    clock = Clock()
+    hedger = Hedger(min_samples=1, min_seconds=1.0, clock=clock)
+    hedger.finish("old", 1, "result", 1.0, False)
+    hedger.start("ABC1", "task ABC1", 1, threading.Event())
+    clock.now += 2
+    assert hedger.pick(2, threading.Event()) == "task ABC1"
+    assert hedger.finish("ABC1", 1, "Timeout error", 2.0, True) is None
+    assert hedger.finish("ABC1", 2, "result", 1.0, False) == "result"
+    assert hedger.hedge_wins == 1
@@ -0,0 +1,45 @@
+"""Resource type blocker: the Fetch messages it exchanges with a DevTools connection"""
+import json
+
+import pytest
+
+from resource_blocker import ResourceTypeBlocker
+
+class Connection:
+    """Plays Chrome's side of a DevTools connection from a list of messages"""
+    def __init__(self, incoming):
+        self.incoming = [json.dumps(message) for message in incoming]
+        self.sent = []
+
+    def send(self, text):
+        self.sent.append(json.loads(text))
+
+    def recv(self):
+        if not self.incoming:
+            raise ConnectionError("closed")
+        return self.incoming.pop(0)
+
+def paused(request_id, resource_type):
+    return {'method': 'Fetch.requestPaused', 'params': {'requestId': request_id, 'resourceType': resource_type}}
+
+def test_only_the_blocked_types_are_held_and_failed():
+    connection = Connection([paused('early', 'Font'), {'id': 1, 'result': {}}, paused('r2', 'Image'),
+                             {'method': 'Network.dataReceived', 'params': {}}])
+    blocker = ResourceTypeBlocker('ws://unused', ['Image', 'Font'])
+    blocker.start_blocking(connection)
+    with pytest.raises(ConnectionError):
+        while True:
+            blocker.handle(json.loads(connection.recv()))
+
+    enable = connection.sent[0]
+    assert enable['method'] == 'Fetch.enable'
+    assert [pattern['resourceType'] for pattern in enable['params']['patterns']] == ['Image', 'Font']
+    failed = [message['params'] for message in connection.sent[1:]]
+    assert failed == [{'requestId': 'early', 'errorReason': 'BlockedByClient'},
+                      {'requestId': 'r2', 'errorReason': 'BlockedByClient'}]
+    assert blocker.blocked == 2
+
+def test_refused_fetch_enable_raises():
+    connection = Connection([{'id': 1, 'error': {'message': 'Fetch domain not available'}}])
+    with pytest.raises(RuntimeError, match='Fetch domain'):
+        ResourceTypeBlocker('ws://unused', ['Font']).start_blocking(connection)
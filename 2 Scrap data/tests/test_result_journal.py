@@ -0,0 +1,67 @@
+"""Result journal: checksums, replay, a torn last line and the sequence numbers after a restart"""
+import pandas as pd
+
+from result_journal import ResultJournal, read_journal, replay_records
+
+def record(row, key, name):
+    return {"row": row, "key": key, "key_col": "Item Number", "cells": {"Product Name": name}}
+
+def write_records(path, records):
+    journal = ResultJournal(str(path))
+    seqs = [journal.append(r) for r in records]
+    journal.close()
+    return seqs
+
+def test_records_are_numbered_and_read_back(tmp_path):
+    path = tmp_path / "results.journal"
+    assert write_records(path, [record(0, "ABC1", "Pen"), record(1, "ABC2", "Pencil")]) == [1, 2]
+    records, bad = read_journal(str(path))
+    assert bad == 0
+    assert [(r["seq"], r["cells"]["Product Name"]) for r in records] == [(1, "Pen"), (2, "Pencil")]
+
+def test_line_with_a_wrong_checksum_is_skipped(tmp_path):
+    path = tmp_path / "results.journal"
+    write_records(path, [record(0, "ABC1", "Pen"), record(1, "ABC2", "Pencil")])
+    lines = path.read_text(encoding="utf-8").splitlines(keepends=True)
+    path.write_text(lines[0].replace("Pen", "Pan") + lines[1], encoding="utf-8")
+    records, bad = read_journal(str(path))
+    assert bad == 1
+    assert [r["seq"] for r in records] == [2]
+
+def test_torn_last_line_is_dropped_and_numbering_continues(tmp_path):
+    path = tmp_path / "results.journal"
+    write_records(path, [record(0, "ABC1", "Pen"), record(1, "ABC2", "Pencil"), record(2, "ABC3", "Eraser")])
+    data = path.read_bytes()
+    path.write_bytes(data[:-10])  # The crash cut off the last write
+    records, bad = read_journal(str(path))
+    assert (len(records), bad) == (2, 1)
+
+    journal = ResultJournal(str(path))
+    assert journal.append(record(2, "ABC3", "Eraser")) == 3
+    journal.close()
+    records, bad = read_journal(str(path))
+    assert bad == 1
+    assert [(r["seq"], r["key"]) for r in records] == [(1, "ABC1"), (2, "ABC2"), (3, "ABC3")]
+
+def test_replay_follows_the_item_number_and_last_record_wins(tmp_path):
+    path = tmp_path / "results.journal"
+    write_records(path, [record(0, "ABC1", "Timeout error"), record(1, "ABC2", "Pencil"), record(0, "ABC1", "Pen"),
+                         record(5, "GONE", "Stapler")])
+    records, _ = read_journal(str(path))
+    # The sheet was sorted since: ABC1 is now the second row
+    df = pd.DataFrame({"Item Number": ["ABC2", "ABC1"], "Product Name": ["", ""]})
+    assert replay_records(df, records) == 3
+    assert list(df["Product Name"]) == ["Pencil", "Pen"]
+    assert replay_records(df, records) == 3  # Replaying again gives the same data
+    assert list(df["Product Name"]) == ["Pencil", "Pen"]
+
+def test_discard_keeps_only_newer_records(tmp_path):
+    path = tmp_path / "results.journal"
+    journal = ResultJournal(str(path))
+    for i in range(4):
+        journal.append(record(i, f"ABC{i}", "Pen"))
+    journal.discard(upto=2)
+    assert journal.append(record(4, "ABC4", "Pen")) == 5
+    journal.close()
+    records, _ = read_journal(str(path))
+    assert [r["seq"] for r in records] == [3, 4, 5]
@@ -0,0 +1,56 @@
+"""Results store: which outcome may overwrite which cell, pending rows across exports and reopening"""
+import pytest
+
+from results_store import ResultsStore
+
+PRODUCT = ("Blue Pen", "Smooth ink", "https://example.com/pen.jpg")
+TIMEOUT = ("Timeout error", "Timeout error", "Timeout error")
+NOT_FOUND = ("Product not found", "Product not found", "Product not found")
+UNIT = ("Unit not matched", "Unit not matched", "Unit not matched")
+EMPTY = ("", "", "")
+
+@pytest.fixture
+def store(tmp_path):
+    store = ResultsStore(str(tmp_path / "results.db"))
+    yield store
+    store.close()
+
+def test_timeout_does_not_overwrite_a_scraped_row(store):
+    assert store.write("ABC1", 0, EMPTY, PRODUCT) == PRODUCT
+    assert store.write("ABC1", 0, EMPTY, TIMEOUT) == PRODUCT
+    assert store.write("ABC1", 0, EMPTY, NOT_FOUND) == PRODUCT
+    assert store.write("ABC1", 0, EMPTY, UNIT) == PRODUCT
+
+def test_higher_precedence_outcome_overwrites(store):
+    assert store.write("ABC1", 0, EMPTY, TIMEOUT) == TIMEOUT
+    assert store.write("ABC1", 0, EMPTY, NOT_FOUND) == NOT_FOUND
+    assert store.write("ABC1", 0, EMPTY, TIMEOUT) == NOT_FOUND
+    assert store.write("ABC2", 1, EMPTY, TIMEOUT) == TIMEOUT
+    assert store.write("ABC2", 1, EMPTY, UNIT) == UNIT
+    assert store.write("ABC2", 1, EMPTY, NOT_FOUND) == UNIT
+    assert store.write("ABC2", 1, EMPTY, PRODUCT) == PRODUCT
+
+def test_empty_value_keeps_the_cell(store):
+    store.write("ABC1", 0, EMPTY, TIMEOUT)
+    assert store.write("ABC1", 0, EMPTY, ("Blue Pen", "", "")) == ("Blue Pen", "Timeout error", "Timeout error")
+
+def test_row_starts_from_the_workbook_cells_after_an_export(store):
+    store.write("ABC1", 0, EMPTY, TIMEOUT)
+    store.mark_exported()
+    # The user filled the row in Excel meanwhile: the workbook cells win over the stored timeout
+    assert store.write("ABC1", 0, PRODUCT, TIMEOUT) == PRODUCT
+    # While pending, the stored row is the starting point (not the stale workbook cells)
+    assert store.write("ABC1", 0, EMPTY, TIMEOUT) == PRODUCT
+
+def test_pending_rows_survive_reopening(tmp_path):
+    path = str(tmp_path / "results.db")
+    store = ResultsStore(path)
+    store.write("ABC2", 5, EMPTY, PRODUCT)
+    store.restore("ABC1", 3, TIMEOUT)
+    store.close()
+    store = ResultsStore(path)
+    assert store.pending_rows() == [("ABC1", 3) + TIMEOUT, ("ABC2", 5) + PRODUCT]
+    store.mark_exported()
+    assert store.pending_rows() == []
+    assert store.stats() == (2, 0)
+    store.close()
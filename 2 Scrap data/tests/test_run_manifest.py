@@ -0,0 +1,60 @@
+"""Run manifest: plan and progress survive a reload, a torn line and a reordered sheet"""
+from run_manifest import RunManifest
+
+def create(tmp_path, rows, keys):
+    return RunManifest.create(str(tmp_path / "run.jsonl"), rows, keys, {"parallel": 2})
+
+def test_progress_is_read_back_with_in_flight_rows_first(tmp_path):
+    run = create(tmp_path, [4, 2, 7, 1], ["D", "B", "G", "A"])
+    run.start([4, 2])
+    run.done(4)
+    run.start([7, 2])  # 2 is retried, still in flight from its first attempt
+    run.close()
+    loaded = RunManifest.load(run.path)
+    assert loaded.planned == [4, 2, 7, 1]
+    assert loaded.keys == {4: "D", 2: "B", 7: "G", 1: "A"}
+    assert loaded.options == {"parallel": 2}
+    assert loaded.in_flight() == {2, 7}
+    assert loaded.remaining() == [2, 7, 1]
+    assert not loaded.finished
+
+def test_torn_last_line_is_ignored(tmp_path):
+    run = create(tmp_path, [0, 1, 2], ["A", "B", "C"])
+    run.start([0, 1])
+    run.done(0)
+    run.close()
+    with open(run.path, "a", encoding="utf-8") as f:
+        f.write('{"done": ')
+    assert RunManifest.load(run.path).remaining() == [1, 2]
+
+def test_finished_run_and_missing_manifest(tmp_path):
+    run = create(tmp_path, [0], ["A"])
+    run.start([0])
+    run.done(0)
+    run.finish()
+    assert RunManifest.load(run.path).finished
+    assert RunManifest.load(str(tmp_path / "other.jsonl")) is None
+
+def test_resume_against_a_reordered_sheet_follows_the_items(tmp_path):
+    run = create(tmp_path, [0, 1, 2, 3], ["A", "B", "C", "D"])
+    run.start([0, 1])
+    run.done(0)
+    run.close()
+
+    # The sheet was sorted (D, C, B, A) and D was deleted: match the plan by Item Number
+    sheet = ["C", "B", "A"]
+    resumed = RunManifest.load(run.path)
+    rows_by_key = {key: idx for idx, key in enumerate(sheet)}
+    resumed.remap({idx: rows_by_key.get(key) for idx, key in resumed.keys.items()})
+    assert [sheet[idx] for idx in resumed.remaining()] == ["B", "C"]
+    assert [sheet[idx] for idx in resumed.done_rows] == ["A"]
+
+    # Events of the rest of the run use the new rows, and a later reload agrees with them
+    resumed.resumed()
+    resumed.start([rows_by_key["B"], rows_by_key["C"]])
+    resumed.done(rows_by_key["B"])
+    resumed.close()
+    reloaded = RunManifest.load(run.path)
+    assert reloaded.keys == {2: "A", 1: "B", 0: "C"}
+    assert [sheet[idx] for idx in reloaded.remaining()] == ["C"]
+    assert [sheet[idx] for idx in reloaded.planned] == ["A", "B", "C"]
@@ -0,0 +1,119 @@
+"""Workbook saves on a background thread, written to a temp file and renamed over the workbook
+
+Writing a large workbook takes seconds, and writing straight over the live file leaves a
+broken workbook when the write fails halfway (or the window is closed). Here:
+- A save takes a snapshot of the data: the result columns are copied, every other column
+  is shared with the live DataFrame (those are never changed in place while scraping)
+- The snapshot is written by one background thread, so the scraper keeps working
+- The file is written next to the workbook and renamed over it (os.replace), so the
+  workbook is always either the old or the new version
+- Saves are coalesced: while one is being written, a newer save replaces the one waiting,
+  so there is never more than one write pending
+"""
+import os
+import threading
+
+def snapshot_frame(df, columns):
+    """Copy of df that the caller can keep changing: the given columns are copied, the rest is shared"""
+    snapshot = df.copy(deep=False)
+    for col in columns:
+        if col in snapshot.columns:
+            snapshot[col] = df[col].copy()
+    return snapshot
+
+def write_workbook_atomic(frame, path):
+    """Write a DataFrame to path through a temp file in the same folder and an atomic rename"""
+    root, ext = os.path.splitext(path)
+    temp_path = f"{root}.saving{ext or '.xlsx'}"
+    try:
+        frame.to_excel(temp_path, index=False)
+        with open(temp_path, "r+b") as f:
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+        raise
+
+class WorkbookWriter:
+    """Background writer of one workbook, with at most one save waiting (thread-safe)"""
+
+    def __init__(self, path):
+        self.path = path
+        self.condition = threading.Condition()
+        self.pending = None  # (save number, snapshot, callbacks) waiting for the writer
+        self.submitted = 0  # Number of the last save submitted
+        self.written = 0  # Number of the last save written (or failed)
+        self.outcomes = {}  # Save number written -> exception (None if it was written)
+        self.writes = 0
+        self.coalesced = 0
+        self.closed = False
+        self.writer = threading.Thread(target=self._write_loop, name="workbook-writer", daemon=True)
+        self.writer.start()
+
+    def submit(self, snapshot, on_written=None):
+        """Queue a snapshot to be written, returns its save number (a waiting save is replaced)
+
+        on_written is called on the writer thread once the file has been renamed into place.
+        """
+        with self.condition:
+            if self.closed:
+                raise ValueError("workbook writer is closed")
+            self.submitted += 1
+            callbacks = [on_written] if on_written else []
+            if self.pending is not None:
+                # The newer snapshot has everything the waiting one has
+                callbacks = self.pending[2] + callbacks
+                self.coalesced += 1
+            self.pending = (self.submitted, snapshot, callbacks)
+            self.condition.notify_all()
+            return self.submitted
+
+    def wait(self, number=None):
+        """Wait until save number (default: the last one submitted) is on disk, raises if it failed"""
+        with self.condition:
+            number = self.submitted if number is None else number
+            while self.written < number:
+                self.condition.wait()
+            if number == 0:
+                return
+            # A save that was coalesced shares the outcome of the write that replaced it
+            error = self.outcomes[min(n for n in self.outcomes if n >= number)]
+            if error is not None:
+                raise error
+
+    def _write_loop(self):
+        while True:
+            with self.condition:
+                while self.pending is None and not self.closed:
+                    self.condition.wait()
+                if self.pending is None:
+                    return
+                number, snapshot, callbacks = self.pending
+                self.pending = None
+            try:
+                write_workbook_atomic(snapshot, self.path)
+                for callback in callbacks:
+                    callback()
+                error = None
+            except Exception as e:
+                print(f"\nERROR: Background save of {os.path.basename(self.path)} failed: {e}")
+                error = e
+            with self.condition:
+                self.writes += 1
+                self.written = number
+                self.outcomes[number] = error
+                self.condition.notify_all()
+
+    def summary(self):
+        return f"{self.writes} workbook writes ({self.coalesced} saves coalesced)"
+
+    def close(self):
+        """Finish the waiting save (if any) and stop the thread"""
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        self.writer.join()
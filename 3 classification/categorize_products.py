@@ -2,10 +2,12 @@ import pandas as pd
 import os
 import sys
 import re
-from datetime import datetime
-import shutil
 from pathlib import Path
 
+# Backups are shared with the scraper (one store and retention policy for both tools)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "2 Scrap data"))
+from backup_store import backup_in_background, wait_for_backups
+
 # Define the categories (6 main + 1 anonymous for unmatched products)
 CATEGORIES = [
     "Computer Hardware Solutions",
@@ -361,6 +363,10 @@ def process_excel_file(excel_path, category_col_name="Category", existing_catego
     print(f"Image URL column: {img_url_col if img_url_col else 'Not found'}")
     print(f"Target Category column: {category_col_name}")
     
+    # Create backup (written in the background while the products are processed)
+    backup_folder = os.path.join(os.path.dirname(excel_path), "Backups")
+    backup_in_background(excel_path, "categorization", backup_folder)
+    
     # Create or verify target category column
     overwrite = 'n'  # Default: don't overwrite
     if category_col_name not in df.columns:
@@ -376,14 +382,6 @@ def process_excel_file(excel_path, category_col_name="Category", existing_catego
             if overwrite != 'y':
                 print("Keeping existing values, only filling empty cells...")
     
-    # Create backup
-    backup_folder = os.path.join(os.path.dirname(excel_path), "Backups")
-    os.makedirs(backup_folder, exist_ok=True)
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    backup_path = os.path.join(backup_folder, f"categorization_backup_{timestamp}.xlsx")
-    shutil.copy2(excel_path, backup_path)
-    print(f"\nBackup created: {backup_path}")
-    
     # Process products
     print("\n" + "="*70)
     print("Processing products...")
@@ -506,7 +504,8 @@ def process_excel_file(excel_path, category_col_name="Category", existing_catego
         print("You may want to review these and manually assign categories if needed.")
     
     print(f"\nResults saved to: {excel_path}")
-    print(f"Backup saved to: {backup_path}")
+    wait_for_backups()
+    print(f"Backup saved to: {backup_folder} (restore with: python \"2 Scrap data/backup_store.py\" restore <time>)")
     
     return True
 